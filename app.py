@@ -4,10 +4,24 @@ import networkx as nx
 import numpy as np
 import requests
 from bs4 import BeautifulSoup
+import hashlib
+import json
 import re
 from urllib.parse import urlparse, urljoin
 import logging
-from collections import defaultdict
+import os
+from collections import OrderedDict
+import threading
+import uuid
+
+from cache import create_cache
+from graph_storage import (CSRMatrix, CompressedGraph, NODE_ORDERINGS, index_urls, load_graph_snapshot,
+                           save_graph_snapshot)
+from solvers import PAGERANK_SOLVERS, calculate_pagerank_from_matrix, parallel
+from solvers.bsp import BSP_PARTITIONERS
+from solvers.personalized import calculate_pagerank_damping_sweep, calculate_personalized_pagerank_batch
+from solvers.power import EXTRAPOLATION_METHODS
+from solvers.session import PageRankSession
 
 app = Flask(__name__)
 CORS(app)
@@ -37,6 +51,55 @@ def normalize_url(url):
     except:
         return url
 
+class SingleFlight:
+    """Gộp các lời gọi đồng thời có cùng khóa: chỉ lời gọi đầu tiên thực sự chạy, các lời
+    gọi đến trong lúc nó đang chạy chờ và nhận cùng kết quả (hoặc cùng exception)
+    
+    Không lưu kết quả: khi lời gọi kết thúc, lời gọi sau với cùng khóa chạy lại.
+    """
+    
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = self.shared = 0
+    
+    def do(self, key, function):
+        """Chạy function() (hoặc chờ lời gọi cùng key đang chạy); trả về (kết quả, có dùng chung không)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+# Request /api/pagerank và lần tải từng trang đang chạy, để request đồng thời dùng chung
+_pagerank_requests = SingleFlight()
+_link_fetches = SingleFlight()
+
 def extract_links(url):
     """Crawl và trích xuất tất cả links từ một trang web"""
     if not is_valid_url(url):
@@ -87,25 +150,42 @@ def extract_links(url):
         logger.error(f"Unexpected error while processing {url}: {str(e)}")
         return []
 
+def fetch_links(url):
+    """extract_links dùng chung giữa các request: lấy từ page cache (chung giữa các worker nếu
+    backend cho phép) nếu có, URL đang được tải bởi request khác thì chờ và dùng lại kết quả"""
+    cached = _page_cache.get(url)
+    if cached is not None:
+        return json.loads(cached)
+    
+    def fetch():
+        links = extract_links(url)
+        # Danh sách rỗng có thể do lỗi tải tạm thời nên không lưu
+        if links:
+            _page_cache.put(url, json.dumps(links).encode('utf-8'))
+        return links
+    
+    links, _ = _link_fetches.do(url, fetch)
+    return links
+
 def build_adjacency_matrix(urls):
-    """Xây dựng ma trận kề từ danh sách URLs"""
+    """Xây dựng ma trận kề từ danh sách URLs (list hoặc URLTable), trả về kèm URLTable dùng để tra cứu"""
     n = len(urls)
     adjacency_matrix = [[0] * n for _ in range(n)]
-    url_to_index = {url: i for i, url in enumerate(urls)}
+    url_to_index = index_urls(urls)
     
     total_links_found = 0
     total_edges_added = 0
     
     for i, url in enumerate(urls):
         logger.info(f"Crawling {url}...")
-        links = extract_links(url)
+        links = fetch_links(url)
         total_links_found += len(links)
         
         # Đếm số link đến các trang trong danh sách
         outbound_count = 0
         for link in links:
-            if link in url_to_index:
-                j = url_to_index[link]
+            j = url_to_index.get(link)
+            if j is not None:
                 adjacency_matrix[i][j] = 1
                 outbound_count += 1
                 total_edges_added += 1
@@ -120,55 +200,264 @@ def build_adjacency_matrix(urls):
     
     return adjacency_matrix, url_to_index
 
-def calculate_pagerank_from_matrix(adjacency_matrix, urls, damping_factor=0.85, max_iterations=100, tolerance=1e-6):
-    n = len(urls)
-    
-    # Xác định dangling nodes
-    dangling_nodes = [i for i in range(n) if sum(adjacency_matrix[i]) == 0]
-    
-    # Xây dựng transition matrix (KHÔNG xử lý dangling ở đây)
-    transition_matrix = np.zeros((n, n))
-    for i in range(n):
-        row_sum = sum(adjacency_matrix[i])
-        if row_sum > 0:
-            for j in range(n):
-                transition_matrix[j][i] = adjacency_matrix[i][j] / row_sum
-    
-    # Initialize PageRank
-    pagerank = np.ones(n) / n
-    
-    for iteration in range(max_iterations):
-        # Tính dangling contribution
-        dangling_contrib = sum(pagerank[i] for i in dangling_nodes)
-        
-        # Tính PageRank mới
-        new_pagerank = (1 - damping_factor) / n * np.ones(n)
-        new_pagerank += damping_factor * (transition_matrix @ pagerank + dangling_contrib / n * np.ones(n))
-        
-        # Normalize
-        new_pagerank = new_pagerank / np.sum(new_pagerank)
-        
-        # Check convergence
-        if np.linalg.norm(new_pagerank - pagerank, 1) < tolerance:
-            logger.info(f"Converged after {iteration + 1} iterations")
-            break
-            
-        pagerank = new_pagerank
-    
-    results = [(urls[i], float(pagerank[i])) for i in range(n)]
-    results.sort(key=lambda x: x[1], reverse=True)
-    return results
-
 def calculate_pagerank(urls, damping_factor=0.85, max_iterations=100):
     """Tính PageRank cho danh sách URLs"""
     if not urls:
         raise ValueError("No URLs provided")
     
     # Xây dựng ma trận kề
-    adjacency_matrix, url_to_index = build_adjacency_matrix(urls)
+    adjacency_matrix, url_table = build_adjacency_matrix(urls)
     
     # Tính PageRank
-    return calculate_pagerank_from_matrix(adjacency_matrix, urls, damping_factor, max_iterations)
+    return calculate_pagerank_from_matrix(adjacency_matrix, url_table, damping_factor, max_iterations)
+
+def is_number(value):
+    """Số thực hữu hạn trong JSON (bool không tính là số)"""
+    if isinstance(value, float):
+        return bool(np.isfinite(value))
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_solver_options(data):
+    """Đọc tên solver và các tùy chọn của solver từ request body"""
+    solver = data.get('solver', 'power')
+    if not isinstance(solver, str) or solver not in PAGERANK_SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    
+    _, option_names = PAGERANK_SOLVERS[solver]
+    options = {name: data[name] for name in option_names if data.get(name) is not None}
+    
+    acceleration = options.get('acceleration')
+    if acceleration is not None and (not isinstance(acceleration, str) or acceleration not in EXTRAPOLATION_METHODS):
+        raise ValueError(f"Unknown acceleration method: {acceleration}")
+    # JSON cho phép gửi chuỗi / bool / số thực: kiểm tra kiểu trước khi so sánh
+    for name, minimum in (('walks_per_node', 2), ('workers', 1), ('refresh_period', 1), ('extrapolation_period', 1)):
+        value = options.get(name)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < minimum):
+            raise ValueError(f"{name} must be an integer of at least {minimum}")
+    for name in ('node_tolerance', 'local_tolerance'):
+        if name in options and (not is_number(options[name]) or options[name] <= 0):
+            raise ValueError(f"{name} must be a positive number")
+    if 'confidence' in options and (not is_number(options['confidence']) or not 0 < options['confidence'] < 1):
+        raise ValueError("confidence must be between 0 and 1")
+    if options.get('workers', 1) > parallel.PARALLEL_MAX_WORKERS:
+        raise ValueError(f"workers must be at most {parallel.PARALLEL_MAX_WORKERS}")
+    seed = options.get('seed')
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise ValueError("seed must be a non-negative integer")
+    partitioning = options.get('partitioning', 'hash')
+    if not isinstance(partitioning, str) or partitioning not in BSP_PARTITIONERS:
+        raise ValueError(f"Unknown partitioning: {partitioning}")
+    top_k = options.get('top_k')
+    if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+        raise ValueError("top_k must be a positive integer")
+    # Đánh số lại node trước khi giải dùng được với mọi solver
+    if data.get('reorder') is not None:
+        if not isinstance(data['reorder'], str) or data['reorder'] not in NODE_ORDERINGS:
+            raise ValueError(f"Unknown node ordering: {data['reorder']}")
+        options['reorder'] = data['reorder']
+    return solver, options
+
+# Nghiệm PageRank gần nhất của mỗi graph_id (url -> rank), dùng để warm start
+SOLUTION_STORE_MAX_GRAPHS = 128
+_solution_store = OrderedDict()
+_solution_store_lock = threading.Lock()
+
+def get_stored_solution(graph_id):
+    """Lấy nghiệm đã lưu của graph_id (None nếu chưa có)"""
+    with _solution_store_lock:
+        ranks = _solution_store.get(graph_id)
+        if ranks is not None:
+            _solution_store.move_to_end(graph_id)
+        return ranks
+
+def store_solution(graph_id, results):
+    """Lưu nghiệm mới nhất của graph_id, loại graph ít dùng nhất khi vượt giới hạn"""
+    with _solution_store_lock:
+        _solution_store[graph_id] = dict(results)
+        _solution_store.move_to_end(graph_id)
+        while len(_solution_store) > SOLUTION_STORE_MAX_GRAPHS:
+            _solution_store.popitem(last=False)
+
+def run_pagerank(adjacency_matrix, urls, damping_factor=0.85, max_iterations=100, solver='power', solver_options=None,
+                 graph_id=None, initial_ranks=None, compare_baseline=False):
+    """Tính PageRank bằng solver đã chọn và trả về kèm thống kê của solver
+    
+    Nếu không truyền initial_ranks, nghiệm đã lưu của graph_id (nếu có) được dùng
+    làm điểm khởi tạo; nghiệm mới được lưu lại cho lần gọi sau. compare_baseline (chỉ để
+    chẩn đoán, tốn thêm một lần giải) chạy thêm power iteration không ngoại suy để so sánh.
+    """
+    solver_options = solver_options or {}
+    if initial_ranks is None and graph_id is not None:
+        initial_ranks = get_stored_solution(graph_id)
+    
+    results, stats = calculate_pagerank_from_matrix(
+        adjacency_matrix, urls, damping_factor, max_iterations,
+        solver=solver, return_stats=True, initial_ranks=initial_ranks, **solver_options)
+    
+    if solver_options.get('acceleration') is not None:
+        stats['extrapolation_period'] = solver_options.get('extrapolation_period', 10)
+        if compare_baseline:
+            # Chạy thêm power iteration thường để so sánh số vòng lặp
+            _, baseline = calculate_pagerank_from_matrix(
+                adjacency_matrix, urls, damping_factor, max_iterations, return_stats=True, initial_ranks=initial_ranks)
+            stats['iterations_without_acceleration'] = baseline['iterations']
+    
+    # Kết quả top_k không đủ để warm start nên không lưu
+    if graph_id is not None and solver_options.get('top_k') is None:
+        store_solution(graph_id, results)
+    return results, stats
+
+# Cache dùng chung cho kết quả /api/pagerank-matrix (body JSON theo hash nội dung) và danh sách
+# outlink của từng trang đã crawl. Backend chọn bằng PAGERANK_CACHE_BACKEND:
+#   memory (mặc định)        LRU trong process, mỗi worker gunicorn một bản riêng
+#   sqlite:///path/cache.db  file SQLite (WAL) dùng chung giữa các worker trên một máy;
+#                            đặt file trên /dev/shm để nằm hoàn toàn trong RAM
+#   redis://host:port/db     server Redis (hoặc bất kỳ server nói giao thức RESP)
+# Mọi backend có cùng giao diện get(key) / put(key, value) / clear() / stats(), khóa là str,
+# giá trị là bytes. Lỗi của backend ngoài process chỉ làm lookup thành miss, không làm hỏng request;
+# khi đó stats() trả về {'backend', 'available': False, 'error'}.
+CACHE_BACKEND = os.environ.get('PAGERANK_CACHE_BACKEND', 'memory')
+
+def _cache_max_bytes(variable, default):
+    """Giới hạn byte của cache từ biến môi trường
+    
+    Với redis:// giới hạn bộ nhớ do server quyết định (maxmemory) nên đặt biến là lỗi cấu hình.
+    """
+    if not CACHE_BACKEND.startswith('redis://'):
+        return int(os.environ.get(variable, default))
+    if variable in os.environ:
+        raise ValueError(f"{variable} is not supported with a redis:// cache backend; "
+                         f"set maxmemory on the Redis server instead")
+    return None
+
+RESULT_CACHE_MAX_BYTES = _cache_max_bytes('PAGERANK_RESULT_CACHE_BYTES', 64 * 2 ** 20)
+PAGE_CACHE_MAX_BYTES = _cache_max_bytes('PAGERANK_PAGE_CACHE_BYTES', 16 * 2 ** 20)
+PAGE_CACHE_TTL = float(os.environ.get('PAGERANK_PAGE_CACHE_TTL', 3600))
+
+_result_cache = create_cache(CACHE_BACKEND, 'result', RESULT_CACHE_MAX_BYTES)
+_page_cache = create_cache(CACHE_BACKEND, 'page', PAGE_CACHE_MAX_BYTES, ttl=PAGE_CACHE_TTL)
+
+# Hash body request thô -> khóa cache: request lặp lại byte-y-hệt (trường hợp thường gặp của
+# frontend) được trả lời trước khi parse JSON và chuẩn hóa ma trận
+RESULT_CACHE_MAX_ALIASES = 4096
+_result_cache_aliases = OrderedDict()
+_result_cache_aliases_lock = threading.Lock()
+
+def request_body_digest(body):
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+def lookup_result_alias(body_digest):
+    """Body đã cache của request có body thô trùng với một request trước (None nếu không có)"""
+    with _result_cache_aliases_lock:
+        cache_key = _result_cache_aliases.get(body_digest)
+        if cache_key is None:
+            return None
+        _result_cache_aliases.move_to_end(body_digest)
+    return _result_cache.get(cache_key)
+
+def remember_result_alias(body_digest, cache_key):
+    with _result_cache_aliases_lock:
+        _result_cache_aliases[body_digest] = cache_key
+        _result_cache_aliases.move_to_end(body_digest)
+        while len(_result_cache_aliases) > RESULT_CACHE_MAX_ALIASES:
+            _result_cache_aliases.popitem(last=False)
+
+def graph_fingerprint(adjacency_matrix, urls):
+    """Hash nội dung đồ thị, không phụ thuộc cách biểu diễn số (1 / 1.0 / true) hay dense / CSR
+    
+    Ma trận được đưa về CSR float64 (cạnh trùng gộp, số 0 bỏ) trước khi hash.
+    """
+    matrix = adjacency_matrix if isinstance(adjacency_matrix, CSRMatrix) else CSRMatrix.from_dense(adjacency_matrix)
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(np.asarray(matrix.shape, dtype='<i8').tobytes())
+    for array, dtype in ((matrix.indptr, '<i8'), (matrix.indices, '<i8'), (matrix.data, '<f8')):
+        digest.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    digest.update('\0'.join(urls).encode('utf-8'))
+    return digest.digest()
+
+def result_cache_key(data, graph_key):
+    """Khóa cache của một request: hash đồ thị + các tham số còn lại (JSON sắp khóa)"""
+    parameters = {key: value for key, value in data.items() if key not in ('urls', 'adjacency_matrix')}
+    digest = hashlib.blake2b(graph_key, digest_size=32)
+    digest.update(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+GRAPH_SESSIONS_MAX = 32
+# epsilon nhỏ nhất của related / target-rank: số lần push tăng theo 1 / epsilon, epsilon quá
+# nhỏ giữ một worker gần như vô hạn
+GRAPH_SESSION_MIN_EPSILON = 1e-6
+_graph_sessions = OrderedDict()
+_graph_sessions_lock = threading.Lock()
+
+def get_graph_session(session_id):
+    with _graph_sessions_lock:
+        session = _graph_sessions.get(session_id)
+        if session is not None:
+            _graph_sessions.move_to_end(session_id)
+        return session
+
+def add_graph_session(session):
+    """Lưu session mới, loại session ít dùng nhất khi vượt giới hạn"""
+    session_id = uuid.uuid4().hex
+    with _graph_sessions_lock:
+        _graph_sessions[session_id] = session
+        while len(_graph_sessions) > GRAPH_SESSIONS_MAX:
+            _graph_sessions.popitem(last=False)
+    return session_id
+
+# Snapshot đồ thị trên đĩa, tham chiếu bằng snapshot_id; snapshot đã mở (np.memmap) được
+# giữ lại để request sau không phải mở lại
+GRAPH_SNAPSHOT_DIR = os.environ.get('PAGERANK_SNAPSHOT_DIR',
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graph_snapshots'))
+GRAPH_SNAPSHOTS_OPEN_MAX = 16
+_open_snapshots = OrderedDict()
+_open_snapshots_lock = threading.Lock()
+
+def graph_snapshot_path(snapshot_id):
+    """Đường dẫn file của snapshot, None nếu id không hợp lệ (chỉ nhận uuid dạng hex)"""
+    if not isinstance(snapshot_id, str) or not re.fullmatch(r'[0-9a-f]{32}', snapshot_id):
+        return None
+    return os.path.join(GRAPH_SNAPSHOT_DIR, f'{snapshot_id}.graph')
+
+def add_graph_snapshot(adjacency_matrix, urls):
+    """Lưu đồ thị thành snapshot mới và trả về snapshot_id"""
+    os.makedirs(GRAPH_SNAPSHOT_DIR, exist_ok=True)
+    snapshot_id = uuid.uuid4().hex
+    save_graph_snapshot(graph_snapshot_path(snapshot_id), adjacency_matrix, urls)
+    return snapshot_id
+
+def get_graph_snapshot(snapshot_id):
+    """(CSRMatrix, URLTable) của snapshot, None nếu không tồn tại"""
+    path = graph_snapshot_path(snapshot_id)
+    if path is None:
+        return None
+    with _open_snapshots_lock:
+        snapshot = _open_snapshots.get(snapshot_id)
+        if snapshot is not None:
+            _open_snapshots.move_to_end(snapshot_id)
+            return snapshot
+    try:
+        snapshot = load_graph_snapshot(path)
+    except FileNotFoundError:
+        return None
+    with _open_snapshots_lock:
+        _open_snapshots[snapshot_id] = snapshot
+        while len(_open_snapshots) > GRAPH_SNAPSHOTS_OPEN_MAX:
+            _open_snapshots.popitem(last=False)
+    return snapshot
+
+def delete_graph_snapshot(snapshot_id):
+    """Xóa snapshot, trả về False nếu không tồn tại"""
+    path = graph_snapshot_path(snapshot_id)
+    with _open_snapshots_lock:
+        _open_snapshots.pop(snapshot_id, None)
+    if path is None:
+        return False
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
 
 # Add a route for the root path
 @app.route('/', methods=['GET'])
@@ -221,58 +510,304 @@ def home():
   ],
   "damping_factor": 0.85,
   "max_iterations": 100
+}
+        </pre>
+        
+        <h3>Optional: Solver settings</h3>
+        <p>Both endpoints accept a <code>"solver"</code> field (default <code>"power"</code>) and its options.
+        The response reports <code>iterations</code> and <code>solver_stats</code>.</p>
+        <ul>
+            <li><code>"power"</code>: <code>"acceleration": "quadratic"</code> (recommended) or <code>"aitken"</code>
+            extrapolates at most every <code>extrapolation_period</code> iterations (default 10), and only once the
+            residual decreases at a steady rate. It pays off when convergence is slow (damping close to 1):
+            quadratic saves ~10% of iterations at d=0.85 and ~60% at d=0.99, Aitken somewhat less; on graphs that
+            converge quickly it changes nothing. Add <code>"compare_baseline": true</code> to also run plain power
+            iteration and report <code>iterations_without_acceleration</code> (doubles the cost).
+            <code>"top_k": k</code> stops as soon as the order
+            of the k highest-ranked pages is certified by a residual-based error bound and returns only those
+            k entries (<code>solver_stats.top_k_certified</code>).</li>
+            <li><code>"adaptive"</code>: freezes nodes whose relative change is below <code>node_tolerance</code>
+            and rechecks all nodes every <code>refresh_period</code> iterations (default 10).</li>
+            <li><code>"monte_carlo"</code>: fast approximate preview for large graphs. Runs
+            <code>walks_per_node</code> random walks from every page (default 10) split across <code>workers</code>
+            processes (default 1, at most <code>PAGERANK_PARALLEL_WORKERS</code>);
+            <code>solver_stats.confidence_intervals</code> gives each page's rank interval at
+            <code>confidence</code> (default 0.95). Pass <code>seed</code> for reproducible results.</li>
+            <li><code>"blockrank"</code>: groups pages by host, solves local PageRank inside every host and a
+            host-level rank, and starts the global iteration from their product. Helps on multi-site crawls
+            with mostly intra-host links; <code>local_tolerance</code> (default 1e-3) sets the local stage accuracy
+            and <code>solver_stats</code> reports <code>blocks</code>, <code>local_iterations</code> and
+            <code>host_iterations</code>.</li>
+            <li><code>"scc"</code>: splits the graph into strongly connected components and solves them in
+            topological order, single pages in closed form and each component at its own convergence rate.
+            Much faster than <code>"power"</code> with damping close to 1 on graphs made of loosely linked parts;
+            <code>solver_stats</code> reports <code>components</code>, <code>largest_component</code> and
+            <code>levels</code> (groups solved one after another).</li>
+            <li><code>"lumped"</code>: collapses all dangling pages (no out-links) into one state, iterates
+            only over the other pages and recovers dangling ranks with one final multiplication. Saves work
+            on partial crawls with many dangling pages; <code>solver_stats.dangling_nodes</code> gives their
+            count.</li>
+            <li><code>"mixed_precision"</code>: iterates in float32 until float32 rounding stops the residual from
+            falling, then refines with float64 power iteration, so the result matches <code>"power"</code> within
+            <code>tolerance</code>. It takes as many iterations as <code>"power"</code>, but on unweighted graphs
+            every iteration reads only the link indices (a third of the bytes) in fixed-size blocks, with no copy
+            of the matrix and no matrix-sized temporary; about 20-30% faster with about 40% less peak memory
+            on graphs with millions of links. Weighted graphs run in float64 only.
+            <code>solver_stats</code> reports <code>float32_iterations</code> and
+            <code>float64_iterations</code>.</li>
+            <li><code>"parallel"</code>: power iteration whose matrix-vector product is split into row blocks of
+            equal link count across <code>workers</code> processes, with the graph and rank vectors in shared
+            memory. The default of 1 runs in the request's own process; larger values (at most
+            <code>PAGERANK_PARALLEL_WORKERS</code>, default: all CPU cores) use one process pool shared by all
+            requests. Results are identical for any number of workers; worth it on graphs with millions of
+            links.</li>
+            <li><code>"bsp"</code>: runs PageRank as a vertex program on a Pregel-style bulk-synchronous engine.
+            The graph is split across <code>workers</code> local processes (default 2, at most
+            <code>PAGERANK_PARALLEL_WORKERS</code>), each holding only its
+            own pages and links, and pages exchange messages across partitions once per superstep.
+            <code>partitioning</code> is <code>"hash"</code> (default) or <code>"label_propagation"</code> (fewer
+            cross-partition links). <code>solver_stats</code> reports <code>edge_cut</code>,
+            <code>boundary_messages</code> and <code>partition_sizes</code>. The same engine runs HITS and BFS.</li>
+        </ul>
+        <p>Any solver also accepts <code>"reorder": "degree" | "rcm" | "host"</code> to renumber pages before
+        solving so the matrix-vector product touches memory in a more cache-friendly order: by total link
+        count, by Reverse Cuthill-McKee (linked pages get nearby numbers), or grouped by host. Results are
+        mapped back to the original pages; <code>solver_stats</code> reports <code>reorder_time</code>. Only
+        pays off on large graphs solved with many iterations.</p>
+
+        <h3>Optional: Damping-factor sweep</h3>
+        <p><code>/api/pagerank-matrix</code> accepts <code>"damping_factors": [0.5, 0.7, 0.85, 0.95]</code> to solve
+        every value against one transition matrix in a single batched power iteration. The response lists
+        <code>sweep</code> (ranks, <code>iterations</code> and <code>converged</code> per value) and
+        <code>rank_correlations</code>, the pairwise Spearman correlation matrix of the rankings; solver options
+        are ignored in this mode.</p>
+        
+        <h3>Convergence diagnostics</h3>
+        <p>Both endpoints return <code>diagnostics</code>: <code>iterations</code>, <code>converged</code>,
+        <code>final_residual</code> (L1), <code>residual_history</code> with the matching
+        <code>residual_iterations</code>, <code>total_time_ms</code>, <code>time_per_iteration_ms</code> and
+        <code>estimated_rate</code>, the average per-iteration residual ratio over the second half of the run
+        (close to 1 means slow convergence).</p>
+        
+        <h3>Optional: Warm start</h3>
+        <p>Pass <code>"initial_ranks": {"url": rank, ...}</code> (for example the previous <code>results</code>)
+        to start iterating from an earlier solution; nodes are matched by URL. With <code>"graph_id"</code> the
+        server stores each solution and reuses it automatically on the next request with the same id.
+        <code>solver_stats.warm_start</code> is true only if the solver actually started from that solution;
+        <code>"monte_carlo"</code>, <code>"blockrank"</code> and <code>"scc"</code> always start fresh.</p>
+        
+        <h3>Optional: Stored graphs</h3>
+        <p>Add <code>"save_snapshot": true</code> to either endpoint to store the crawled or uploaded graph on
+        disk; the response then includes a <code>snapshot_id</code>. Later requests can send
+        <code>"snapshot_id"</code> instead of <code>urls</code> / <code>adjacency_matrix</code>, and the graph is
+        memory-mapped instead of being rebuilt or re-crawled (responses for stored graphs omit
+        <code>adjacency_matrix</code> and <code>network_metrics</code>).
+        <code>GET /api/graph-snapshots/&lt;id&gt;</code> returns its size and <code>DELETE</code> removes it.</p>
+
+        <h3>Result cache</h3>
+        <p><code>/api/pagerank-matrix</code> caches responses by graph content (the matrix is normalized, so
+        <code>1</code> and <code>1.0</code> are the same graph) together with every other request parameter.
+        A repeated request is answered from memory and carries the header <code>X-Result-Cache: hit</code>.
+        Requests with <code>graph_id</code>, <code>initial_ranks</code> or <code>save_snapshot</code> are always
+        recomputed. The cache is LRU, bounded by <code>PAGERANK_RESULT_CACHE_BYTES</code> (default 64 MB);
+        <code>GET /api/result-cache</code> reports entries, bytes, hits, misses and evictions, and
+        <code>DELETE</code> clears it.</p>
+        <p>Crawled pages are cached too: the out-links of each page are kept for
+        <code>PAGERANK_PAGE_CACHE_TTL</code> seconds (default 3600, bounded by
+        <code>PAGERANK_PAGE_CACHE_BYTES</code>, default 16 MB), see <code>GET / DELETE /api/page-cache</code>.
+        Both caches live in the backend named by <code>PAGERANK_CACHE_BACKEND</code>: <code>memory</code>
+        (default, one copy per gunicorn worker), <code>sqlite:////path/cache.db</code> (one file shared by
+        all workers on the host; put it on <code>/dev/shm</code> to keep it in RAM) or
+        <code>redis://[:password@]host:port/db</code> (shared across hosts; size limit and LRU come from the
+        Redis <code>maxmemory</code> settings, and the <code>*_BYTES</code> variables are rejected). If the SQLite file or Redis server is unreachable, lookups
+        become misses and the cache endpoints answer 503 with <code>"available": false</code>.</p>
+        <p>Concurrent crawls are shared: identical <code>/api/pagerank</code> requests that arrive while one is
+        running wait for it and return its response (header <code>X-Coalesced: true</code>), and a page already
+        being fetched for another request is not fetched again. Nothing is kept once the running work
+        finishes.</p>
+        
+        <h3>3. Batched personalized PageRank</h3>
+        <code>POST /api/personalized-pagerank</code>
+        <p>Solves personalized PageRank for many seed sets (<code>seed_sets</code>, teleport spread evenly over the
+        seeds) and/or teleport distributions (<code>teleport_vectors</code>, objects mapping URL to weight) in one
+        batched solve. Pass <code>adjacency_matrix</code> or let the server crawl <code>urls</code> once;
+        <code>top_k</code> limits the entries returned per personalization.</p>
+        <pre>
+{
+  "urls": ["https://example.com", "https://example.org", "https://example.net"],
+  "adjacency_matrix": [[0, 1, 1], [1, 0, 0], [0, 1, 0]],
+  "seed_sets": [["https://example.com"], ["https://example.org", "https://example.net"]],
+  "teleport_vectors": [{"https://example.com": 0.7, "https://example.net": 0.3}],
+  "top_k": 10
+}
+        </pre>
+        
+        <h3>4. Incremental graph sessions</h3>
+        <code>POST /api/graph-sessions</code>
+        <p>Stores a graph on the server (<code>urls</code> plus <code>adjacency_matrix</code> or
+        <code>edges</code> as <code>[source_url, target_url]</code> pairs) and returns its ranks and a
+        <code>session_id</code>.</p>
+        <code>POST /api/graph-sessions/&lt;session_id&gt;/edges</code>
+        <p>Adds / removes edges and returns updated ranks without a full recomputation. Ranks are repaired by
+        pushing the residual from the changed nodes; new URLs, large changes, or a push that would cost more than a
+        cold solve (<code>work_fraction</code> &gt; 1) fall back to a warm-started full solve.
+        <code>update_stats.error_bound</code> bounds the L1 error against the exact ranks. <code>GET</code> / <code>DELETE /api/graph-sessions/&lt;session_id&gt;</code> read or drop a session.</p>
+        <code>POST /api/graph-sessions/&lt;session_id&gt;/related</code>
+        <p>Pages most related to <code>source</code>: local personalized PageRank by forward push. Work grows with
+        <code>1 / epsilon</code> (default 1e-4, at least 1e-6), not with graph size; returns the <code>top_k</code>
+        (default 10) entries.</p>
+        <code>POST /api/graph-sessions/&lt;session_id&gt;/target-rank</code>
+        <p>Estimated PageRank of one <code>target</code> page (or its personalized PageRank from <code>source</code>)
+        by backward push over in-links, without solving the whole graph. Absolute error is within
+        <code>epsilon</code> (default 1e-4, at least 1e-6); with <code>walks</code> &gt; 0 the push stops earlier and random walks
+        estimate the rest, the bound then holding with probability <code>confidence</code> (default 0.95).</p>
+        <pre>
+{
+  "add": [["https://example.com", "https://example.net"]],
+  "remove": [["https://example.org", "https://example.com"]]
 }
         </pre>
     </body>
     </html>
     """
 
+def graph_response_fields(adjacency_matrix, urls, snapshot, data):
+    """Các trường mô tả đồ thị trong response của /api/pagerank và /api/pagerank-matrix
+    
+    Đồ thị gửi trong request (hoặc vừa crawl) được trả lại kèm network metrics, và được lưu
+    thành snapshot nếu request có save_snapshot. Đồ thị lấy từ snapshot có thể rất lớn nên
+    chỉ trả về snapshot_id.
+    """
+    if snapshot is not None:
+        return {'snapshot_id': data['snapshot_id']}
+    fields = {
+        'adjacency_matrix': adjacency_matrix,
+        'network_metrics': calculate_network_metrics(adjacency_matrix, urls),
+    }
+    if data.get('save_snapshot'):
+        fields['snapshot_id'] = add_graph_snapshot(adjacency_matrix, urls)
+    return fields
+
+def cached_body_response(body):
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['X-Result-Cache'] = 'hit'
+    return response
+
+def cached_json_response(cache_key, response):
+    """jsonify response và lưu body vào cache kết quả nếu request được phép cache"""
+    response = jsonify(response)
+    if cache_key is not None:
+        _result_cache.put(cache_key, response.get_data())
+        response.headers['X-Result-Cache'] = 'miss'
+    return response
+
+@app.route('/api/graph-snapshots/<snapshot_id>', methods=['GET', 'DELETE'])
+def graph_snapshot(snapshot_id):
+    """Thông tin của snapshot đồ thị đã lưu, hoặc xóa snapshot"""
+    if request.method == 'DELETE':
+        if not delete_graph_snapshot(snapshot_id):
+            return jsonify({'error': 'Graph snapshot not found'}), 404
+        return jsonify({'snapshot_id': snapshot_id, 'deleted': True})
+    
+    snapshot = get_graph_snapshot(snapshot_id)
+    if snapshot is None:
+        return jsonify({'error': 'Graph snapshot not found'}), 404
+    adjacency, urls = snapshot
+    return jsonify({
+        'snapshot_id': snapshot_id,
+        'total_urls': len(urls),
+        'total_edges': adjacency.nnz,
+    })
+
 @app.route('/api/pagerank', methods=['POST'])
 def pagerank():
-    """API endpoint để tính PageRank"""
+    """API endpoint để tính PageRank
+    
+    Các request giống hệt nhau đến cùng lúc chỉ crawl và tính một lần: request đến sau
+    chờ request đang chạy và nhận cùng response (header X-Coalesced).
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    def compute():
+        response = app.make_response(pagerank_response(data))
+        return response.get_data(), response.status_code
+    
+    (body, status), shared = _pagerank_requests.do(json.dumps(data, sort_keys=True), compute)
+    response = app.response_class(body, status=status, mimetype='application/json')
+    if shared:
+        response.headers['X-Coalesced'] = 'true'
+    return response
+
+def pagerank_response(data):
+    """Crawl (hoặc mở snapshot) và tính PageRank cho body của một request /api/pagerank"""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-            
+        # Đồ thị đã lưu: dùng snapshot thay vì crawl lại
+        snapshot = None
+        if data.get('snapshot_id') is not None:
+            snapshot = get_graph_snapshot(data['snapshot_id'])
+            if snapshot is None:
+                return jsonify({'error': 'Graph snapshot not found'}), 404
+        
         urls = data.get('urls', [])
-        if not urls:
+        if not urls and snapshot is None:
             return jsonify({'error': 'No URLs provided'}), 400
         
         # Lấy các tham số tùy chọn
         damping_factor = data.get('damping_factor', 0.85)
         max_iterations = data.get('max_iterations', 100)
         
-        # Validate URLs
-        valid_urls = [url for url in urls if is_valid_url(url)]
-        if not valid_urls:
-            return jsonify({'error': 'No valid URLs provided'}), 400
+        try:
+            solver, solver_options = parse_solver_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Chuẩn hóa URLs
-        normalized_urls = [normalize_url(url) for url in valid_urls]
+        # Warm start: vector khởi tạo theo URL, hoặc nghiệm đã lưu của graph_id
+        graph_id = data.get('graph_id')
+        initial_ranks = data.get('initial_ranks')
+        if initial_ranks is not None and not isinstance(initial_ranks, dict):
+            return jsonify({'error': 'initial_ranks must be an object mapping URL to rank'}), 400
         
-        # Loại bỏ duplicates
-        unique_urls = list(dict.fromkeys(normalized_urls))
-        
-        if len(unique_urls) != len(normalized_urls):
-            logger.info(f"Removed {len(normalized_urls) - len(unique_urls)} duplicate URLs")
-        
-        # Xây dựng ma trận kề
-        adjacency_matrix, url_to_index = build_adjacency_matrix(unique_urls)
+        if snapshot is not None:
+            adjacency_matrix, unique_urls = snapshot
+        else:
+            # Validate URLs
+            valid_urls = [url for url in urls if is_valid_url(url)]
+            if not valid_urls:
+                return jsonify({'error': 'No valid URLs provided'}), 400
+            
+            # Chuẩn hóa URLs
+            normalized_urls = [normalize_url(url) for url in valid_urls]
+            
+            # Loại bỏ duplicates
+            deduplicated = list(dict.fromkeys(normalized_urls))
+            
+            if len(deduplicated) != len(normalized_urls):
+                logger.info(f"Removed {len(normalized_urls) - len(deduplicated)} duplicate URLs")
+            
+            # Xây dựng ma trận kề; bảng URL dùng chung cho crawl, tính toán và response
+            adjacency_matrix, unique_urls = build_adjacency_matrix(deduplicated)
         
         # Tính PageRank
-        results = calculate_pagerank_from_matrix(adjacency_matrix, unique_urls, damping_factor, max_iterations)
+        results, solver_stats = run_pagerank(
+            adjacency_matrix, unique_urls, damping_factor, max_iterations, solver, solver_options,
+            graph_id=graph_id, initial_ranks=initial_ranks, compare_baseline=bool(data.get('compare_baseline')))
+        diagnostics = solver_stats.pop('diagnostics')
         
-        network_metrics = calculate_network_metrics(adjacency_matrix, unique_urls)
-
-        return jsonify({
+        response = {
             'results': [{'url': url, 'rank': float(rank)} for url, rank in results],
             'total_urls': len(unique_urls),
             'damping_factor': damping_factor,
             'max_iterations': max_iterations,
-            'adjacency_matrix': adjacency_matrix,
-            'network_metrics': network_metrics
-        })
+            'iterations': solver_stats['iterations'],
+            'solver': solver,
+            'solver_stats': solver_stats,
+            'diagnostics': diagnostics,
+            'graph_id': graph_id,
+        }
+        response.update(graph_response_fields(adjacency_matrix, unique_urls, snapshot, data))
+        return jsonify(response)
         
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
@@ -282,33 +817,391 @@ def pagerank():
 def pagerank_matrix():
     """API endpoint để tính PageRank từ ma trận kề thủ công"""
     try:
+        body_digest = request_body_digest(request.get_data())
+        body = lookup_result_alias(body_digest)
+        if body is not None:
+            return cached_body_response(body)
+        
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No data provided'}), 400
             
-        urls = data.get('urls', [])
-        adjacency_matrix = data.get('adjacency_matrix', [])
-        
-        if not urls or not adjacency_matrix:
-            return jsonify({'error': 'URLs and adjacency matrix are required'}), 400
+        snapshot = None
+        if data.get('snapshot_id') is not None:
+            snapshot = get_graph_snapshot(data['snapshot_id'])
+            if snapshot is None:
+                return jsonify({'error': 'Graph snapshot not found'}), 404
+            adjacency_matrix, urls = snapshot
+        else:
+            urls = data.get('urls', [])
+            adjacency_matrix = data.get('adjacency_matrix', [])
+            
+            if not urls or not adjacency_matrix:
+                return jsonify({'error': 'URLs and adjacency matrix are required'}), 400
+            
+            if len(adjacency_matrix) != len(urls):
+                return jsonify({'error': 'Adjacency matrix size must match number of URLs'}), 400
         
-        if len(adjacency_matrix) != len(urls):
-            return jsonify({'error': 'Adjacency matrix size must match number of URLs'}), 400
+        # Kết quả chỉ phụ thuộc nội dung request, trừ khi có warm start (nghiệm lưu theo
+        # graph_id) hoặc tạo snapshot mới; khi đó luôn tính lại
+        cache_key = None
+        if not any(data.get(key) is not None for key in ('graph_id', 'initial_ranks', 'save_snapshot')):
+            graph_key = (b'snapshot:' + data['snapshot_id'].encode('utf-8') if snapshot is not None
+                         else graph_fingerprint(adjacency_matrix, urls))
+            cache_key = result_cache_key(data, graph_key)
+            # Alias bỏ qua bước kiểm tra snapshot còn tồn tại, nên chỉ dùng cho đồ thị gửi kèm
+            # request (body của request snapshot vốn nhỏ, không có gì để tiết kiệm)
+            if snapshot is None:
+                remember_result_alias(body_digest, cache_key)
+            body = _result_cache.get(cache_key)
+            if body is not None:
+                return cached_body_response(body)
         
         damping_factor = data.get('damping_factor', 0.85)
         max_iterations = data.get('max_iterations', 100)
         
-        results = calculate_pagerank_from_matrix(adjacency_matrix, urls, damping_factor, max_iterations)
+        # Quét nhiều damping factor trong một lần giải
+        damping_factors = data.get('damping_factors')
+        if damping_factors is not None:
+            if not isinstance(damping_factors, list) or not damping_factors:
+                return jsonify({'error': 'damping_factors must be a non-empty list'}), 400
+            if not all(isinstance(d, (int, float)) and 0 < d < 1 for d in damping_factors):
+                return jsonify({'error': 'Each damping factor must be between 0 and 1'}), 400
+            
+            sweep_results, sweep_stats = calculate_pagerank_damping_sweep(
+                adjacency_matrix, urls, damping_factors, max_iterations)
+            
+            response = {
+                'sweep': [{
+                    'damping_factor': d,
+                    'results': [{'url': url, 'rank': float(rank)} for url, rank in results],
+                    'iterations': iterations,
+                    'converged': converged,
+                } for d, results, iterations, converged in zip(
+                    damping_factors, sweep_results, sweep_stats['iterations'], sweep_stats['converged'])],
+                'rank_correlations': {'method': 'spearman', 'matrix': sweep_stats['spearman']},
+                'total_urls': len(urls),
+                'damping_factors': damping_factors,
+                'max_iterations': max_iterations,
+            }
+            response.update(graph_response_fields(adjacency_matrix, urls, snapshot, data))
+            return cached_json_response(cache_key, response)
+        
+        try:
+            solver, solver_options = parse_solver_options(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        network_metrics = calculate_network_metrics(adjacency_matrix, urls)
+        # Warm start: vector khởi tạo theo URL, hoặc nghiệm đã lưu của graph_id
+        graph_id = data.get('graph_id')
+        initial_ranks = data.get('initial_ranks')
+        if initial_ranks is not None and not isinstance(initial_ranks, dict):
+            return jsonify({'error': 'initial_ranks must be an object mapping URL to rank'}), 400
+        
+        results, solver_stats = run_pagerank(
+            adjacency_matrix, urls, damping_factor, max_iterations, solver, solver_options,
+            graph_id=graph_id, initial_ranks=initial_ranks, compare_baseline=bool(data.get('compare_baseline')))
+        diagnostics = solver_stats.pop('diagnostics')
+        
+        response = {
+            'results': [{'url': url, 'rank': float(rank)} for url, rank in results],
+            'total_urls': len(urls),
+            'damping_factor': damping_factor,
+            'max_iterations': max_iterations,
+            'iterations': solver_stats['iterations'],
+            'solver': solver,
+            'solver_stats': solver_stats,
+            'diagnostics': diagnostics,
+            'graph_id': graph_id,
+        }
+        response.update(graph_response_fields(adjacency_matrix, urls, snapshot, data))
+        return cached_json_response(cache_key, response)
+        
+    except Exception as e:
+        logger.error(f"Server error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def cache_stats_response(cache):
+    """Thống kê của cache; 503 khi backend (SQLite / Redis) không truy cập được"""
+    stats = cache.stats()
+    return jsonify(stats), 200 if stats.get('available', True) else 503
+
+@app.route('/api/result-cache', methods=['GET', 'DELETE'])
+def result_cache():
+    """Thống kê cache kết quả của /api/pagerank-matrix (hit / miss / byte), hoặc xóa cache"""
+    if request.method == 'DELETE':
+        _result_cache.clear()
+    return cache_stats_response(_result_cache)
 
+@app.route('/api/page-cache', methods=['GET', 'DELETE'])
+def page_cache():
+    """Thống kê cache outlink của các trang đã crawl, hoặc xóa cache"""
+    if request.method == 'DELETE':
+        _page_cache.clear()
+    return cache_stats_response(_page_cache)
+
+@app.route('/api/personalized-pagerank', methods=['POST'])
+def personalized_pagerank():
+    """API endpoint để tính personalized PageRank cho nhiều seed set trên cùng một đồ thị"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        urls = data.get('urls', [])
+        if not urls:
+            return jsonify({'error': 'No URLs provided'}), 400
+        
+        # Mỗi phần tử: list URL (seed set, teleport đều) hoặc object url -> weight
+        personalizations = list(data.get('seed_sets', [])) + list(data.get('teleport_vectors', []))
+        if not personalizations:
+            return jsonify({'error': 'seed_sets or teleport_vectors are required'}), 400
+        if not all(isinstance(p, (list, dict)) for p in personalizations):
+            return jsonify({'error': 'Each seed set must be a list of URLs and each teleport vector an object'}), 400
+        
+        damping_factor = data.get('damping_factor', 0.85)
+        max_iterations = data.get('max_iterations', 100)
+        top_k = data.get('top_k')
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        
+        adjacency_matrix = data.get('adjacency_matrix')
+        if adjacency_matrix is None:
+            # Không có ma trận: crawl một lần rồi dùng chung cho mọi seed set
+            valid_urls = [normalize_url(url) for url in urls if is_valid_url(url)]
+            if not valid_urls:
+                return jsonify({'error': 'No valid URLs provided'}), 400
+            urls = list(dict.fromkeys(valid_urls))
+            personalizations = [
+                {normalize_url(url): weight for url, weight in p.items()} if isinstance(p, dict)
+                else [normalize_url(url) for url in p]
+                for p in personalizations
+            ]
+            adjacency_matrix, urls = build_adjacency_matrix(urls)
+        elif len(adjacency_matrix) != len(urls):
+            return jsonify({'error': 'Adjacency matrix size must match number of URLs'}), 400
+        
+        try:
+            batch_results, stats = calculate_personalized_pagerank_batch(
+                adjacency_matrix, urls, personalizations, damping_factor, max_iterations, top_k=top_k)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         return jsonify({
-            'results': [{'url': url, 'rank': float(rank)} for url, rank in results],
+            'personalized_results': [
+                {
+                    'personalization': personalization,
+                    'results': [{'url': url, 'rank': float(rank)} for url, rank in results],
+                    'iterations': iterations,
+                    'converged': converged,
+                }
+                for personalization, results, iterations, converged
+                in zip(personalizations, batch_results, stats['iterations'], stats['converged'])
+            ],
             'total_urls': len(urls),
             'damping_factor': damping_factor,
             'max_iterations': max_iterations,
-            'adjacency_matrix': adjacency_matrix,
-            'network_metrics': network_metrics
+        })
+        
+    except Exception as e:
+        logger.error(f"Server error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def parse_edge_list(edges):
+    """Kiểm tra danh sách cạnh dạng [[source_url, target_url], ...]"""
+    if not isinstance(edges, list):
+        raise ValueError('Edges must be a list of [source_url, target_url] pairs')
+    parsed = []
+    for edge in edges:
+        if not isinstance(edge, (list, tuple)) or len(edge) != 2 or not all(isinstance(url, str) for url in edge):
+            raise ValueError('Edges must be a list of [source_url, target_url] pairs')
+        parsed.append((edge[0], edge[1]))
+    return parsed
+
+def graph_session_response(session_id, session, update_stats=None):
+    response = {
+        'session_id': session_id,
+        'results': [{'url': url, 'rank': float(rank)} for url, rank in session.results()],
+        'total_urls': session.n,
+        'total_edges': session.num_edges,
+        'damping_factor': session.damping_factor,
+    }
+    if update_stats is not None:
+        response['update_stats'] = update_stats
+    return jsonify(response)
+
+@app.route('/api/graph-sessions', methods=['POST'])
+def create_graph_session():
+    """Tạo graph session từ ma trận kề hoặc danh sách cạnh để cập nhật PageRank tăng dần"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        urls = data.get('urls', [])
+        adjacency_matrix = data.get('adjacency_matrix')
+        edges = data.get('edges')
+        if not urls or (adjacency_matrix is None and edges is None):
+            return jsonify({'error': 'URLs and adjacency matrix or edges are required'}), 400
+        
+        urls = list(dict.fromkeys(urls))
+        if adjacency_matrix is not None:
+            if len(adjacency_matrix) != len(urls):
+                return jsonify({'error': 'Adjacency matrix size must match number of URLs'}), 400
+            adjacency = adjacency_matrix
+        else:
+            try:
+                edges = parse_edge_list(edges)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            url_to_index = {url: i for i, url in enumerate(urls)}
+            edges = [(url_to_index[s], url_to_index[t]) for s, t in edges
+                     if s in url_to_index and t in url_to_index]
+            adjacency = CSRMatrix.from_edges([s for s, _ in edges], [t for _, t in edges], (len(urls), len(urls)))
+        
+        session = PageRankSession(urls, adjacency,
+                                  damping_factor=data.get('damping_factor', 0.85),
+                                  tolerance=data.get('tolerance', 1e-6),
+                                  max_iterations=data.get('max_iterations', 100))
+        session_id = add_graph_session(session)
+        return graph_session_response(session_id, session)
+        
+    except Exception as e:
+        logger.error(f"Server error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/graph-sessions/<session_id>', methods=['GET', 'DELETE'])
+def graph_session(session_id):
+    """Lấy PageRank hiện tại của session hoặc xóa session"""
+    session = get_graph_session(session_id)
+    if session is None:
+        return jsonify({'error': 'Graph session not found'}), 404
+    
+    if request.method == 'DELETE':
+        with _graph_sessions_lock:
+            _graph_sessions.pop(session_id, None)
+        return jsonify({'session_id': session_id, 'deleted': True})
+    
+    with session.lock:
+        return graph_session_response(session_id, session)
+
+@app.route('/api/graph-sessions/<session_id>/edges', methods=['POST'])
+def update_graph_session(session_id):
+    """Thêm / xóa cạnh của session và trả về PageRank đã cập nhật"""
+    try:
+        session = get_graph_session(session_id)
+        if session is None:
+            return jsonify({'error': 'Graph session not found'}), 404
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        try:
+            add_edges = parse_edge_list(data.get('add', []))
+            remove_edges = parse_edge_list(data.get('remove', []))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        with session.lock:
+            update_stats = session.update(add_edges, remove_edges)
+            return graph_session_response(session_id, session, update_stats)
+        
+    except Exception as e:
+        logger.error(f"Server error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/graph-sessions/<session_id>/related', methods=['POST'])
+def related_pages(session_id):
+    """Các trang liên quan nhất tới một URL nguồn (personalized PageRank cục bộ, forward push)"""
+    try:
+        session = get_graph_session(session_id)
+        if session is None:
+            return jsonify({'error': 'Graph session not found'}), 404
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        source = data.get('source')
+        epsilon = data.get('epsilon', 1e-4)
+        top_k = data.get('top_k', 10)
+        if source is None:
+            return jsonify({'error': 'source is required'}), 400
+        if not isinstance(source, str):
+            return jsonify({'error': 'source must be a URL string'}), 400
+        if not is_number(epsilon) or epsilon <= 0:
+            return jsonify({'error': 'epsilon must be a positive number'}), 400
+        if epsilon < GRAPH_SESSION_MIN_EPSILON:
+            return jsonify({'error': f'epsilon must be at least {GRAPH_SESSION_MIN_EPSILON}'}), 400
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        
+        with session.lock:
+            if source not in session.url_to_index:
+                return jsonify({'error': f"Unknown source URL: {source}"}), 404
+            results, stats = session.related(source, epsilon, top_k)
+        
+        return jsonify({
+            'session_id': session_id,
+            'source': source,
+            'epsilon': epsilon,
+            'results': [{'url': url, 'score': float(score)} for url, score in results],
+            'stats': stats,
+        })
+        
+    except Exception as e:
+        logger.error(f"Server error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/graph-sessions/<session_id>/target-rank', methods=['POST'])
+def target_rank(session_id):
+    """Ước lượng PageRank của một trang đích (backward push, có thể kết hợp random walk)"""
+    try:
+        session = get_graph_session(session_id)
+        if session is None:
+            return jsonify({'error': 'Graph session not found'}), 404
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        target = data.get('target')
+        source = data.get('source')
+        epsilon = data.get('epsilon', 1e-4)
+        walks = data.get('walks', 0)
+        confidence = data.get('confidence', 0.95)
+        seed = data.get('seed')
+        if target is None:
+            return jsonify({'error': 'target is required'}), 400
+        if not isinstance(target, str):
+            return jsonify({'error': 'target must be a URL string'}), 400
+        if source is not None and not isinstance(source, str):
+            return jsonify({'error': 'source must be a URL string'}), 400
+        if not is_number(epsilon) or epsilon <= 0:
+            return jsonify({'error': 'epsilon must be a positive number'}), 400
+        if epsilon < GRAPH_SESSION_MIN_EPSILON:
+            return jsonify({'error': f'epsilon must be at least {GRAPH_SESSION_MIN_EPSILON}'}), 400
+        if not isinstance(walks, int) or isinstance(walks, bool) or walks < 0:
+            return jsonify({'error': 'walks must be a non-negative integer'}), 400
+        if not is_number(confidence) or not 0 < confidence < 1:
+            return jsonify({'error': 'confidence must be between 0 and 1'}), 400
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            return jsonify({'error': 'seed must be a non-negative integer'}), 400
+        
+        with session.lock:
+            for url in (target, source):
+                if url is not None and url not in session.url_to_index:
+                    return jsonify({'error': f"Unknown URL: {url}"}), 404
+            estimate, stats = session.target_rank(target, source, epsilon, walks, confidence, seed)
+        
+        return jsonify({
+            'session_id': session_id,
+            'target': target,
+            'source': source,
+            'estimate': estimate,
+            'epsilon': epsilon,
+            'stats': stats,
         })
         
     except Exception as e:
@@ -317,7 +1210,9 @@ def pagerank_matrix():
 
 
 def calculate_network_metrics(adjacency_matrix, urls):
-    """Tính toán các metrics của network"""
+    """Tính toán các metrics của network (ma trận dense, không nhận CompressedGraph)"""
+    if isinstance(adjacency_matrix, CompressedGraph):
+        raise TypeError("Network metrics need a dense adjacency matrix, not a CompressedGraph")
     n = len(urls)
     
     # Convert to numpy for easier computation
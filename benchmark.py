@@ -0,0 +1,617 @@
+"""Benchmark các solver PageRank trên đồ thị scale-free tổng hợp
+
+Chạy: python benchmark.py acceleration --nodes 2000 --damping 0.95
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from cache import create_cache
+from graph_storage import (CSRMatrix, CompressedGraph, NODE_ORDERINGS, URLTable, build_transition_matrix,
+                           load_graph_snapshot, permute_nodes, save_graph_snapshot, write_edge_file)
+from solvers import PAGERANK_SOLVERS, calculate_pagerank_from_matrix
+from solvers.bsp import _bsp_pagerank, bsp_bfs, bsp_hits
+from solvers.out_of_core import compressed_pagerank, out_of_core_pagerank
+from solvers.parallel import PARALLEL_MAX_WORKERS, _parallel_power_iteration
+from solvers.power import _power_iteration
+
+
+def scale_free_adjacency(n, out_links=3, reciprocity=0.3, seed=42):
+    """Sinh ma trận kề (CSRMatrix) scale-free bằng preferential attachment có hướng
+
+    Mỗi node mới trỏ tới ``out_links`` node cũ (chọn theo in-degree), một phần
+    link được trỏ ngược lại để đồ thị có chu trình như web thật.
+    """
+    rng = np.random.default_rng(seed)
+    core = min(out_links + 1, n)
+    sources = [i for i in range(core) for j in range(core) if i != j]
+    targets = [j for i in range(core) for j in range(core) if i != j]
+    # Mỗi lần xuất hiện trong pool tương ứng một đơn vị in-degree
+    pool = [j for j in range(core) for _ in range(out_links)]
+    for i in range(core, n):
+        chosen = set()
+        while len(chosen) < out_links:
+            chosen.add(pool[rng.integers(len(pool))])
+        for j in chosen:
+            sources.append(i)
+            targets.append(j)
+            if rng.random() < reciprocity:
+                sources.append(j)
+                targets.append(i)
+        pool.extend(chosen)
+        pool.append(i)
+    return CSRMatrix.from_edges(sources, targets, (n, n))
+
+
+def host_structured_adjacency(n, hosts, out_links=3, inter_host=0.1, seed=42):
+    """Đồ thị nhiều host: mỗi host là một đồ thị scale-free riêng, một tỉ lệ ``inter_host``
+    cạnh được nối lại tới một trang của host khác (chọn theo in-degree, như link thật)
+
+    Trả về (CSRMatrix, urls) với URL mang host của từng trang.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.full(hosts, n // hosts) + (np.arange(hosts) < n % hosts)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    sources, targets, urls = [], [], []
+    for host, size in enumerate(sizes):
+        block = scale_free_adjacency(int(size), out_links, seed=seed + host)
+        sources.append(block._row_ids + offsets[host])
+        targets.append(block.indices + offsets[host])
+        urls += [f"https://site{host}.example/page{i}" for i in range(size)]
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    host_of = np.repeat(np.arange(hosts), sizes)
+
+    rewire = np.flatnonzero(rng.random(len(targets)) < inter_host)
+    # Đích mới: đích của một cạnh ngẫu nhiên (ưu tiên trang nhiều in-link) thuộc host khác
+    candidates = targets[rng.integers(0, len(targets), len(rewire))]
+    other_host = host_of[candidates] != host_of[sources[rewire]]
+    targets[rewire[other_host]] = candidates[other_host]
+    return CSRMatrix.from_edges(sources, targets, (n, n)), urls
+
+
+def community_chain_adjacency(communities, size, bridges=3, seed=42):
+    """Chuỗi các cộng đồng scale-free, mỗi cộng đồng chỉ có ``bridges`` link sang cộng đồng kế
+    tiếp: DAG thành phần sâu, power iteration hội tụ chậm khi damping gần 1"""
+    rng = np.random.default_rng(seed)
+    sources, targets = [], []
+    for community in range(communities):
+        block = scale_free_adjacency(size, seed=seed + community)
+        sources.append(block._row_ids + community * size)
+        targets.append(block.indices + community * size)
+        if community + 1 < communities:
+            sources.append(rng.integers(0, size, bridges) + community * size)
+            targets.append(rng.integers(0, size, bridges) + (community + 1) * size)
+    n = communities * size
+    return CSRMatrix.from_edges(np.concatenate(sources), np.concatenate(targets), (n, n))
+
+
+def partial_crawl(adjacency, crawled, seed=42):
+    """Giữ out-link của một tỉ lệ ``crawled`` trang, các trang còn lại (chưa crawl) thành dangling"""
+    rng = np.random.default_rng(seed)
+    keep = (rng.random(adjacency.shape[0]) < crawled)[adjacency._row_ids]
+    return CSRMatrix.from_edges(adjacency._row_ids[keep], adjacency.indices[keep], adjacency.shape)
+
+
+def synthetic_urls(n):
+    return [f"https://site{i % 50}.example/page{i}" for i in range(n)]
+
+
+def timed(func, repeat=3):
+    """Chạy func nhiều lần, trả về (kết quả lần cuối, thời gian tốt nhất)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def exact_pagerank(adjacency, damping, dense_limit=3000):
+    """Nghiệm tham chiếu: giải trực tiếp hệ tuyến tính với đồ thị nhỏ, power iteration
+    với tolerance 1e-14 với đồ thị lớn (chỉ dùng để đối chiếu độ chính xác)"""
+    transition, dangling = build_transition_matrix(adjacency)
+    n = transition.shape[0]
+    if n > dense_limit:
+        solution, _ = _power_iteration(transition, dangling, damping, 100000, 1e-14)
+        return solution
+    google = damping * transition.toarray()
+    google[:, dangling] += damping / n
+    solution = np.linalg.solve(np.eye(n) - google, np.full(n, (1 - damping) / n))
+    return solution / solution.sum()
+
+
+def ranks_by_index(results, urls):
+    """Chuyển kết quả [(url, rank)] về vector theo thứ tự urls"""
+    ranks = dict(results)
+    return np.array([ranks[url] for url in urls])
+
+
+def bench_acceleration(args):
+    adjacency = scale_free_adjacency(args.nodes, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping}")
+    print(f"{'method':<12}{'iterations':>12}{'time (ms)':>12}{'speedup':>10}")
+
+    baseline_time = None
+    for method in (None, 'aitken', 'quadratic'):
+        (_, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+            adjacency, urls, args.damping, args.max_iterations, args.tolerance,
+            acceleration=method, return_stats=True))
+        if baseline_time is None:
+            baseline_time = elapsed
+        print(f"{method or 'none':<12}{stats['iterations']:>12}{elapsed * 1000:>12.1f}"
+              f"{baseline_time / elapsed:>9.2f}x")
+
+
+def bench_adaptive(args):
+    adjacency = scale_free_adjacency(args.nodes, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    exact = exact_pagerank(adjacency, args.damping)
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping} tolerance={args.tolerance}")
+    print(f"{'solver':<12}{'iterations':>12}{'work':>8}{'time (ms)':>12}{'L1 error':>12}")
+
+    for solver in ('power', 'adaptive'):
+        (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+            adjacency, urls, args.damping, args.max_iterations, args.tolerance,
+            solver=solver, return_stats=True))
+        error = np.abs(ranks_by_index(results, urls) - exact).sum()
+        work = stats.get('work_fraction', 1.0)
+        print(f"{solver:<12}{stats['iterations']:>12}{work:>8.2f}{elapsed * 1000:>12.1f}{error:>12.2e}")
+
+
+def bench_monte_carlo(args):
+    adjacency = scale_free_adjacency(args.nodes, out_links=args.out_links, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    (results, stats), power_time = timed(lambda: calculate_pagerank_from_matrix(
+        adjacency, urls, args.damping, args.max_iterations, args.tolerance, return_stats=True), repeat=1)
+    exact = ranks_by_index(results, urls)
+    top = set(np.argsort(-exact)[:args.top_k])
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping} "
+          f"power: {stats['iterations']} iterations, {power_time * 1000:.1f} ms")
+    print(f"{'walks/node':<12}{'time (ms)':>12}{'L1 error':>12}{f'top-{args.top_k}':>10}{'coverage':>10}")
+    
+    for walks in (5, 10, 20, 40):
+        (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+            adjacency, urls, args.damping, args.max_iterations, solver='monte_carlo', return_stats=True,
+            walks_per_node=walks, workers=args.workers, seed=args.seed), repeat=1)
+        estimate = ranks_by_index(results, urls)
+        overlap = len(top & set(np.argsort(-estimate)[:args.top_k])) / args.top_k
+        # Tỉ lệ node trong top-k có rank chính xác nằm trong khoảng tin cậy
+        intervals = stats['confidence_intervals']
+        covered = np.mean([intervals[urls[i]][0] <= exact[i] <= intervals[urls[i]][1] for i in top])
+        print(f"{walks:<12}{elapsed * 1000:>12.1f}{np.abs(estimate - exact).sum():>12.2e}"
+              f"{overlap:>10.2f}{covered:>10.2f}")
+
+
+def bench_top_k(args):
+    adjacency = scale_free_adjacency(args.nodes, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    exact = [url for url, _ in calculate_pagerank_from_matrix(adjacency, urls, args.damping, 100000, 1e-14)]
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping}")
+    print(f"{'tolerance':<12}{'top_k':>6}{'full it':>9}{'top-k it':>10}{'certified':>11}{'full (ms)':>11}"
+          f"{'top-k (ms)':>12}{'order ok':>10}")
+    
+    for tolerance in (1e-6, 1e-8, 1e-10):
+        (_, full_stats), full_time = timed(lambda: calculate_pagerank_from_matrix(
+            adjacency, urls, args.damping, args.max_iterations, tolerance, return_stats=True))
+        for top_k in (3, 10, 50):
+            (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+                adjacency, urls, args.damping, args.max_iterations, tolerance, return_stats=True, top_k=top_k))
+            order_ok = [url for url, _ in results] == exact[:top_k]
+            print(f"{tolerance:<12.0e}{top_k:>6}{full_stats['iterations']:>9}{stats['iterations']:>10}"
+                  f"{str(stats['top_k_certified']):>11}{full_time * 1000:>11.1f}{elapsed * 1000:>12.1f}{str(order_ok):>10}")
+
+
+def bench_blockrank(args):
+    adjacency, urls = host_structured_adjacency(args.nodes, args.hosts, inter_host=args.inter_host, seed=args.seed)
+    exact = exact_pagerank(adjacency, args.damping)
+    print(f"nodes={args.nodes} edges={adjacency.nnz} hosts={args.hosts} inter-host={args.inter_host} "
+          f"damping={args.damping} tolerance={args.tolerance}")
+    print(f"{'solver':<12}{'iterations':>12}{'local':>8}{'host':>8}{'time (ms)':>12}{'L1 error':>12}")
+
+    for solver in ('power', 'blockrank'):
+        (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+            adjacency, urls, args.damping, args.max_iterations, args.tolerance,
+            solver=solver, return_stats=True))
+        error = np.abs(ranks_by_index(results, urls) - exact).sum()
+        print(f"{solver:<12}{stats['iterations']:>12}{stats.get('local_iterations', '-'):>8}"
+              f"{stats.get('host_iterations', '-'):>8}{elapsed * 1000:>12.1f}{error:>12.2e}")
+
+
+def bench_scc(args):
+    communities = max(1, args.nodes // args.community_size)
+    adjacency = community_chain_adjacency(communities, args.community_size, seed=args.seed)
+    urls = synthetic_urls(adjacency.shape[0])
+    print(f"nodes={adjacency.shape[0]} edges={adjacency.nnz} communities={communities} tolerance={args.tolerance}")
+    print(f"{'damping':<10}{'solver':<8}{'iterations':>12}{'time (ms)':>12}{'L1 error':>12}")
+
+    for damping in (0.85, 0.95, 0.99):
+        exact = exact_pagerank(adjacency, damping)
+        for solver in ('power', 'scc'):
+            (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+                adjacency, urls, damping, args.max_iterations, args.tolerance,
+                solver=solver, return_stats=True), repeat=1)
+            error = np.abs(ranks_by_index(results, urls) - exact).sum()
+            print(f"{damping:<10}{solver:<8}{stats['iterations']:>12}{elapsed * 1000:>12.1f}{error:>12.2e}")
+
+
+def bench_lumping(args):
+    urls = synthetic_urls(args.nodes)
+    print(f"nodes={args.nodes} damping={args.damping} tolerance={args.tolerance}")
+    print(f"{'crawled':<10}{'dangling':>10}{'solver':>8}{'iterations':>12}{'time (ms)':>12}{'L1 error':>12}")
+
+    for crawled in (1.0, 0.5, 0.3):
+        adjacency = partial_crawl(scale_free_adjacency(args.nodes, seed=args.seed), crawled, seed=args.seed)
+        exact = exact_pagerank(adjacency, args.damping)
+        for solver in ('power', 'lumped'):
+            (results, stats), elapsed = timed(lambda: calculate_pagerank_from_matrix(
+                adjacency, urls, args.damping, args.max_iterations, args.tolerance,
+                solver=solver, return_stats=True))
+            error = np.abs(ranks_by_index(results, urls) - exact).sum()
+            dangling = np.mean(adjacency.row_sums() == 0)
+            print(f"{crawled:<10}{dangling:>10.2f}{solver:>8}{stats['iterations']:>12}{elapsed * 1000:>12.1f}"
+                  f"{error:>12.2e}")
+
+
+def bench_mixed_precision(args):
+    print(f"damping={args.damping} tolerance={args.tolerance} out_links={args.out_links}")
+    print(f"{'nodes':<10}{'solver':>16}{'iterations':>12}{'float32':>9}{'time (ms)':>12}{'SpMV MB':>9}"
+          f"{'peak heap MB':>14}{'L1 vs float64':>15}")
+
+    for n in (args.nodes, args.nodes * 10, args.nodes * 100):
+        adjacency = scale_free_adjacency(n, out_links=args.out_links, seed=args.seed)
+        transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+        reference, _ = _power_iteration(transition_matrix, dangling_nodes, args.damping,
+                                        args.max_iterations, args.tolerance)
+        for solver in ('power', 'mixed_precision'):
+            function = PAGERANK_SOLVERS[solver][0]
+            (pagerank, stats), elapsed = timed(lambda: function(
+                transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance))
+            # Bộ nhớ cấp phát thêm trong lúc giải (ma trận đã có sẵn)
+            tracemalloc.start()
+            function(transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            spmv_bytes = stats.get('spmv_bytes_float32', transition_matrix.data.nbytes
+                                   + transition_matrix.indices.nbytes + transition_matrix._row_ids.nbytes)
+            print(f"{n:<10}{solver:>16}{stats['iterations']:>12}{stats.get('float32_iterations', 0):>9}"
+                  f"{elapsed * 1000:>12.1f}{spmv_bytes / 2 ** 20:>9.1f}{peak / 2 ** 20:>14.1f}"
+                  f"{np.abs(pagerank - reference).sum():>15.2e}")
+
+
+def bench_parallel(args):
+    adjacency = scale_free_adjacency(args.nodes, out_links=args.out_links, seed=args.seed)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping} tolerance={args.tolerance} "
+          f"cpus={os.cpu_count()}")
+    (_, stats), serial = timed(lambda: _power_iteration(
+        transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance))
+    print(f"serial power iteration: {stats['iterations']} iterations, {serial * 1000:.1f} ms")
+    print(f"{'workers':<10}{'blocks':>8}{'iterations':>12}{'time (ms)':>12}{'speedup':>10}{'identical':>11}")
+
+    baseline = None
+    reference = None
+    for workers in (1, 2, 4, 8, 16):
+        # Lần chạy đầu khởi động pool, không tính vào thời gian
+        _parallel_power_iteration(transition_matrix, dangling_nodes, args.damping, 1, args.tolerance,
+                                  workers=workers)
+        (pagerank, stats), elapsed = timed(lambda: _parallel_power_iteration(
+            transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance, workers=workers))
+        baseline = baseline or elapsed
+        reference = pagerank if reference is None else reference
+        print(f"{workers:<10}{stats['blocks']:>8}{stats['iterations']:>12}{elapsed * 1000:>12.1f}"
+              f"{baseline / elapsed:>10.2f}{str(np.array_equal(pagerank, reference)):>11}")
+
+
+def bench_bsp(args):
+    adjacency, _ = host_structured_adjacency(args.nodes, args.hosts, seed=args.seed)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    exact, _ = _power_iteration(transition_matrix, dangling_nodes, args.damping, args.max_iterations,
+                                args.tolerance * 1e-3)
+    (_, stats), serial = timed(lambda: _power_iteration(
+        transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance))
+    print(f"nodes={args.nodes} edges={adjacency.nnz} hosts={args.hosts} "
+          f"workers={min(args.workers, PARALLEL_MAX_WORKERS)} "
+          f"damping={args.damping} tolerance={args.tolerance}")
+    print(f"in-process power iteration: {stats['iterations']} iterations, {serial * 1000:.1f} ms")
+    print(f"{'program':<10}{'partitioning':>19}{'edge cut':>10}{'supersteps':>12}{'boundary msgs':>15}"
+          f"{'time (ms)':>12}{'error':>11}")
+
+    # HITS tham chiếu: cùng phép cập nhật đồng thời như calculate_hits_scores
+    transposed = adjacency.transpose()
+    hub, authority = np.ones(args.nodes), np.ones(args.nodes)
+    for _ in range(20):
+        hub, authority = adjacency @ authority, transposed @ hub
+        hub, authority = hub / np.linalg.norm(hub), authority / np.linalg.norm(authority)
+
+    for partitioning in ('hash', 'label_propagation'):
+        runs = [
+            ('pagerank', lambda: _bsp_pagerank(
+                transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance,
+                workers=args.workers, partitioning=partitioning),
+             lambda result: np.abs(result[0] - exact).sum()),
+            ('hits', lambda: bsp_hits(adjacency, 20, args.workers, partitioning),
+             lambda result: max(np.abs(result[0] - hub).max(), np.abs(result[1] - authority).max())),
+            ('bfs', lambda: bsp_bfs(adjacency, 0, args.workers, partitioning),
+             lambda result: float('nan')),
+        ]
+        for program, run, error in runs:
+            result, elapsed = timed(run, repeat=1)
+            stats = result[-1]
+            print(f"{program:<10}{partitioning:>19}{stats['edge_cut']:>10.3f}{stats['supersteps']:>12}"
+                  f"{stats['boundary_messages']:>15}{elapsed * 1000:>12.1f}{error(result):>11.2e}")
+
+
+def bench_out_of_core(args):
+    adjacency = scale_free_adjacency(args.nodes, out_links=args.out_links, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    (results, stats), in_memory = timed(lambda: calculate_pagerank_from_matrix(
+        adjacency, urls, args.damping, args.max_iterations, args.tolerance, return_stats=True), repeat=1)
+    reference = ranks_by_index(results, urls)
+    csr_bytes = adjacency.indptr.nbytes + adjacency.indices.nbytes + adjacency.data.nbytes
+    print(f"nodes={args.nodes} edges={adjacency.nnz} damping={args.damping} tolerance={args.tolerance}")
+    print(f"in-memory: {stats['iterations']} iterations, {in_memory * 1000:.1f} ms, CSR {csr_bytes / 2 ** 20:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'edges.bin')
+        write_edge_file(path, args.nodes, adjacency._row_ids, adjacency.indices)
+        print(f"edge file: {os.path.getsize(path) / 2 ** 20:.1f} MB")
+        print(f"{'block edges':<14}{'iterations':>12}{'time (ms)':>12}{'edges/s':>12}{'peak heap MB':>14}{'L1 vs in-memory':>17}")
+        for block_edges in args.block_edges:
+            tracemalloc.start()
+            start = time.perf_counter()
+            pagerank, stats = out_of_core_pagerank(path, args.damping, args.max_iterations, args.tolerance,
+                                                   block_edges=block_edges)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{block_edges:<14}{stats['iterations']:>12}{elapsed * 1000:>12.1f}{stats['edges_per_second']:>12.3g}"
+                  f"{peak / 2 ** 20:>14.1f}{np.abs(pagerank - reference).sum():>17.2e}")
+
+
+def bench_snapshot(args):
+    adjacency = scale_free_adjacency(args.nodes, out_links=args.out_links, seed=args.seed)
+    urls = synthetic_urls(args.nodes)
+    print(f"nodes={args.nodes} edges={adjacency.nnz}")
+    _, rebuild = timed(lambda: CSRMatrix.from_edges(adjacency._row_ids, adjacency.indices, adjacency.shape))
+    print(f"rebuild CSR from edge list: {rebuild * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'graph.snapshot')
+        _, save = timed(lambda: save_graph_snapshot(path, adjacency, urls), repeat=1)
+        print(f"save snapshot: {save * 1000:.1f} ms, {os.path.getsize(path) / 2 ** 20:.1f} MB")
+        (loaded, loaded_urls), load = timed(lambda: load_graph_snapshot(path))
+        print(f"load snapshot (np.memmap): {load * 1000:.2f} ms")
+        transition_matrix, dangling_nodes = build_transition_matrix(loaded)
+        pagerank, _ = _power_iteration(transition_matrix, dangling_nodes, args.damping, args.max_iterations,
+                                       args.tolerance)
+        reference, _ = _power_iteration(*build_transition_matrix(adjacency), args.damping,
+                                        args.max_iterations, args.tolerance)
+        print(f"identical ranks: {np.array_equal(pagerank, reference)}, "
+              f"URLs round-trip: {list(loaded_urls) == urls}")
+
+
+def bench_compressed(args):
+    adjacency, _ = host_structured_adjacency(args.nodes, args.hosts, out_links=args.out_links, seed=args.seed)
+    out_weight = adjacency.row_sums()
+    in_links = adjacency.transpose()
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    csr_bytes = in_links.indptr.nbytes + in_links.indices.nbytes + in_links.data.nbytes
+    vector = np.random.default_rng(args.seed).random(args.nodes)
+    _, csr_spmv = timed(lambda: in_links @ vector)
+    (reference, stats), csr_solve = timed(lambda: _power_iteration(
+        transition_matrix, dangling_nodes, args.damping, args.max_iterations, args.tolerance), repeat=1)
+    print(f"nodes={args.nodes} edges={adjacency.nnz} hosts={args.hosts} damping={args.damping}")
+    print(f"CSR in-links: {csr_bytes / 2 ** 20:.1f} MB ({csr_bytes * 8 / adjacency.nnz:.1f} bits/edge), "
+          f"SpMV {csr_spmv * 1000:.1f} ms, PageRank {stats['iterations']} iterations {csr_solve * 1000:.0f} ms")
+    print(f"{'block rows':<12}{'MB':>8}{'bits/edge':>11}{'ratio':>8}{'encode (ms)':>13}{'SpMV (ms)':>11}"
+          f"{'slowdown':>10}{'PageRank (ms)':>15}{'L1 vs CSR':>11}")
+
+    for block_rows in args.block_rows:
+        graph, encode = timed(lambda: CompressedGraph.from_csr(in_links, block_rows=block_rows), repeat=1)
+        _, spmv = timed(lambda: graph @ vector)
+        (pagerank, _), solve = timed(lambda: compressed_pagerank(
+            graph, out_weight, args.damping, args.max_iterations, args.tolerance), repeat=1)
+        print(f"{block_rows:<12}{graph.nbytes / 2 ** 20:>8.1f}{graph.nbytes * 8 / adjacency.nnz:>11.1f}"
+              f"{csr_bytes / graph.nbytes:>8.1f}{encode * 1000:>13.0f}{spmv * 1000:>11.1f}{spmv / csr_spmv:>10.1f}"
+              f"{solve * 1000:>15.0f}{np.abs(pagerank - reference).sum():>11.2e}")
+
+
+def crawl_like_urls(n, hosts=200, seed=42):
+    """URL giống crawl thật: nhiều trang mỗi host, đường dẫn nhiều cấp có tiền tố chung"""
+    rng = np.random.default_rng(seed)
+    sections = ['news', 'blog', 'products', 'docs', 'category/electronics', 'category/books']
+    host_ids, section_ids, items = rng.integers(0, hosts, n), rng.integers(0, len(sections), n), rng.permutation(n)
+    return [f"https://www.host{host}.example.com/{sections[section]}/item-{item}.html"
+            for host, section, item in zip(host_ids.tolist(), section_ids.tolist(), items.tolist())]
+
+
+def bench_url_table(args):
+    urls = crawl_like_urls(args.nodes, seed=args.seed)
+    raw = sum(len(url.encode('utf-8')) for url in urls)
+    print(f"urls={args.nodes} raw UTF-8 {raw / 2 ** 20:.1f} MB")
+
+    tracemalloc.start()
+    copies = [url.encode('utf-8').decode('utf-8') for url in urls]
+    url_to_index = {url: i for i, url in enumerate(copies)}
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    URLTable.from_urls(urls)
+    table_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    table, build = timed(lambda: URLTable.from_urls(urls), repeat=1)
+    print(f"list + dict: {python_bytes / 2 ** 20:.1f} MB")
+    print(f"URLTable: {table.nbytes / 2 ** 20:.1f} MB ({table.nbytes / args.nodes:.1f} bytes/URL), "
+          f"build {build * 1000:.0f} ms (peak {table_peak / 2 ** 20:.1f} MB)")
+
+    rng = np.random.default_rng(args.seed)
+    probes = [urls[i] for i in rng.integers(0, args.nodes, args.lookups)]
+    ids = rng.integers(0, args.nodes, args.lookups).tolist()
+    _, dict_lookup = timed(lambda: [url_to_index[url] for url in probes])
+    _, table_lookup = timed(lambda: [table.get(url) for url in probes])
+    _, list_access = timed(lambda: [copies[i] for i in ids])
+    _, table_access = timed(lambda: [table[i] for i in ids])
+    _, table_iterate = timed(lambda: list(table), repeat=1)
+    print(f"URL -> id: dict {dict_lookup / args.lookups * 1e6:.2f} us, URLTable {table_lookup / args.lookups * 1e6:.2f} us")
+    print(f"id -> URL: list {list_access / args.lookups * 1e6:.2f} us, URLTable {table_access / args.lookups * 1e6:.2f} us")
+    print(f"iterate all URLs: {table_iterate * 1000:.0f} ms, "
+          f"all correct: {all(table.get(url) == i for i, url in enumerate(urls[:args.lookups]))}")
+
+
+def bench_reorder(args):
+    # Thứ tự đến của crawl thật xen kẽ các host: trộn ngẫu nhiên thứ tự node của đồ thị nhiều host
+    adjacency, urls = host_structured_adjacency(args.nodes, args.hosts, out_links=args.out_links, seed=args.seed)
+    shuffle = np.random.default_rng(args.seed).permutation(args.nodes)
+    adjacency = permute_nodes(adjacency, shuffle)
+    urls = [urls[i] for i in shuffle]
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    print(f"nodes={args.nodes} hosts={args.hosts} edges={adjacency.nnz} damping={args.damping} "
+          f"iterations={args.iterations}")
+    print(f"{'ordering':<10}{'reorder (ms)':>14}{'mean |i-j|':>12}{'ms/iteration':>14}{'speedup':>9}{'L1 vs crawl':>13}")
+
+    baseline = reference = None
+    for name in ('crawl',) + tuple(NODE_ORDERINGS):
+        if name == 'crawl':
+            order, reorder_time = np.arange(args.nodes), 0.0
+        else:
+            order, reorder_time = timed(lambda: NODE_ORDERINGS[name](transition_matrix, urls), repeat=1)
+        matrix = permute_nodes(transition_matrix, order)
+        inverse = np.empty(args.nodes, dtype=np.int64)
+        inverse[order] = np.arange(args.nodes)
+        dangling = np.sort(inverse[dangling_nodes])
+        # tolerance 0: đúng args.iterations vòng cho mọi thứ tự
+        (pagerank, _), elapsed = timed(lambda: _power_iteration(
+            matrix, dangling, args.damping, args.iterations, 0.0))
+        pagerank = pagerank[inverse]
+        per_iteration = elapsed / args.iterations
+        if baseline is None:
+            baseline, reference = per_iteration, pagerank
+        spread = np.abs(matrix._row_ids - matrix.indices).mean()
+        print(f"{name:<10}{reorder_time * 1000:>14.1f}{spread:>12.0f}{per_iteration * 1000:>14.2f}"
+              f"{baseline / per_iteration:>9.2f}{np.abs(pagerank - reference).sum():>13.2e}")
+
+
+def _cache_worker_hits(backend, keys, max_bytes):
+    """Chạy trong process khác: số khóa tìm thấy trong một instance cache mới của backend"""
+    cache = create_cache(backend, 'bench', max_bytes)
+    return sum(cache.get(key) is not None for key in keys)
+
+
+def bench_cache_backends(args):
+    directory = tempfile.mkdtemp()
+    backends = {
+        'memory': 'memory',
+        'sqlite': f"sqlite:///{os.path.join(directory, 'cache.db')}",
+    }
+    # Chỉ đo Redis khi có server thật (--redis-url); chỉ đụng tới các khóa namespace 'bench'
+    if args.redis_url:
+        backends['redis'] = args.redis_url
+    rng = np.random.default_rng(args.seed)
+    values = [rng.bytes(args.value_bytes) for _ in range(args.entries)]
+    keys = [f"key-{i}" for i in range(args.entries)]
+    max_bytes = 2 * args.entries * args.value_bytes
+    print(f"entries={args.entries} value={args.value_bytes} B workers={args.workers} "
+          f"redis={args.redis_url or 'skipped (no --redis-url)'}")
+    print(f"{'backend':<10}{'put (us)':>10}{'get (us)':>10}{'miss (us)':>11}{'other-worker hits':>19}")
+
+    context = multiprocessing.get_context('fork')
+    for name, url in backends.items():
+        # Redis tự giới hạn bộ nhớ (maxmemory)
+        limit = None if name == 'redis' else max_bytes
+        cache = create_cache(url, 'bench', limit)
+        cache.clear()
+        start = time.perf_counter()
+        for key, value in zip(keys, values):
+            cache.put(key, value)
+        put = (time.perf_counter() - start) / args.entries
+        (found, get) = timed(lambda: [cache.get(key) for key in keys], repeat=1)
+        assert all(a == b for a, b in zip(found, values))
+        _, miss = timed(lambda: [cache.get(f"absent-{i}") for i in range(args.entries)], repeat=1)
+        # Worker khác (process khác) mở cache của cùng backend và tra lại các khóa vừa lưu
+        with context.Pool(args.workers) as pool:
+            hits = sum(pool.starmap(_cache_worker_hits, [(url, keys, limit)] * args.workers))
+        print(f"{name:<10}{put * 1e6:>10.1f}{get / args.entries * 1e6:>10.1f}{miss / args.entries * 1e6:>11.1f}"
+              f"{hits / (args.workers * args.entries):>18.0%}")
+        cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--damping', type=float, default=0.95)
+    parser.add_argument('--max-iterations', type=int, default=1000)
+    parser.add_argument('--tolerance', type=float, default=1e-8)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    subparsers.add_parser('acceleration', help='Aitken / quadratic extrapolation vs power iteration')
+    subparsers.add_parser('adaptive', help='Adaptive PageRank vs power iteration, checked against exact solve')
+    subparsers.add_parser('top-k', help='Top-k early termination vs full convergence')
+    blockrank = subparsers.add_parser('blockrank', help='BlockRank vs power iteration on a multi-host graph')
+    blockrank.add_argument('--hosts', type=int, default=50)
+    blockrank.add_argument('--inter-host', type=float, default=0.1)
+    scc = subparsers.add_parser('scc', help='SCC-decomposed solve vs power iteration on chained communities')
+    scc.add_argument('--community-size', type=int, default=2000)
+    subparsers.add_parser('lumping', help='Dangling-node lumping vs power iteration on partial crawls')
+    mixed_precision = subparsers.add_parser('mixed-precision', help='float32 + float64 refinement vs float64 power')
+    mixed_precision.add_argument('--out-links', type=int, default=8)
+    parallel = subparsers.add_parser('parallel', help='Shared-memory parallel power iteration at 1-16 workers')
+    parallel.add_argument('--out-links', type=int, default=8)
+    bsp = subparsers.add_parser('bsp', help='Pregel-style BSP engine: PageRank, HITS, BFS by partitioning')
+    bsp.add_argument('--hosts', type=int, default=32)
+    bsp.add_argument('--workers', type=int, default=4)
+    out_of_core = subparsers.add_parser('out-of-core', help='Streaming PageRank over a memory-mapped edge file')
+    out_of_core.add_argument('--out-links', type=int, default=8)
+    out_of_core.add_argument('--block-edges', type=int, nargs='+', default=[1 << 16, 1 << 18, 1 << 20, 1 << 22])
+    snapshot = subparsers.add_parser('snapshot', help='Binary graph snapshot save / mmap load vs rebuilding CSR')
+    snapshot.add_argument('--out-links', type=int, default=10)
+    compressed = subparsers.add_parser('compressed', help='Gap/varint compressed graph: size vs SpMV speed')
+    compressed.add_argument('--hosts', type=int, default=100)
+    compressed.add_argument('--out-links', type=int, default=10)
+    compressed.add_argument('--block-rows', type=int, nargs='+', default=[1 << 10, 1 << 12, 1 << 14, 1 << 16])
+    reorder = subparsers.add_parser('reorder', help='Degree / RCM / host node ordering vs crawl order')
+    reorder.add_argument('--hosts', type=int, default=200)
+    reorder.add_argument('--out-links', type=int, default=8)
+    reorder.add_argument('--iterations', type=int, default=20)
+    cache_backends = subparsers.add_parser('cache-backends', help='memory / SQLite / Redis cache backends')
+    cache_backends.add_argument('--entries', type=int, default=2000)
+    cache_backends.add_argument('--value-bytes', type=int, default=16384)
+    cache_backends.add_argument('--workers', type=int, default=4)
+    cache_backends.add_argument('--redis-url', default=os.environ.get('PAGERANK_BENCH_REDIS_URL'),
+                                help='redis://host:port/db of a real Redis server (default $PAGERANK_BENCH_REDIS_URL)')
+    url_table = subparsers.add_parser('url-table', help='Front-coded URL table vs list + dict')
+    url_table.add_argument('--lookups', type=int, default=100000)
+    monte_carlo = subparsers.add_parser('monte-carlo', help='Monte Carlo preview vs power iteration')
+    monte_carlo.add_argument('--out-links', type=int, default=3)
+    monte_carlo.add_argument('--workers', type=int, default=1)
+    monte_carlo.add_argument('--top-k', type=int, default=100)
+
+    args = parser.parse_args()
+    {
+        'acceleration': bench_acceleration,
+        'adaptive': bench_adaptive,
+        'monte-carlo': bench_monte_carlo,
+        'top-k': bench_top_k,
+        'blockrank': bench_blockrank,
+        'scc': bench_scc,
+        'lumping': bench_lumping,
+        'mixed-precision': bench_mixed_precision,
+        'parallel': bench_parallel,
+        'bsp': bench_bsp,
+        'out-of-core': bench_out_of_core,
+        'snapshot': bench_snapshot,
+        'compressed': bench_compressed,
+        'url-table': bench_url_table,
+        'reorder': bench_reorder,
+        'cache-backends': bench_cache_backends,
+    }[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
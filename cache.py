@@ -0,0 +1,366 @@
+"""Các backend cache (memory / SQLite / Redis) dùng chung giao diện get / put / clear / stats"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+def _hit_rate(hits, misses):
+    return hits / (hits + misses) if hits + misses else 0.0
+
+class MemoryCache:
+    """Cache LRU trong process giới hạn theo tổng số byte của các giá trị, an toàn giữa các thread
+    
+    ttl (giây) tùy chọn: phần tử quá hạn được coi như không có.
+    """
+    
+    backend = 'memory'
+    
+    def __init__(self, max_bytes, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[key]
+                self.nbytes -= len(entry[0])
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value):
+        """Lưu value; giá trị lớn hơn cả giới hạn thì không lưu"""
+        if len(value) > self.max_bytes:
+            return
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous[0])
+            self._entries[key] = (value, expires)
+            self.nbytes += len(value)
+            while self.nbytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': _hit_rate(self.hits, self.misses),
+                'evictions': self.evictions,
+            }
+
+class SQLiteCache:
+    """Cache LRU trong một file SQLite, dùng chung giữa các process trên cùng máy
+    
+    Mỗi namespace là một bảng; tổng byte và bộ đếm hit / miss / eviction nằm trong bảng
+    <namespace>_stats nên cũng dùng chung giữa các worker. Mỗi thread của mỗi process mở
+    kết nối riêng (kết nối SQLite không được dùng lại sau fork).
+    """
+    
+    backend = 'sqlite'
+    
+    def __init__(self, path, namespace, max_bytes, ttl=None):
+        self.path = path
+        self.table = f'cache_{namespace}'
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+    
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                               f'size INTEGER NOT NULL, expires REAL, last_used REAL NOT NULL)')
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_lru ON {self.table} (last_used)')
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {self.table}_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            connection.execute(f"INSERT OR IGNORE INTO {self.table}_stats VALUES "
+                               f"('bytes', 0), ('hits', 0), ('misses', 0), ('evictions', 0)")
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+    
+    def _count(self, connection, name, delta=1):
+        connection.execute(f'UPDATE {self.table}_stats SET value = value + ? WHERE name = ?', (delta, name))
+    
+    def get(self, key):
+        try:
+            connection = self._connection()
+            now = time.time()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                row = connection.execute(f'SELECT value, size, expires FROM {self.table} WHERE key = ?',
+                                         (key,)).fetchone()
+                if row is not None and row[2] is not None and row[2] <= now:
+                    connection.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                    self._count(connection, 'bytes', -row[1])
+                    row = None
+                if row is None:
+                    self._count(connection, 'misses')
+                    return None
+                connection.execute(f'UPDATE {self.table} SET last_used = ? WHERE key = ?', (now, key))
+                self._count(connection, 'hits')
+                return bytes(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache unavailable ({self.path}): {e}")
+            return None
+    
+    def put(self, key, value):
+        """Lưu value rồi loại các phần tử dùng lâu nhất cho tới khi tổng byte không vượt giới hạn"""
+        if len(value) > self.max_bytes:
+            return
+        try:
+            connection = self._connection()
+            now = time.time()
+            expires = now + self.ttl if self.ttl is not None else None
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                previous = connection.execute(f'SELECT size FROM {self.table} WHERE key = ?', (key,)).fetchone()
+                connection.execute(f'INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)',
+                                   (key, value, len(value), expires, now))
+                self._count(connection, 'bytes', len(value) - (previous[0] if previous else 0))
+                total = connection.execute(f"SELECT value FROM {self.table}_stats WHERE name = 'bytes'").fetchone()[0]
+                while total > self.max_bytes:
+                    oldest = connection.execute(f'SELECT key, size FROM {self.table} WHERE key != ? '
+                                                f'ORDER BY last_used LIMIT 64', (key,)).fetchall()
+                    if not oldest:
+                        break
+                    evicted, freed = [], 0
+                    for old_key, size in oldest:
+                        evicted.append((old_key,))
+                        freed += size
+                        if total - freed <= self.max_bytes:
+                            break
+                    connection.executemany(f'DELETE FROM {self.table} WHERE key = ?', evicted)
+                    self._count(connection, 'bytes', -freed)
+                    self._count(connection, 'evictions', len(evicted))
+                    total -= freed
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache unavailable ({self.path}): {e}")
+    
+    def clear(self):
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(f'DELETE FROM {self.table}')
+                connection.execute(f"UPDATE {self.table}_stats SET value = 0 WHERE name = 'bytes'")
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache unavailable ({self.path}): {e}")
+    
+    def stats(self):
+        try:
+            connection = self._connection()
+            counters = dict(connection.execute(f'SELECT name, value FROM {self.table}_stats'))
+            entries = connection.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache unavailable ({self.path}): {e}")
+            return {'backend': self.backend, 'available': False, 'error': str(e)}
+        return {
+            'backend': self.backend,
+            'entries': entries,
+            'bytes': counters['bytes'],
+            'max_bytes': self.max_bytes,
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'hit_rate': _hit_rate(counters['hits'], counters['misses']),
+            'evictions': counters['evictions'],
+        }
+
+class RedisError(Exception):
+    """Lỗi do server Redis trả về (reply '-ERR ...')"""
+
+class RedisCache:
+    """Cache trên server nói giao thức Redis (RESP), client tối giản qua socket
+    
+    Chỉ dùng GET / SET (PX) / INCR / SCAN / DEL / AUTH / SELECT nên chạy được với Redis thật lẫn
+    server giả lập cục bộ. Giới hạn bộ nhớ và LRU do server đảm nhận (maxmemory-policy
+    allkeys-lru); bộ đếm hit / miss là khóa INCR dùng chung giữa các worker.
+    """
+    
+    backend = 'redis'
+    
+    def __init__(self, host='localhost', port=6379, namespace='cache', db=0, password=None, ttl=None,
+                 timeout=5.0):
+        self.address = (host, port)
+        self.prefix = f'pagerank:{namespace}:'
+        self.db = db
+        self.password = password
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _stream(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = socket.create_connection(self.address, timeout=self.timeout)
+            stream = connection.makefile('rwb')
+            setup = [('AUTH', self.password)] if self.password else []
+            if self.db:
+                setup.append(('SELECT', self.db))
+            try:
+                self._roundtrip(stream, setup)
+            except BaseException:
+                connection.close()
+                raise
+            local.connection, local.stream, local.pid = connection, stream, os.getpid()
+        return local.stream
+    
+    @staticmethod
+    def _encode(command):
+        parts = [b'*%d\r\n' % len(command)]
+        for argument in command:
+            if not isinstance(argument, bytes):
+                argument = str(argument).encode('utf-8')
+            parts += [b'$%d\r\n' % len(argument), argument, b'\r\n']
+        return b''.join(parts)
+    
+    @classmethod
+    def _read_reply(cls, stream):
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = stream.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            return None if length < 0 else [cls._read_reply(stream) for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+    
+    @classmethod
+    def _roundtrip(cls, stream, commands):
+        """Gửi các lệnh trong một lần ghi (pipeline) và đọc đủ mọi reply để stream không lệch"""
+        if not commands:
+            return []
+        stream.write(b''.join(cls._encode(command) for command in commands))
+        stream.flush()
+        replies, error = [], None
+        for _ in commands:
+            try:
+                replies.append(cls._read_reply(stream))
+            except RedisError as e:
+                error = error or e
+                replies.append(None)
+        if error is not None:
+            raise error
+        return replies
+    
+    def _execute(self, *commands):
+        stream = self._stream()
+        try:
+            return self._roundtrip(stream, commands)
+        except OSError:
+            # Kết nối hỏng: lần gọi sau mở kết nối mới
+            self._local.pid = None
+            self._local.connection.close()
+            raise
+    
+    def get(self, key):
+        try:
+            value, = self._execute(('GET', self.prefix + key))
+            # Bộ đếm dùng chung; cần biết hit hay miss nên tốn thêm một round trip
+            self._execute(('INCR', self.prefix + ('#hits' if value is not None else '#misses')))
+            return value
+        except (OSError, RedisError) as e:
+            logger.warning(f"Redis cache unavailable ({self.address[0]}:{self.address[1]}): {e}")
+            return None
+    
+    def put(self, key, value):
+        command = ('SET', self.prefix + key, value)
+        if self.ttl is not None:
+            command += ('PX', int(self.ttl * 1000))
+        try:
+            self._execute(command)
+        except (OSError, RedisError) as e:
+            logger.warning(f"Redis cache unavailable ({self.address[0]}:{self.address[1]}): {e}")
+    
+    def _keys(self):
+        cursor, keys = '0', []
+        while True:
+            (cursor, batch), = self._execute(('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 1000))
+            keys += [key for key in batch if b'#' not in key[len(self.prefix):]]
+            cursor = cursor.decode('utf-8')
+            if cursor == '0':
+                return keys
+    
+    def clear(self):
+        try:
+            keys = self._keys()
+            for start in range(0, len(keys), 1000):
+                self._execute(('DEL', *keys[start:start + 1000]))
+        except (OSError, RedisError) as e:
+            logger.warning(f"Redis cache unavailable ({self.address[0]}:{self.address[1]}): {e}")
+    
+    def stats(self):
+        try:
+            hits, misses = (int(value or 0) for value in self._execute(
+                ('GET', self.prefix + '#hits'), ('GET', self.prefix + '#misses')))
+            entries = len(self._keys())
+        except (OSError, RedisError) as e:
+            logger.warning(f"Redis cache unavailable ({self.address[0]}:{self.address[1]}): {e}")
+            return {'backend': self.backend, 'available': False, 'error': str(e)}
+        return {
+            'backend': self.backend,
+            'entries': entries,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': _hit_rate(hits, misses),
+        }
+
+def create_cache(url, namespace, max_bytes, ttl=None):
+    """Tạo backend cache theo URL cấu hình: 'memory', 'sqlite:///path' hoặc 'redis://[:password@]host:port/db'
+    
+    sqlite:///cache.db là đường dẫn tương đối, sqlite:////tmp/cache.db là tuyệt đối. Redis tự giới
+    hạn bộ nhớ (maxmemory) nên max_bytes phải là None.
+    """
+    if not url or url == 'memory':
+        return MemoryCache(max_bytes, ttl)
+    if url.startswith('sqlite:///'):
+        return SQLiteCache(url[len('sqlite:///'):], namespace, max_bytes, ttl)
+    parsed = urlparse(url)
+    if parsed.scheme == 'redis':
+        if max_bytes is not None:
+            raise ValueError("max_bytes is not supported by the redis cache backend (use maxmemory)")
+        return RedisCache(parsed.hostname or 'localhost', parsed.port or 6379, namespace,
+                          int(parsed.path.lstrip('/') or 0), parsed.password, ttl)
+    raise ValueError(f"Unknown cache backend: {url}")
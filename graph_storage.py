@@ -0,0 +1,741 @@
+"""Lưu trữ đồ thị: bảng URL, ma trận CSR, thứ tự node, file cạnh, snapshot và đồ thị nén trên đĩa"""
+import os
+import tempfile
+from urllib.parse import urlparse
+
+import numpy as np
+
+URL_TABLE_BUCKET = 16
+
+def _append_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _common_prefix_length(first, second):
+    """Độ dài tiền tố chung của hai bytes (tìm nhị phân bằng so sánh slice, chạy trong C)"""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+class URLTable:
+    """Từ điển URL <-> id (int32) chỉ đọc, nén front coding trong một buffer liền
+    
+    URL được sắp theo byte UTF-8 và chia thành bucket `bucket_size` URL; mỗi URL lưu
+    varint(độ dài tiền tố chung với URL trước) + varint(độ dài phần đuôi) + phần đuôi, URL
+    đầu bucket có tiền tố 0 (lưu đầy đủ). id giữ thứ tự truyền vào (trùng chỉ số hàng của
+    ma trận kề), id_to_rank / rank_to_id (int32) nối id với vị trí trong thứ tự sắp.
+    id -> URL giải mã tối đa một bucket (O(1)); URL -> id tìm nhị phân trên URL đầu bucket
+    rồi duyệt trong bucket (O(log n)).
+    """
+    
+    def __init__(self, buffer, bucket_offsets, id_to_rank, rank_to_id, bucket_size=URL_TABLE_BUCKET):
+        self.buffer = buffer
+        self.bucket_offsets = bucket_offsets
+        self.id_to_rank = id_to_rank
+        self.rank_to_id = rank_to_id
+        self.bucket_size = bucket_size
+        # Truy cập theo byte qua memoryview / list nhanh hơn nhiều so với slice mảng numpy từng phần tử
+        self._view = memoryview(buffer).cast('B') if len(buffer) else memoryview(b'')
+        self._offsets = bucket_offsets.tolist()
+    
+    @classmethod
+    def from_urls(cls, urls, bucket_size=URL_TABLE_BUCKET):
+        """Tạo bảng từ danh sách URL không trùng; id của URL là vị trí của nó trong danh sách"""
+        encoded = [url.encode('utf-8') for url in urls]
+        order = sorted(range(len(encoded)), key=encoded.__getitem__)
+        buffer = bytearray()
+        bucket_offsets = []
+        previous = None
+        for rank, index in enumerate(order):
+            current = encoded[index]
+            if current == previous:
+                raise ValueError(f"Duplicate URL: {urls[index]}")
+            prefix = 0
+            if rank % bucket_size == 0:
+                bucket_offsets.append(len(buffer))
+            else:
+                prefix = _common_prefix_length(previous, current)
+            _append_varint(buffer, prefix)
+            _append_varint(buffer, len(current) - prefix)
+            buffer += current[prefix:]
+            previous = current
+        bucket_offsets.append(len(buffer))
+        
+        rank_to_id = np.array(order, dtype=np.int32)
+        id_to_rank = np.empty(len(order), dtype=np.int32)
+        id_to_rank[rank_to_id] = np.arange(len(order), dtype=np.int32)
+        return cls(np.frombuffer(bytes(buffer), dtype=np.uint8), np.array(bucket_offsets, dtype=np.int64),
+                   id_to_rank, rank_to_id, bucket_size)
+    
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + self.bucket_offsets.nbytes + self.id_to_rank.nbytes + self.rank_to_id.nbytes
+    
+    def _bucket(self, bucket):
+        """Duyệt các URL (bytes) của một bucket theo thứ tự sắp"""
+        data = self._view[self._offsets[bucket]:self._offsets[bucket + 1]].tobytes()
+        position = 0
+        current = b''
+        while position < len(data):
+            prefix, position = _read_varint(data, position)
+            length, position = _read_varint(data, position)
+            current = current[:prefix] + data[position:position + length]
+            position += length
+            yield current
+    
+    def _bucket_head(self, bucket):
+        """URL đầu bucket (lưu đầy đủ, tiền tố 0) mà không giải mã cả bucket"""
+        # Tiền tố 0 chiếm đúng một byte, ngay sau là varint độ dài
+        start = self._offsets[bucket] + 1
+        length, position = _read_varint(self._view, start)
+        return self._view[position:position + length].tobytes()
+    
+    def __len__(self):
+        return len(self.id_to_rank)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("URL index out of range")
+        bucket, offset = divmod(int(self.id_to_rank[index]), self.bucket_size)
+        for position, url in enumerate(self._bucket(bucket)):
+            if position == offset:
+                return url.decode('utf-8')
+    
+    def __iter__(self):
+        by_rank = [url.decode('utf-8') for bucket in range(len(self.bucket_offsets) - 1) for url in self._bucket(bucket)]
+        for rank in self.id_to_rank.tolist():
+            yield by_rank[rank]
+    
+    def get(self, url, default=None):
+        """id của url, default nếu không có"""
+        key = url.encode('utf-8')
+        # Bucket cuối cùng có URL đầu <= key
+        low, high = 0, len(self._offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._bucket_head(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return default
+        bucket = low - 1
+        for position, candidate in enumerate(self._bucket(bucket)):
+            if candidate == key:
+                return int(self.rank_to_id[bucket * self.bucket_size + position])
+            if candidate > key:
+                break
+        return default
+    
+    def __contains__(self, url):
+        return isinstance(url, str) and self.get(url) is not None
+    
+    def index(self, url):
+        index = self.get(url)
+        if index is None:
+            raise ValueError(f"{url} is not in URL table")
+        return index
+
+def index_urls(urls):
+    """URLTable của danh sách URL (dùng lại nếu đã là URLTable)"""
+    return urls if isinstance(urls, URLTable) else URLTable.from_urls(urls)
+
+class CSRMatrix:
+    """Ma trận thưa dạng CSR (indptr / indices / data) chỉ dùng NumPy
+    
+    Đủ cho các phép toán mà solver cần: nhân ma trận với vector hoặc ma trận
+    (``@``), lấy khối hàng và chuyển về dense.
+    """
+    
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=float)
+        self.shape = tuple(shape)
+        self._row_ids_cache = None
+    
+    @property
+    def _row_ids(self):
+        """Chỉ số hàng của từng phần tử, dùng cho np.bincount khi nhân
+        
+        Tính ở lần dùng đầu tiên, để mở CSR từ snapshot (np.memmap) không phải đọc cả ma trận.
+        """
+        if self._row_ids_cache is None:
+            self._row_ids_cache = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return self._row_ids_cache
+    
+    @property
+    def nnz(self):
+        return len(self.data)
+    
+    @classmethod
+    def from_dense(cls, matrix):
+        matrix = np.asarray(matrix, dtype=float)
+        rows, cols = np.nonzero(matrix)
+        return cls.from_edges(rows, cols, matrix.shape, matrix[rows, cols])
+    
+    @classmethod
+    def from_edges(cls, rows, cols, shape, data=None):
+        """Tạo CSR từ danh sách cạnh (rows[k], cols[k]); cạnh trùng được cộng dồn"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        data = np.ones(len(rows)) if data is None else np.asarray(data, dtype=float)
+        
+        # Sắp xếp theo (hàng, cột) rồi gộp các cạnh trùng
+        order = np.lexsort((cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        if len(rows):
+            first = np.concatenate(([True], (np.diff(rows) != 0) | (np.diff(cols) != 0)))
+            data = np.add.reduceat(data, np.flatnonzero(first))
+            rows, cols = rows[first], cols[first]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=shape[0]))))
+        return cls(indptr, cols, data, shape)
+    
+    def transpose(self):
+        return CSRMatrix.from_edges(self.indices, self._row_ids, (self.shape[1], self.shape[0]), self.data)
+    
+    def row_sums(self):
+        return np.bincount(self._row_ids, weights=self.data, minlength=self.shape[0])
+    
+    def __matmul__(self, other):
+        other = np.asarray(other)
+        if other.ndim == 1:
+            return np.bincount(self._row_ids, weights=self.data * other[self.indices], minlength=self.shape[0])
+        # Ma trận n x k: nhân từng cột. Các cách làm 2-D thuần NumPy (reduceat, bincount
+        # trên chỉ số làm phẳng) phải tạo mảng tạm nnz x k và chậm hơn hẳn khi k lớn
+        result = np.empty((self.shape[0], other.shape[1]), order='F')
+        for column in range(other.shape[1]):
+            result[:, column] = self @ other[:, column]
+        return result
+    
+    def take_rows(self, rows):
+        """Trích khối hàng ``rows`` thành một CSRMatrix mới"""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        # Vị trí của mọi phần tử thuộc các hàng đã chọn, không cần vòng lặp Python
+        positions = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+        return CSRMatrix(indptr, self.indices[positions], self.data[positions], (len(rows), self.shape[1]))
+    
+    def toarray(self):
+        dense = np.zeros(self.shape)
+        dense[self._row_ids, self.indices] = self.data
+        return dense
+
+def build_transition_matrix(adjacency_matrix):
+    """Xây dựng transition matrix (cột ngẫu nhiên, lưu CSR) và danh sách dangling nodes
+    
+    adjacency_matrix có thể là ma trận dense (list / ndarray) hoặc CSRMatrix.
+    """
+    if isinstance(adjacency_matrix, CSRMatrix):
+        adjacency = adjacency_matrix
+    else:
+        adj = np.asarray(adjacency_matrix, dtype=float)
+        if adj.ndim != 2 or adj.shape[0] == 0:
+            return CSRMatrix([0], [], [], (0, 0)), np.zeros(0, dtype=int)
+        adjacency = CSRMatrix.from_dense(adj)
+    
+    row_sums = adjacency.row_sums()
+    dangling_nodes = np.flatnonzero(row_sums == 0)
+    
+    # Cột i là phân phối xác suất đi ra từ node i (dangling để cột 0)
+    transition_matrix = adjacency.transpose()
+    transition_matrix.data = transition_matrix.data / row_sums[transition_matrix.indices]
+    return transition_matrix, dangling_nodes
+
+def _symmetric_structure(matrix):
+    """Đồ thị vô hướng (CSR, không trọng số, không cạnh trùng) của ma trận vuông"""
+    rows = np.concatenate((matrix._row_ids, matrix.indices))
+    cols = np.concatenate((matrix.indices, matrix._row_ids))
+    return CSRMatrix.from_edges(rows, cols, matrix.shape)
+
+def degree_order(matrix, urls=None):
+    """Thứ tự node theo tổng bậc (vào + ra) giảm dần
+    
+    Hub được nhắc tới trong hầu hết các hàng nên gom chúng về đầu vector giúp phần
+    lớn phép gather x[indices] của SpMV rơi vào vài dòng cache.
+    """
+    degree = np.bincount(matrix._row_ids, minlength=matrix.shape[0]) + np.bincount(
+        matrix.indices, minlength=matrix.shape[0])
+    return np.argsort(-degree, kind='stable')
+
+def rcm_order(matrix, urls=None):
+    """Thứ tự Reverse Cuthill-McKee trên đồ thị vô hướng tương ứng
+    
+    BFS theo từng mức (vector hóa): node mới được xếp theo vị trí của cha trong thứ tự
+    rồi theo bậc tăng dần; mỗi thành phần liên thông bắt đầu từ node bậc nhỏ nhất chưa
+    thăm. Node cô lập xếp cuối trước khi đảo. Láng giềng nằm gần nhau trong thứ tự nên
+    băng thông của ma trận nhỏ lại.
+    """
+    n = matrix.shape[0]
+    graph = _symmetric_structure(matrix)
+    degree = np.diff(graph.indptr)
+    visited = degree == 0
+    order = np.empty(n, dtype=np.int64)
+    isolated = np.flatnonzero(visited)
+    order[n - len(isolated):] = isolated
+    filled = 0
+    candidates = np.argsort(degree, kind='stable')[len(isolated):].tolist()
+    
+    for start in candidates:
+        if visited[start]:
+            continue
+        visited[start] = True
+        order[filled] = start
+        level_start, filled = filled, filled + 1
+        while level_start < filled:
+            frontier = order[level_start:filled]
+            starts = graph.indptr[frontier]
+            counts = graph.indptr[frontier + 1] - starts
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            neighbors = graph.indices[np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])]
+            parents = np.repeat(np.arange(len(frontier)), counts)
+            fresh = ~visited[neighbors]
+            neighbors, parents = neighbors[fresh], parents[fresh]
+            # Node thấy từ nhiều cha giữ lần xuất hiện đầu tiên (cha đứng trước)
+            neighbors = neighbors[np.lexsort((neighbors, degree[neighbors], parents))]
+            _, first = np.unique(neighbors, return_index=True)
+            neighbors = neighbors[np.sort(first)]
+            visited[neighbors] = True
+            order[filled:filled + len(neighbors)] = neighbors
+            level_start, filled = filled, filled + len(neighbors)
+    return order[::-1].copy()
+
+def host_blocks(urls):
+    """Gán mỗi URL vào block theo host (urlparse netloc); trả về (mảng block id, danh sách host)
+    
+    Chỉ parse một lần cho mỗi tiền tố "scheme://authority" khác nhau (urlparse chậm so với
+    số lượng URL lớn, còn số host thường ít).
+    """
+    hosts = {}
+    prefix_blocks = {}
+    blocks = np.empty(len(urls), dtype=np.int64)
+    for i, url in enumerate(urls):
+        end = url.find('/', url.find('//') + 2)
+        prefix = url if end < 0 else url[:end]
+        block = prefix_blocks.get(prefix)
+        if block is None:
+            block = prefix_blocks[prefix] = hosts.setdefault(urlparse(prefix).netloc.lower(), len(hosts))
+        blocks[i] = block
+    return blocks, list(hosts)
+
+def host_order(matrix, urls):
+    """Gom node theo host, trong cùng host theo thứ tự URL (cây thư mục của site)
+    
+    Phần lớn link là nội bộ host nên các khối host gần như là khối đường chéo.
+    """
+    blocks, _ = host_blocks(urls)
+    if isinstance(urls, URLTable):
+        url_rank = urls.id_to_rank
+    else:
+        url_rank = np.empty(len(urls), dtype=np.int64)
+        url_rank[sorted(range(len(urls)), key=urls.__getitem__)] = np.arange(len(urls))
+    return np.lexsort((url_rank, blocks))
+
+NODE_ORDERINGS = {
+    'degree': degree_order,
+    'rcm': rcm_order,
+    'host': host_order,
+}
+
+def permute_nodes(matrix, order):
+    """Đánh số lại node của ma trận vuông: node order[k] thành node k (hàng và cột)"""
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.arange(len(order))
+    return CSRMatrix.from_edges(inverse[matrix._row_ids], inverse[matrix.indices], matrix.shape, matrix.data)
+
+# File cạnh nhị phân cho PageRank ngoài bộ nhớ: header 32 byte rồi các bản ghi
+# (source, target[, weight]) sắp theo source
+EDGE_FILE_MAGIC = b'PREDGES1'
+EDGE_FILE_HEADER = np.dtype([('magic', 'S8'), ('index_bytes', '<u4'), ('weighted', '<u4'),
+                             ('num_nodes', '<u8'), ('num_edges', '<u8')])
+EDGE_FILE_WRITE_CHUNK = 1 << 22
+
+def _edge_record_dtype(index_bytes, weighted):
+    index_type = f'<i{index_bytes}'
+    fields = [('source', index_type), ('target', index_type)]
+    if weighted:
+        fields.append(('weight', '<f8'))
+    return np.dtype(fields)
+
+def write_edge_file(path, num_nodes, sources, targets, weights=None):
+    """Ghi danh sách cạnh (đã sắp theo source) ra file cạnh nhị phân, từng đoạn một
+    
+    Index dùng int32 khi num_nodes < 2^31; weights=None nghĩa là mỗi bản ghi là một link
+    (cạnh lặp được tính nhiều lần, như trọng số cộng dồn của CSRMatrix.from_edges).
+    """
+    sources, targets = np.asarray(sources), np.asarray(targets)
+    if len(sources) != len(targets) or (weights is not None and len(weights) != len(sources)):
+        raise ValueError("sources, targets and weights must have the same length")
+    if len(sources) and np.any(np.diff(sources) < 0):
+        raise ValueError("Edges must be sorted by source")
+    if len(sources) and (min(sources.min(), targets.min()) < 0 or max(sources.max(), targets.max()) >= num_nodes):
+        raise ValueError("Edge endpoint out of range")
+    
+    index_bytes = 4 if num_nodes < 2 ** 31 else 8
+    record = _edge_record_dtype(index_bytes, weights is not None)
+    header = np.array([(EDGE_FILE_MAGIC, index_bytes, weights is not None, num_nodes, len(sources))],
+                      dtype=EDGE_FILE_HEADER)
+    with open(path, 'wb') as handle:
+        handle.write(header.tobytes())
+        for start in range(0, len(sources), EDGE_FILE_WRITE_CHUNK):
+            end = start + EDGE_FILE_WRITE_CHUNK
+            chunk = np.empty(len(sources[start:end]), dtype=record)
+            chunk['source'] = sources[start:end]
+            chunk['target'] = targets[start:end]
+            if weights is not None:
+                chunk['weight'] = weights[start:end]
+            handle.write(chunk.tobytes())
+
+def open_edge_file(path):
+    """Mở file cạnh bằng np.memmap (chỉ đọc), trả về (num_nodes, bản ghi cạnh)"""
+    header = np.fromfile(path, dtype=EDGE_FILE_HEADER, count=1)
+    if len(header) != 1 or header['magic'][0] != EDGE_FILE_MAGIC:
+        raise ValueError(f"Not a PageRank edge file: {path}")
+    num_nodes, num_edges = int(header['num_nodes'][0]), int(header['num_edges'][0])
+    record = _edge_record_dtype(int(header['index_bytes'][0]), bool(header['weighted'][0]))
+    if num_edges == 0:
+        return num_nodes, np.zeros(0, dtype=record)
+    return num_nodes, np.memmap(path, dtype=record, mode='r', offset=EDGE_FILE_HEADER.itemsize, shape=(num_edges,))
+
+# Snapshot đồ thị (CSR + bảng URL) trên đĩa, mở lại bằng np.memmap không cần copy.
+# Header 64 byte, sau đó các mảng liền nhau (mỗi mảng bắt đầu ở bội số 8 byte):
+# indptr int64[n + 1], indices int64[m], data float64[m] (chỉ khi có trọng số), rồi bảng URL.
+# Version 2: URLTable front coding (buffer uint8, bucket_offsets int64, id_to_rank int32[n],
+# rank_to_id int32[n]); version 1 (chỉ đọc): url_offsets int64[n + 1] + URL UTF-8 nối liền.
+GRAPH_SNAPSHOT_MAGIC = b'PRGRAPHS'
+GRAPH_SNAPSHOT_VERSION = 2
+GRAPH_SNAPSHOT_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('weighted', '<u4'), ('num_nodes', '<u8'),
+                                  ('num_edges', '<u8'), ('url_bytes', '<u8'), ('url_buckets', '<u8'),
+                                  ('url_bucket_size', '<u4'), ('reserved', 'V12')])
+
+def _write_sections_atomic(path, header, sections):
+    """Ghi header rồi các mảng liền nhau (mỗi mảng bắt đầu ở bội số 8 byte) ra path
+    
+    Atomic: ghi file tạm cùng thư mục, fsync rồi os.replace.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle = tempfile.NamedTemporaryFile(dir=directory, prefix='.snapshot-', delete=False)
+    try:
+        with handle:
+            handle.write(header.tobytes())
+            handle.write(b'\x00' * (-header.nbytes % 8))
+            for section in sections:
+                handle.write(np.ascontiguousarray(section).tobytes())
+                handle.write(b'\x00' * (-section.nbytes % 8))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(handle.name, path)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+
+def _map_sections(path, offset, layout):
+    """np.memmap (chỉ đọc) các mảng [(dtype, length), ...] ghi bởi _write_sections_atomic"""
+    offset += -offset % 8
+    sections = []
+    for dtype, length in layout:
+        if length:
+            sections.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length,)))
+        else:
+            sections.append(np.zeros(0, dtype=dtype))
+        offset += length * np.dtype(dtype).itemsize
+        offset += -offset % 8
+    return sections
+
+def save_graph_snapshot(path, adjacency_matrix, urls):
+    """Ghi đồ thị và bảng URL ra file snapshot, atomic (file tạm cùng thư mục rồi os.replace)"""
+    adjacency = adjacency_matrix if isinstance(adjacency_matrix, CSRMatrix) else CSRMatrix.from_dense(adjacency_matrix)
+    if adjacency.shape[0] != adjacency.shape[1] or adjacency.shape[0] != len(urls):
+        raise ValueError("Adjacency matrix size must match number of URLs")
+    table = index_urls(urls)
+    weighted = bool(np.any(adjacency.data != 1))
+    header = np.zeros(1, dtype=GRAPH_SNAPSHOT_HEADER)
+    for field, value in [('magic', GRAPH_SNAPSHOT_MAGIC), ('version', GRAPH_SNAPSHOT_VERSION), ('weighted', weighted),
+                         ('num_nodes', adjacency.shape[0]), ('num_edges', adjacency.nnz),
+                         ('url_bytes', len(table.buffer)), ('url_buckets', len(table.bucket_offsets) - 1),
+                         ('url_bucket_size', table.bucket_size)]:
+        header[field] = value
+    sections = [adjacency.indptr, adjacency.indices] + ([adjacency.data] if weighted else []) + [
+        table.buffer, table.bucket_offsets, table.id_to_rank, table.rank_to_id]
+    _write_sections_atomic(path, header, sections)
+
+def load_graph_snapshot(path):
+    """Mở file snapshot bằng np.memmap, trả về (CSRMatrix, URLTable) trỏ thẳng vào file"""
+    header = np.fromfile(path, dtype=GRAPH_SNAPSHOT_HEADER, count=1)
+    if len(header) != 1 or header['magic'][0] != GRAPH_SNAPSHOT_MAGIC:
+        raise ValueError(f"Not a graph snapshot: {path}")
+    version = int(header['version'][0])
+    if version not in (1, GRAPH_SNAPSHOT_VERSION):
+        raise ValueError(f"Unsupported graph snapshot version {version}")
+    n, m = int(header['num_nodes'][0]), int(header['num_edges'][0])
+    weighted = bool(header['weighted'][0])
+    url_bytes = int(header['url_bytes'][0])
+    
+    layout = [(np.int64, n + 1), (np.int64, m)] + ([(np.float64, m)] if weighted else [])
+    if version == 1:
+        layout += [(np.int64, n + 1), (np.uint8, url_bytes)]
+    else:
+        layout += [(np.uint8, url_bytes), (np.int64, int(header['url_buckets'][0]) + 1),
+                   (np.int32, n), (np.int32, n)]
+    sections = _map_sections(path, GRAPH_SNAPSHOT_HEADER.itemsize, layout)
+    indptr, indices = sections[0], sections[1]
+    # Không có trọng số: mọi cạnh bằng 1, dùng view stride 0 thay vì cấp phát mảng m phần tử
+    data = sections[2] if weighted else np.broadcast_to(np.float64(1.0), (m,))
+    
+    if version == 1:
+        offsets, encoded = sections[-2].tolist(), bytes(sections[-1])
+        table = URLTable.from_urls([encoded[start:end].decode('utf-8')
+                                    for start, end in zip(offsets[:-1], offsets[1:])])
+    else:
+        table = URLTable(*sections[-4:], bucket_size=int(header['url_bucket_size'][0]))
+    return CSRMatrix(indptr, indices, data, (n, n)), table
+
+def _varint_encode(values):
+    """Mã hóa mảng số nguyên không âm thành varint (7 bit mỗi byte, bit cao = còn byte tiếp)"""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(lengths) - lengths
+    encoded = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max()) if len(values) else 0):
+        mask = lengths > k
+        chunk = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        encoded[starts[mask] + k] = chunk | more
+    return encoded, lengths
+
+def _varint_decode(encoded):
+    """Giải mã một đoạn varint liền nhau thành mảng int64
+    
+    Mỗi giá trị kết thúc ở byte < 0x80; ghép dần các byte phía trước (nhóm 7 bit thấp hơn),
+    mỗi lượt chỉ xử lý các giá trị còn dài hơn, nên số lượt bằng độ dài varint lớn nhất.
+    """
+    encoded = np.asarray(encoded)
+    ends = np.flatnonzero(encoded < 0x80)
+    lengths = np.diff(ends, prepend=-1)
+    values = encoded[ends].astype(np.int64)
+    longer = np.flatnonzero(lengths > 1)
+    k = 1
+    while len(longer):
+        values[longer] = (values[longer] << 7) | (encoded[ends[longer] - k] & 0x7F)
+        k += 1
+        longer = longer[lengths[longer] > k]
+    return values
+
+# File CompressedGraph: header 64 byte rồi các mảng như snapshot (xem _write_sections_atomic)
+COMPRESSED_GRAPH_MAGIC = b'PRGRAPHZ'
+COMPRESSED_GRAPH_VERSION = 1
+COMPRESSED_GRAPH_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('weighted', '<u4'), ('num_rows', '<u8'),
+                                    ('num_cols', '<u8'), ('num_edges', '<u8'), ('block_rows', '<u8'),
+                                    ('degree_bytes', '<u8'), ('gap_bytes', '<u8'), ('weight_exceptions', '<u8')])
+
+class CompressedGraph:
+    """Danh sách kề nén kiểu WebGraph: gap + varint, giải nén tuần tự theo block hàng
+    
+    Mỗi hàng (danh sách cột đã sắp, không trùng) lưu phần tử đầu dưới dạng zigzag(cột - hàng)
+    và các phần tử sau dưới dạng khoảng cách - 1, tất cả mã hóa varint trong gap_bytes;
+    bậc của các hàng là một luồng varint riêng (degree_bytes). Mỗi block_rows hàng có một
+    mục chỉ mục (vị trí byte trong hai luồng, vị trí cạnh) để giải nén độc lập từng block,
+    nên duyệt / nhân ma trận chỉ cần bộ nhớ cho một block đã giải nén.
+    
+    Trọng số: mặc định mọi cạnh bằng 1; khi ít cạnh khác 1 (ví dụ link lặp) chỉ lưu các
+    ngoại lệ (weight_positions, weight_values), còn lại lưu nguyên mảng float64 data.
+    
+    calculate_pagerank_from_matrix nhận thẳng CompressedGraph (solver power, duyệt theo block).
+    calculate_network_metrics thì không: clustering coefficient cần truy cập ngẫu nhiên danh
+    sách kề nên chỉ tính trên ma trận dense của đồ thị nhỏ (đồ thị lưu trữ không trả metrics).
+    """
+    
+    def __init__(self, shape, block_rows, degree_bytes, gap_bytes, block_degree_offsets, block_gap_offsets,
+                 block_edge_offsets, data=None, weight_positions=None, weight_values=None):
+        self.shape = tuple(shape)
+        self.block_rows = block_rows
+        self.degree_bytes = degree_bytes
+        self.gap_bytes = gap_bytes
+        self.block_degree_offsets = block_degree_offsets
+        self.block_gap_offsets = block_gap_offsets
+        self.block_edge_offsets = block_edge_offsets
+        self.data = data
+        self.weight_positions = np.zeros(0, dtype=np.int64) if weight_positions is None else weight_positions
+        self.weight_values = np.zeros(0) if weight_values is None else weight_values
+    
+    @classmethod
+    def from_csr(cls, matrix, block_rows=1 << 12):
+        indptr, indices = matrix.indptr, matrix.indices
+        n = matrix.shape[0]
+        degrees = np.diff(indptr)
+        first = np.zeros(matrix.nnz, dtype=bool)
+        first[indptr[:-1][degrees > 0]] = True
+        gaps = np.empty(matrix.nnz, dtype=np.int64)
+        gaps[1:] = indices[1:] - indices[:-1] - 1
+        if np.any(gaps[~first] < 0):
+            raise ValueError("Row indices must be sorted and unique")
+        relative = indices[first] - matrix._row_ids[first]
+        gaps[first] = (relative << 1) ^ (relative >> 63)
+        
+        degree_bytes, degree_lengths = _varint_encode(degrees)
+        gap_bytes, gap_lengths = _varint_encode(gaps)
+        block_starts = np.arange(0, n + block_rows, block_rows).clip(max=n)
+        block_starts = block_starts[np.concatenate(([True], np.diff(block_starts) > 0))]
+        degree_offsets = np.concatenate(([0], np.cumsum(degree_lengths)))[block_starts]
+        gap_offsets = np.concatenate(([0], np.cumsum(gap_lengths)))[indptr[block_starts]]
+        data = weight_positions = weight_values = None
+        exceptions = np.flatnonzero(np.asarray(matrix.data) != 1)
+        # Một ngoại lệ tốn 16 byte so với 8 byte mỗi cạnh của mảng đầy đủ
+        if 2 * len(exceptions) > matrix.nnz:
+            data = np.asarray(matrix.data, dtype=np.float64).copy()
+        elif len(exceptions):
+            weight_positions, weight_values = exceptions, np.asarray(matrix.data, dtype=np.float64)[exceptions]
+        return cls(matrix.shape, block_rows, degree_bytes, gap_bytes, degree_offsets, gap_offsets,
+                   np.asarray(indptr[block_starts], dtype=np.int64), data, weight_positions, weight_values)
+    
+    @property
+    def nnz(self):
+        return int(self.block_edge_offsets[-1])
+    
+    @property
+    def nbytes(self):
+        """Tổng số byte của các mảng đang giữ (dữ liệu nén và chỉ mục block)"""
+        arrays = [self.degree_bytes, self.gap_bytes, self.block_degree_offsets, self.block_gap_offsets,
+                  self.block_edge_offsets, self.weight_positions, self.weight_values] + (
+            [self.data] if self.data is not None else [])
+        return sum(array.nbytes for array in arrays)
+    
+    def _decode_block(self, block):
+        start = block * self.block_rows
+        degrees = _varint_decode(self.degree_bytes[self.block_degree_offsets[block]:
+                                                   self.block_degree_offsets[block + 1]])
+        values = _varint_decode(self.gap_bytes[self.block_gap_offsets[block]:self.block_gap_offsets[block + 1]])
+        rows = np.flatnonzero(degrees)
+        firsts = (np.cumsum(degrees) - degrees)[rows]
+        # Cột = tổng dồn trong từng hàng: phần tử đầu là hàng + unzigzag, các phần tử sau cộng gap + 1
+        increments = values + 1
+        relative = values[firsts]
+        increments[firsts] = start + rows + ((relative >> 1) ^ -(relative & 1))
+        totals = np.cumsum(increments)
+        targets = totals - np.repeat(totals[firsts] - increments[firsts], degrees[rows])
+        return start, degrees, targets, rows, firsts
+    
+    def iter_blocks(self):
+        """Duyệt tuần tự theo block: (hàng đầu, bậc từng hàng, cột của mọi cạnh, trọng số hoặc None,
+        các hàng khác rỗng tính từ hàng đầu, vị trí cạnh đầu tiên của các hàng đó)"""
+        for block in range(len(self.block_edge_offsets) - 1):
+            start, degrees, targets, rows, firsts = self._decode_block(block)
+            first, last = self.block_edge_offsets[block], self.block_edge_offsets[block + 1]
+            weights = None
+            if self.data is not None:
+                weights = self.data[first:last]
+            elif len(self.weight_positions):
+                low, high = np.searchsorted(self.weight_positions, [first, last])
+                if high > low:
+                    weights = np.ones(last - first)
+                    weights[self.weight_positions[low:high] - first] = self.weight_values[low:high]
+            yield start, degrees, targets, weights, rows, firsts
+    
+    def neighbors(self, row):
+        """Các cột của hàng row (giải nén block chứa nó)"""
+        start, degrees, targets, _, _ = self._decode_block(row // self.block_rows)
+        offsets = np.concatenate(([0], np.cumsum(degrees)))
+        return targets[offsets[row - start]:offsets[row - start + 1]]
+    
+    def row_sums(self):
+        sums = np.zeros(self.shape[0])
+        for start, degrees, _, weights, rows, firsts in self.iter_blocks():
+            if weights is None:
+                sums[start:start + len(degrees)] = degrees
+            elif len(rows):
+                sums[start + rows] = np.add.reduceat(weights, firsts)
+        return sums
+    
+    def column_sums(self):
+        sums = np.zeros(self.shape[1])
+        for _, _, targets, weights, _, _ in self.iter_blocks():
+            sums += np.bincount(targets, weights=weights, minlength=self.shape[1])
+        return sums
+    
+    def __matmul__(self, vector):
+        """Nhân với vector theo từng block hàng, không giải nén cả ma trận"""
+        vector = np.asarray(vector)
+        result = np.zeros(self.shape[0])
+        for start, _, targets, weights, rows, firsts in self.iter_blocks():
+            if len(rows):
+                values = vector[targets] if weights is None else vector[targets] * weights
+                result[start + rows] = np.add.reduceat(values, firsts)
+        return result
+    
+    def transpose_matmul(self, vector):
+        """Nhân ma trận chuyển vị với vector (cạnh u -> v cộng vector[u] vào v) theo từng block hàng"""
+        vector = np.asarray(vector)
+        result = np.zeros(self.shape[1])
+        for start, degrees, targets, weights, _, _ in self.iter_blocks():
+            values = np.repeat(vector[start:start + len(degrees)], degrees)
+            np.add.at(result, targets, values if weights is None else values * weights)
+        return result
+    
+    def to_csr(self):
+        degrees, targets, weights = [], [], []
+        for _, block_degrees, block_targets, block_weights, _, _ in self.iter_blocks():
+            degrees.append(block_degrees)
+            targets.append(block_targets)
+            weights.append(np.ones(len(block_targets)) if block_weights is None else block_weights)
+        indptr = np.concatenate(([0], np.cumsum(np.concatenate(degrees)))) if degrees else np.zeros(1)
+        return CSRMatrix(indptr, np.concatenate(targets) if targets else [], np.concatenate(weights) if weights else [],
+                         self.shape)
+    
+    def save(self, path):
+        """Ghi ra file (atomic), mở lại bằng CompressedGraph.load"""
+        header = np.zeros(1, dtype=COMPRESSED_GRAPH_HEADER)
+        for field, value in [('magic', COMPRESSED_GRAPH_MAGIC), ('version', COMPRESSED_GRAPH_VERSION),
+                             ('weighted', self.data is not None), ('num_rows', self.shape[0]),
+                             ('num_cols', self.shape[1]), ('num_edges', self.nnz), ('block_rows', self.block_rows),
+                             ('degree_bytes', len(self.degree_bytes)), ('gap_bytes', len(self.gap_bytes)),
+                             ('weight_exceptions', len(self.weight_positions))]:
+            header[field] = value
+        sections = [self.block_degree_offsets, self.block_gap_offsets, self.block_edge_offsets,
+                    self.degree_bytes, self.gap_bytes, self.weight_positions, self.weight_values] + (
+            [self.data] if self.data is not None else [])
+        _write_sections_atomic(path, header, sections)
+    
+    @classmethod
+    def load(cls, path):
+        """Mở file bằng np.memmap; dữ liệu nén được đọc khi duyệt tới"""
+        header = np.fromfile(path, dtype=COMPRESSED_GRAPH_HEADER, count=1)
+        if len(header) != 1 or header['magic'][0] != COMPRESSED_GRAPH_MAGIC:
+            raise ValueError(f"Not a compressed graph: {path}")
+        if header['version'][0] != COMPRESSED_GRAPH_VERSION:
+            raise ValueError(f"Unsupported compressed graph version {header['version'][0]}")
+        n, m = int(header['num_rows'][0]), int(header['num_edges'][0])
+        block_rows = int(header['block_rows'][0])
+        blocks = -(-n // block_rows) + 1 if n else 1
+        weighted = bool(header['weighted'][0])
+        exceptions = int(header['weight_exceptions'][0])
+        sections = _map_sections(path, COMPRESSED_GRAPH_HEADER.itemsize, [
+            (np.int64, blocks), (np.int64, blocks), (np.int64, blocks),
+            (np.uint8, int(header['degree_bytes'][0])), (np.uint8, int(header['gap_bytes'][0])),
+            (np.int64, exceptions), (np.float64, exceptions)] + ([(np.float64, m)] if weighted else []))
+        return cls((n, int(header['num_cols'][0])), block_rows, sections[3], sections[4], *sections[:3],
+                   data=sections[7] if weighted else None, weight_positions=sections[5], weight_values=sections[6])
@@ -0,0 +1,161 @@
+"""Các solver PageRank và hàm giải chung calculate_pagerank_from_matrix"""
+import logging
+import time
+
+import numpy as np
+
+from graph_storage import CompressedGraph, NODE_ORDERINGS, build_transition_matrix, host_blocks, permute_nodes
+from solvers.blockrank import _blockrank
+from solvers.bsp import _bsp_pagerank
+from solvers.lumping import _lumped_power_iteration
+from solvers.mixed_precision import _mixed_precision_power_iteration
+from solvers.monte_carlo import _monte_carlo_pagerank
+from solvers.out_of_core import compressed_pagerank
+from solvers.parallel import _parallel_power_iteration
+from solvers.power import _adaptive_power_iteration, _power_iteration
+from solvers.scc import _scc_pagerank
+
+logger = logging.getLogger(__name__)
+
+# Mỗi solver: (hàm, danh sách tùy chọn được đọc từ request body)
+PAGERANK_SOLVERS = {
+    'power': (_power_iteration, ('acceleration', 'extrapolation_period', 'top_k')),
+    'adaptive': (_adaptive_power_iteration, ('node_tolerance', 'refresh_period')),
+    'monte_carlo': (_monte_carlo_pagerank, ('walks_per_node', 'workers', 'confidence', 'seed')),
+    'blockrank': (_blockrank, ('local_tolerance',)),
+    'scc': (_scc_pagerank, ()),
+    'lumped': (_lumped_power_iteration, ()),
+    'mixed_precision': (_mixed_precision_power_iteration, ()),
+    'parallel': (_parallel_power_iteration, ('workers',)),
+    'bsp': (_bsp_pagerank, ('workers', 'partitioning')),
+}
+
+def build_initial_vector(urls, initial_ranks):
+    """Ghép vector khởi tạo theo URL từ một nghiệm trước (warm start)
+    
+    URL có trong initial_ranks giữ tỉ lệ tương đối của nghiệm cũ, URL mới nhận 1/n;
+    thứ tự node thay đổi không ảnh hưởng vì ghép theo URL. Trả về None nếu không
+    có URL nào khớp.
+    """
+    n = len(urls)
+    known = np.array([initial_ranks.get(url, np.nan) for url in urls], dtype=float)
+    mask = np.isfinite(known) & (known > 0)
+    if not mask.any():
+        return None
+    
+    initial = np.full(n, 1.0 / n)
+    initial[mask] = known[mask] / known[mask].sum() * mask.sum() / n
+    return initial
+
+def convergence_diagnostics(residual_history, elapsed, iterations, converged, residual_iterations=None):
+    """Chẩn đoán hội tụ của một lần giải, dùng để tìm đồ thị hội tụ chậm và chọn solver
+    
+    Tốc độ hội tụ ước lượng là tỉ số residual trung bình mỗi vòng (trung bình nhân) trên
+    nửa sau của lịch sử residual; None nếu không đủ dữ liệu (ví dụ solver Monte Carlo).
+    """
+    residual_history = [float(residual) for residual in residual_history]
+    if residual_iterations is None:
+        residual_iterations = list(range(1, len(residual_history) + 1))
+    
+    rate = None
+    if len(residual_history) >= 2:
+        start = min(len(residual_history) // 2, len(residual_history) - 2)
+        first, last = residual_history[start], residual_history[-1]
+        steps = residual_iterations[-1] - residual_iterations[start]
+        if first > 0 and last > 0 and steps > 0:
+            rate = (last / first) ** (1 / steps)
+    
+    return {
+        'iterations': iterations,
+        'converged': converged,
+        'final_residual': residual_history[-1] if residual_history else None,
+        'residual_history': residual_history,
+        'residual_iterations': residual_iterations,
+        'total_time_ms': elapsed * 1000,
+        'time_per_iteration_ms': elapsed * 1000 / iterations if iterations else 0.0,
+        'estimated_rate': rate,
+    }
+
+def calculate_pagerank_from_matrix(adjacency_matrix, urls, damping_factor=0.85, max_iterations=100, tolerance=1e-6,
+                                   solver='power', return_stats=False, initial_ranks=None, reorder=None,
+                                   **solver_options):
+    n = len(urls)
+    
+    if solver not in PAGERANK_SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    if reorder is not None and reorder not in NODE_ORDERINGS:
+        raise ValueError(f"Unknown node ordering: {reorder}")
+    solve, _ = PAGERANK_SOLVERS[solver]
+    
+    # CompressedGraph (hàng = out-link): power iteration đọc thẳng từ buffer nén theo từng
+    # block, không giải nén cả ma trận nên không dựng transition matrix
+    compressed = isinstance(adjacency_matrix, CompressedGraph)
+    if compressed:
+        if solver != 'power' or reorder is not None or any(value is not None for value in solver_options.values()):
+            raise ValueError("Compressed graphs support only the power solver without options or reorder")
+    else:
+        # Xây dựng transition matrix (KHÔNG xử lý dangling ở đây)
+        transition_matrix, dangling_nodes = build_transition_matrix(adjacency_matrix)
+    
+    # Warm start từ nghiệm trước (dict url -> rank) nếu có
+    initial = build_initial_vector(urls, initial_ranks) if initial_ranks else None
+    
+    if solver == 'blockrank':
+        solver_options = dict(solver_options, blocks=host_blocks(urls)[0])
+    
+    # Đánh số lại node cho SpMV thân thiện cache; solver chỉ thấy đồ thị đã hoán vị,
+    # kết quả được trả về thứ tự gốc ngay sau khi giải
+    order = None
+    if reorder is not None and n:
+        reorder_start = time.perf_counter()
+        order = NODE_ORDERINGS[reorder](transition_matrix, urls)
+        inverse = np.empty(n, dtype=np.int64)
+        inverse[order] = np.arange(n)
+        transition_matrix = permute_nodes(transition_matrix, order)
+        dangling_nodes = np.sort(inverse[dangling_nodes])
+        if initial is not None:
+            initial = initial[order]
+        if 'blocks' in solver_options:
+            solver_options = dict(solver_options, blocks=solver_options['blocks'][order])
+        reorder_time = time.perf_counter() - reorder_start
+    
+    start = time.perf_counter()
+    if compressed:
+        pagerank, stats = compressed_pagerank(adjacency_matrix, adjacency_matrix.row_sums(), damping_factor,
+                                              max_iterations, tolerance, initial=initial, links='out')
+    else:
+        pagerank, stats = solve(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                                initial=initial, **solver_options)
+    if order is not None:
+        pagerank = pagerank[inverse]
+        if 'confidence_half_width' in stats:
+            stats['confidence_half_width'] = stats['confidence_half_width'][inverse]
+        stats['reorder'] = reorder
+        stats['reorder_time'] = reorder_time
+    stats['solver'] = solver
+    stats['diagnostics'] = convergence_diagnostics(
+        stats.pop('residual_history', []), time.perf_counter() - start, stats['iterations'], stats['converged'],
+        stats.pop('residual_iterations', None))
+    
+    if not stats['converged']:
+        diagnostics = stats['diagnostics']
+        logger.warning(f"PageRank did not converge after {max_iterations} iterations "
+                       f"(solver={solver}, final residual={diagnostics['final_residual']}, "
+                       f"estimated rate={diagnostics['estimated_rate']})")
+    
+    if 'confidence_half_width' in stats:
+        # Khoảng tin cậy từng node (solver Monte Carlo), theo URL
+        half_width = stats.pop('confidence_half_width')
+        stats['confidence_intervals'] = {
+            urls[i]: [max(float(pagerank[i] - half_width[i]), 0.0), float(pagerank[i] + half_width[i])]
+            for i in range(n)
+        }
+    
+    results = [(urls[i], float(pagerank[i])) for i in range(n)]
+    results.sort(key=lambda x: x[1], reverse=True)
+    if solver_options.get('top_k') is not None:
+        # Chỉ thứ tự top_k được đảm bảo khi dừng sớm
+        results = results[:solver_options['top_k']]
+    if return_stats:
+        return results, stats
+    return results
@@ -0,0 +1,74 @@
+"""BlockRank: PageRank cục bộ trong từng host rồi ghép theo rank của host"""
+import numpy as np
+
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers.power import _power_iteration
+
+def _local_block_pagerank(transition_matrix, blocks, num_blocks, damping_factor, max_iterations, tolerance):
+    """PageRank cục bộ trong từng block, chỉ dùng link nội block (mỗi block tổng bằng 1)
+    
+    Mọi block được giải cùng lúc như một ma trận khối chéo: mỗi vòng một SpMV chung,
+    teleport / dangling / chuẩn hóa tính riêng theo block bằng np.bincount. Dừng khi
+    residual L1 của block chậm nhất < tolerance.
+    """
+    targets, sources = transition_matrix._row_ids, transition_matrix.indices
+    intra = blocks[targets] == blocks[sources]
+    # Chuẩn hóa lại theo số link nội block của node nguồn
+    local_out = np.bincount(sources[intra], weights=transition_matrix.data[intra], minlength=len(blocks))
+    # Lọc giữ nguyên thứ tự CSR nên không cần sắp xếp lại
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(targets[intra], minlength=len(blocks)))))
+    local_matrix = CSRMatrix(indptr, sources[intra], transition_matrix.data[intra] / local_out[sources[intra]],
+                             transition_matrix.shape)
+    local_dangling = np.flatnonzero(local_out == 0)
+    block_size = np.bincount(blocks, minlength=num_blocks).astype(float)
+    
+    local = 1.0 / block_size[blocks]
+    iterations = 0
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        dangling_mass = np.bincount(blocks[local_dangling], weights=local[local_dangling], minlength=num_blocks)
+        new_local = ((1 - damping_factor) + damping_factor * dangling_mass[blocks]) / block_size[blocks]
+        new_local += damping_factor * (local_matrix @ local)
+        new_local /= np.bincount(blocks, weights=new_local, minlength=num_blocks)[blocks]
+        residuals = np.bincount(blocks, weights=np.abs(new_local - local), minlength=num_blocks)
+        local = new_local
+        if residuals.max() < tolerance:
+            break
+    return local, iterations
+
+def _blockrank(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+               initial=None, blocks=None, local_tolerance=1e-3):
+    """BlockRank (Kamvar et al.): PageRank cục bộ theo host x rank của đồ thị host làm warm start
+    
+    1. PageRank cục bộ l trong mỗi host block (chỉ link nội host).
+    2. Đồ thị host: trọng số I -> J là sum l_i * T[j, i] với i thuộc I, j thuộc J; tính rank b.
+    3. Power iteration toàn cục bắt đầu từ x_i = l_i * b_block(i).
+    blocks là block id của từng node (xem host_blocks); initial không được dùng.
+    """
+    n = transition_matrix.shape[0]
+    if blocks is None:
+        blocks = np.zeros(n, dtype=np.int64)
+    num_blocks = int(blocks.max()) + 1 if n else 0
+    
+    local, local_iterations = _local_block_pagerank(
+        transition_matrix, blocks, num_blocks, damping_factor, max_iterations, local_tolerance)
+    
+    # Đồ thị host có trọng số (hàng = host nguồn), giữ cả link nội host (self-loop)
+    targets, sources = transition_matrix._row_ids, transition_matrix.indices
+    pairs, pair_ids = np.unique(blocks[sources] * num_blocks + blocks[targets], return_inverse=True)
+    weights = np.bincount(pair_ids.ravel(), weights=local[sources] * transition_matrix.data)
+    host_adjacency = CSRMatrix.from_edges(pairs // num_blocks, pairs % num_blocks, (num_blocks, num_blocks), weights)
+    host_transition, host_dangling = build_transition_matrix(host_adjacency)
+    host_rank, host_stats = _power_iteration(host_transition, host_dangling, damping_factor, max_iterations, tolerance)
+    
+    start = local * host_rank[blocks]
+    pagerank, stats = _power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                                       initial=start / start.sum())
+    stats.update({
+        'blocks': num_blocks,
+        'local_iterations': local_iterations,
+        'host_iterations': host_stats['iterations'],
+        # Điểm khởi đầu là tích local rank x host rank, không phải initial của người gọi
+        'warm_start': False,
+    })
+    return pagerank, stats
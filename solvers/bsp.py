@@ -0,0 +1,409 @@
+"""Engine BSP kiểu Pregel (vertex program chạy trên nhiều process) và PageRank / HITS / BFS trên đó"""
+import multiprocessing
+from collections import defaultdict
+
+import numpy as np
+
+from solvers import parallel
+
+def hash_partition(adjacency, parts):
+    """Gán mỗi vertex vào partition bằng hash nhân Knuth của id (không cần nhìn cạnh)"""
+    vertices = np.arange(adjacency.shape[0], dtype=np.uint64)
+    return ((vertices * np.uint64(2654435761)) % np.uint64(2 ** 32) % np.uint64(parts)).astype(np.int64)
+
+def _label_propagation_round(nodes, neighbors, labels, num_labels, capacity, rng):
+    """Một vòng label propagation có giới hạn kích thước nhãn, sửa labels tại chỗ
+    
+    Một nửa số vertex (chọn ngẫu nhiên, tránh dao động) chuyển sang nhãn phổ biến nhất trong
+    các láng giềng nếu nhiều hơn nhãn hiện tại, ưu tiên vertex lợi nhiều nhất, miễn nhãn đích
+    chưa vượt capacity vertex. Trả về số vertex đã chuyển.
+    """
+    n = len(labels)
+    keys, counts = np.unique(nodes * num_labels + labels[neighbors], return_counts=True)
+    key_nodes, key_labels = keys // num_labels, keys % num_labels
+    own = np.zeros(n, dtype=np.int64)
+    is_own = key_labels == labels[key_nodes]
+    own[key_nodes[is_own]] = counts[is_own]
+    # Nhãn nhiều láng giềng nhất của mỗi node: phần tử đầu khi sắp theo (node, -count)
+    order = np.lexsort((-counts, key_nodes))
+    first = order[np.flatnonzero(np.diff(key_nodes[order], prepend=-1))]
+    candidates, best, gain = key_nodes[first], key_labels[first], counts[first] - own[key_nodes[first]]
+    moving = (gain > 0) & (best != labels[candidates]) & (rng.random(len(candidates)) < 0.5)
+    candidates, best, gain = candidates[moving], best[moving], gain[moving]
+    if not len(candidates):
+        return 0
+    
+    order = np.lexsort((-gain, best))
+    candidates, best = candidates[order], best[order]
+    rank = np.arange(len(best)) - np.searchsorted(best, best)
+    room = capacity - np.bincount(labels, minlength=num_labels)
+    accepted = rank < room[best]
+    labels[candidates[accepted]] = best[accepted]
+    return int(accepted.sum())
+
+def label_propagation_partition(adjacency, parts, rounds=10, imbalance=1.05, seed=42):
+    """Partition bằng label propagation có giới hạn kích thước, giảm số cạnh cắt ngang partition
+    
+    Hai pha (bỏ qua hướng cạnh): label propagation từ mỗi vertex một nhãn tìm các cộng đồng
+    không lớn hơn n / parts, các cộng đồng được xếp vào partition đang nhẹ nhất (lớn trước);
+    sau đó label propagation trên nhãn partition tinh chỉnh biên, giữ mỗi partition tối đa
+    imbalance * n / parts vertex.
+    """
+    n = adjacency.shape[0]
+    if parts == 1 or adjacency.nnz == 0:
+        return hash_partition(adjacency, parts)
+    loops = adjacency._row_ids == adjacency.indices
+    nodes = np.concatenate((adjacency._row_ids[~loops], adjacency.indices[~loops]))
+    neighbors = np.concatenate((adjacency.indices[~loops], adjacency._row_ids[~loops]))
+    rng = np.random.default_rng(seed)
+    
+    communities = np.arange(n)
+    for _ in range(rounds):
+        if not _label_propagation_round(nodes, neighbors, communities, n, n // parts, rng):
+            break
+    _, communities, sizes = np.unique(communities, return_inverse=True, return_counts=True)
+    community_parts = np.empty(len(sizes), dtype=np.int64)
+    load = np.zeros(parts, dtype=np.int64)
+    for community in np.argsort(-sizes, kind='stable'):
+        community_parts[community] = np.argmin(load)
+        load[community_parts[community]] += sizes[community]
+    
+    labels = community_parts[communities]
+    capacity = int(np.ceil(imbalance * n / parts))
+    for _ in range(rounds):
+        if not _label_propagation_round(nodes, neighbors, labels, parts, capacity, rng):
+            break
+    return labels
+
+BSP_PARTITIONERS = {
+    'hash': hash_partition,
+    'label_propagation': label_propagation_partition,
+}
+
+class VertexProgram:
+    """Vertex program cho run_vertex_program, tính theo lô trên các vertex của một partition
+    
+    combiner: ufunc gộp các message tới cùng một vertex (np.add, np.minimum), identity là
+    giá trị inbox khi không có message. directions: hướng gửi message, 'out' theo out-link,
+    'in' ngược in-link. weighted: message trên mỗi cạnh có nhân trọng số cạnh không.
+    halt_when_idle: dừng khi một superstep không gửi message nào; program mà aggregate vẫn
+    làm thay đổi values (PageRank: dangling mass và teleport) đặt False để chỉ halt quyết định.
+    """
+    combiner = np.add
+    identity = 0.0
+    directions = ('out',)
+    weighted = True
+    halt_when_idle = True
+    
+    def initial_values(self, partition):
+        raise NotImplementedError
+    
+    def compute(self, superstep, values, inbox, aggregates, partition):
+        """Trả về (values mới, {hướng: (message theo vertex, mask vertex gửi)}, aggregate cục bộ)
+        
+        inbox: {hướng: message đã gộp từ superstep trước}, aggregates: tổng aggregate của mọi
+        partition ở superstep trước.
+        """
+        raise NotImplementedError
+    
+    def halt(self, superstep, aggregates):
+        """Master dừng khi trả về True (hoặc khi không còn message nào được gửi, nếu halt_when_idle)"""
+        return False
+    
+    def result(self, values, aggregates):
+        """Hậu xử lý values đã gom từ mọi partition"""
+        return values
+
+class PageRankProgram(VertexProgram):
+    """PageRank: rank chia đều (theo trọng số) cho out-link, dangling mass qua aggregate"""
+    # Đồ thị không cạnh vẫn cần bước lặp: dangling mass và teleport đưa rank về phân phối đều
+    halt_when_idle = False
+    
+    def __init__(self, damping_factor=0.85, tolerance=1e-6, initial=None):
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+        self.initial = initial
+    
+    def initial_values(self, partition):
+        if self.initial is not None:
+            return self.initial[partition['vertices']].astype(float)
+        return np.full(len(partition['vertices']), 1.0 / partition['num_vertices'])
+    
+    def compute(self, superstep, values, inbox, aggregates, partition):
+        n = partition['num_vertices']
+        residual = 0.0
+        if superstep > 0:
+            d = self.damping_factor
+            new_values = (1 - d) / n + d * (inbox['out'] + aggregates['dangling'] / n)
+            residual = np.abs(new_values - values).sum()
+            values = new_values
+        out_weight = partition['out_weight']
+        linked = out_weight > 0
+        return values, {'out': (values / np.where(linked, out_weight, 1.0), linked)}, {
+            'dangling': values[~linked].sum(),
+            'residual': residual,
+        }
+    
+    def halt(self, superstep, aggregates):
+        return superstep > 0 and aggregates['residual'] < self.tolerance
+
+class HITSProgram(VertexProgram):
+    """HITS như calculate_hits_scores: hub và authority cập nhật đồng thời, chuẩn hóa L2
+    
+    values[:, 0] là hub, values[:, 1] là authority (chưa chuẩn hóa). Chuẩn của superstep
+    trước đến qua aggregate nên message mới được chia cho chuẩn đó khi nhận.
+    """
+    directions = ('out', 'in')
+    
+    def __init__(self, iterations=20):
+        self.iterations = iterations
+    
+    def initial_values(self, partition):
+        return np.ones((len(partition['vertices']), 2))
+    
+    def compute(self, superstep, values, inbox, aggregates, partition):
+        if superstep > 0:
+            hub_norm = np.sqrt(aggregates.get('hub_squares', 1.0))
+            authority_norm = np.sqrt(aggregates.get('authority_squares', 1.0))
+            values = np.column_stack((inbox['in'] / (authority_norm or 1.0), inbox['out'] / (hub_norm or 1.0)))
+        everyone = np.ones(len(values), dtype=bool)
+        local_aggregates = {}
+        if superstep > 0:
+            local_aggregates = {'hub_squares': np.square(values[:, 0]).sum(),
+                                'authority_squares': np.square(values[:, 1]).sum()}
+        return values, {'out': (values[:, 0], everyone), 'in': (values[:, 1], everyone)}, local_aggregates
+    
+    def halt(self, superstep, aggregates):
+        return superstep >= self.iterations
+    
+    def result(self, values, aggregates):
+        norms = np.sqrt([aggregates.get('hub_squares', 0.0), aggregates.get('authority_squares', 0.0)])
+        return values / np.where(norms > 0, norms, 1.0)
+
+class BFSProgram(VertexProgram):
+    """BFS theo out-link: khoảng cách (số cạnh) từ source, inf nếu không tới được"""
+    combiner = np.minimum
+    identity = np.inf
+    weighted = False
+    
+    def __init__(self, source):
+        self.source = source
+    
+    def initial_values(self, partition):
+        return np.where(partition['vertices'] == self.source, 0.0, np.inf)
+    
+    def compute(self, superstep, values, inbox, aggregates, partition):
+        if superstep == 0:
+            changed = values == 0
+        else:
+            new_values = np.minimum(values, inbox['out'])
+            changed = new_values < values
+            values = new_values
+        return values, {'out': (values + 1, changed)}, {}
+
+def _bsp_routes(senders, receivers, weights, vertices, labels):
+    """Cạnh đi ra của một partition, nhóm theo vertex nhận (sắp theo partition nhận rồi id)"""
+    order = np.lexsort((senders, receivers, labels[receivers]))
+    receivers = receivers[order]
+    starts = np.flatnonzero(np.diff(receivers, prepend=-1)) if len(receivers) else np.zeros(0, dtype=np.int64)
+    receivers = receivers[starts]
+    receiver_parts = labels[receivers]
+    return {
+        'senders': np.searchsorted(vertices, senders[order]),
+        'weights': weights[order],
+        'starts': starts,
+        'receivers': receivers,
+        'part_bounds': np.searchsorted(receiver_parts, np.arange(labels.max() + 2)),
+    }
+
+def _bsp_send(program, route, message, active):
+    """Gộp message theo vertex nhận (combiner phía gửi), trả về [(ids, values)] theo partition nhận"""
+    if not len(route['starts']) or not active.any():
+        return None
+    edge_active = active[route['senders']]
+    edge_values = np.where(edge_active, message[route['senders']], program.identity)
+    if program.weighted:
+        edge_values = edge_values * route['weights']
+    combined = program.combiner.reduceat(edge_values, route['starts'])
+    has_message = np.add.reduceat(edge_active.astype(np.int64), route['starts']) > 0
+    bounds = route['part_bounds']
+    return [(route['receivers'][start:end][has_message[start:end]], combined[start:end][has_message[start:end]])
+            for start, end in zip(bounds[:-1], bounds[1:])]
+
+def _bsp_worker(connection, program, partition):
+    """Process worker: giữ một partition, chạy từng superstep theo lệnh của master"""
+    try:
+        vertices = partition['vertices']
+        part = partition['part']
+        values = program.initial_values(partition)
+        local_messages = {}
+        while True:
+            command, *payload = connection.recv()
+            if command == 'values':
+                connection.send(values)
+                continue
+            if command != 'superstep':
+                break
+            superstep, aggregates, incoming = payload
+            inbox = {}
+            for direction in program.directions:
+                box = np.full(len(vertices), program.identity)
+                for ids, message in local_messages.get(direction, []) + incoming.get(direction, []):
+                    program.combiner.at(box, np.searchsorted(vertices, ids), message)
+                inbox[direction] = box
+            
+            values, messages, local_aggregates = program.compute(superstep, values, inbox, aggregates, partition)
+            outgoing = [{} for _ in range(partition['parts'])]
+            sent = remote = 0
+            for direction, (message, active) in messages.items():
+                per_part = _bsp_send(program, partition['routes'][direction], message, active)
+                for target, (ids, combined) in enumerate(per_part or []):
+                    if len(ids):
+                        outgoing[target][direction] = [(ids, combined)]
+                        sent += len(ids)
+                        remote += len(ids) if target != part else 0
+            local_messages = outgoing[part]
+            outgoing[part] = {}
+            connection.send(('ok', outgoing, local_aggregates, sent, remote))
+    except Exception as error:
+        connection.send(('error', repr(error)))
+    finally:
+        connection.close()
+
+def run_vertex_program(adjacency, program, workers=2, partitioning='hash', max_supersteps=100):
+    """Chạy vertex program kiểu Pregel (bulk-synchronous) trên `workers` process cục bộ
+    (tối đa PARALLEL_MAX_WORKERS)
+    
+    Đồ thị được chia theo BSP_PARTITIONERS[partitioning]; mỗi process chỉ giữ vertex và cạnh
+    của partition mình. Mỗi superstep master gửi message biên (đã gộp phía gửi) tới partition
+    nhận và cộng aggregate của các partition; message nội bộ ở lại trong worker. Dừng khi
+    program.halt(...) trả về True, không còn message (nếu program.halt_when_idle), hoặc sau
+    max_supersteps.
+    
+    Trả về (values theo thứ tự vertex, stats).
+    """
+    if partitioning not in BSP_PARTITIONERS:
+        raise ValueError(f"Unknown partitioning: {partitioning}")
+    n = adjacency.shape[0]
+    workers = max(1, min(workers, n, parallel.PARALLEL_MAX_WORKERS))
+    labels = BSP_PARTITIONERS[partitioning](adjacency, workers)
+    sources, targets, weights = adjacency._row_ids, adjacency.indices, adjacency.data
+    out_weight = adjacency.row_sums()
+    
+    part_vertices = [np.flatnonzero(labels == part) for part in range(workers)]
+    connections, processes = [], []
+    try:
+        for part, vertices in enumerate(part_vertices):
+            routes = {}
+            if 'out' in program.directions:
+                mask = labels[sources] == part
+                routes['out'] = _bsp_routes(sources[mask], targets[mask], weights[mask], vertices, labels)
+            if 'in' in program.directions:
+                mask = labels[targets] == part
+                routes['in'] = _bsp_routes(targets[mask], sources[mask], weights[mask], vertices, labels)
+            partition = {'part': part, 'parts': workers, 'vertices': vertices, 'num_vertices': n,
+                         'out_weight': out_weight[vertices], 'routes': routes}
+            parent_connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_bsp_worker, args=(child_connection, program, partition),
+                                              daemon=True)
+            process.start()
+            child_connection.close()
+            connections.append(parent_connection)
+            processes.append(process)
+        
+        aggregates = {}
+        aggregate_history = []
+        incoming = [{} for _ in range(workers)]
+        messages = boundary_messages = 0
+        halted = False
+        superstep = 0
+        for superstep in range(max_supersteps):
+            for connection, inbox in zip(connections, incoming):
+                connection.send(('superstep', superstep, aggregates, inbox))
+            replies = [connection.recv() for connection in connections]
+            for reply in replies:
+                if reply[0] == 'error':
+                    raise RuntimeError(f"BSP worker failed: {reply[1]}")
+            
+            aggregates = defaultdict(float)
+            incoming = [defaultdict(list) for _ in range(workers)]
+            sent = 0
+            for _, outgoing, local_aggregates, worker_sent, worker_remote in replies:
+                for key, value in local_aggregates.items():
+                    aggregates[key] += float(value)
+                for target, part_messages in enumerate(outgoing):
+                    for direction, batches in part_messages.items():
+                        incoming[target][direction].extend(batches)
+                sent += worker_sent
+                boundary_messages += worker_remote
+            aggregates = dict(aggregates)
+            incoming = [dict(inbox) for inbox in incoming]
+            aggregate_history.append(aggregates)
+            messages += sent
+            if program.halt(superstep, aggregates):
+                halted = True
+                break
+            if sent == 0 and program.halt_when_idle:
+                break
+        
+        values = None
+        for connection, vertices in zip(connections, part_vertices):
+            connection.send(('values',))
+            part_values = connection.recv()
+            if values is None:
+                values = np.empty((n,) + part_values.shape[1:])
+            values[vertices] = part_values
+    finally:
+        for connection in connections:
+            try:
+                connection.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in processes:
+            process.join(timeout=5)
+    
+    return program.result(values, aggregates), {
+        'supersteps': superstep + 1,
+        'halted': halted,
+        'workers': workers,
+        'partitioning': partitioning,
+        'partition_sizes': [len(vertices) for vertices in part_vertices],
+        'edge_cut': float(np.mean(labels[sources] != labels[targets])) if adjacency.nnz else 0.0,
+        'messages': messages,
+        'boundary_messages': boundary_messages,
+        'aggregate_history': aggregate_history,
+    }
+
+def _bsp_pagerank(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                  initial=None, workers=2, partitioning='hash'):
+    """PageRank chạy như vertex program trên engine BSP (xem run_vertex_program)
+    
+    Mỗi superstep là một vòng power iteration; dangling_nodes được suy ra lại từ cạnh nên
+    không dùng trực tiếp.
+    """
+    program = PageRankProgram(damping_factor, tolerance, initial)
+    pagerank, stats = run_vertex_program(transition_matrix.transpose(), program, workers, partitioning,
+                                         max_supersteps=max_iterations + 1)
+    aggregate_history = stats.pop('aggregate_history')
+    stats.update({
+        'iterations': stats['supersteps'] - 1,
+        'converged': stats['halted'],
+        'warm_start': initial is not None,
+        'residual_history': [aggregates['residual'] for aggregates in aggregate_history[1:]],
+    })
+    return pagerank, stats
+
+def bsp_hits(adjacency, iterations=20, workers=2, partitioning='hash'):
+    """Hub và authority scores (như calculate_hits_scores) trên engine BSP"""
+    values, stats = run_vertex_program(adjacency, HITSProgram(iterations), workers, partitioning,
+                                       max_supersteps=iterations + 1)
+    stats.pop('aggregate_history')
+    return values[:, 0], values[:, 1], stats
+
+def bsp_bfs(adjacency, source, workers=2, partitioning='hash'):
+    """Khoảng cách BFS (số cạnh theo out-link) từ source trên engine BSP, -1 nếu không tới được"""
+    distances, stats = run_vertex_program(adjacency, BFSProgram(source), workers, partitioning,
+                                          max_supersteps=adjacency.shape[0] + 1)
+    stats.pop('aggregate_history')
+    return np.where(np.isinf(distances), -1, distances).astype(np.int64), stats
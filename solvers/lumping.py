@@ -0,0 +1,77 @@
+"""Power iteration gộp các dangling node"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _lumped_power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                            initial=None):
+    """Power iteration với mọi dangling node gộp thành một trạng thái (Lee-Golub-Zenios)
+    
+    Dangling node không có out-link nên cột của chúng trong T bằng 0: chỉ cần lặp trên
+    (x_N, s) với x_N là rank của các node không dangling và s tổng rank của dangling:
+        x_N' = (1 - d)/n + d * T_NN x_N + d * s/n
+        s'   = |D| * (1 - d)/n + d * w . x_N + d * s * |D|/n,  w_j = xác suất j đi tới dangling
+    Hội tụ (L1 của (x_N, s) < tolerance) rồi khôi phục rank từng dangling node bằng một
+    phép nhân: x_D = (1 - d)/n + d * T_DN x_N + d * s/n.
+    """
+    n = transition_matrix.shape[0]
+    dangling = np.zeros(n, dtype=bool)
+    dangling[dangling_nodes] = True
+    kept = np.flatnonzero(~dangling)
+    num_dangling = n - len(kept)
+    
+    # Cột luôn là node không dangling; đánh lại chỉ số theo thứ tự trong kept
+    position = np.empty(n, dtype=np.int64)
+    position[kept] = np.arange(len(kept))
+    if num_dangling:
+        kept_block = transition_matrix.take_rows(kept)
+        kept_block.indices = position[kept_block.indices]
+        kept_block.shape = (len(kept), len(kept))
+    else:
+        kept_block = transition_matrix
+    dangling_block = transition_matrix.take_rows(dangling_nodes)
+    dangling_block.indices = position[dangling_block.indices]
+    dangling_block.shape = (num_dangling, len(kept))
+    to_dangling = np.bincount(dangling_block.indices, weights=dangling_block.data, minlength=len(kept))
+    
+    if initial is None:
+        pagerank, dangling_mass = np.full(len(kept), 1.0 / n), num_dangling / n
+    else:
+        pagerank, dangling_mass = initial[kept].copy(), initial[dangling_nodes].sum()
+    teleport = (1 - damping_factor) / n
+    residual_history = []
+    iterations = 0
+    converged = False
+    
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        new_pagerank = damping_factor * (kept_block @ pagerank)
+        new_pagerank += teleport + damping_factor * dangling_mass / n
+        new_mass = num_dangling * (teleport + damping_factor * dangling_mass / n)
+        new_mass += damping_factor * (to_dangling @ pagerank)
+        
+        total = new_pagerank.sum() + new_mass
+        new_pagerank /= total
+        new_mass /= total
+        residual = np.abs(new_pagerank - pagerank).sum() + abs(new_mass - dangling_mass)
+        residual_history.append(residual)
+        pagerank, dangling_mass = new_pagerank, new_mass
+        if residual < tolerance:
+            logger.info(f"Lumped PageRank converged after {iterations} iterations")
+            converged = True
+            break
+    
+    result = np.empty(n)
+    result[kept] = pagerank
+    result[dangling_nodes] = (teleport + damping_factor * dangling_mass / n
+                              + damping_factor * (dangling_block @ pagerank))
+    stats = {
+        'iterations': iterations,
+        'converged': converged,
+        'dangling_nodes': num_dangling,
+        'warm_start': initial is not None,
+        'residual_history': residual_history,
+    }
+    return result / result.sum(), stats
@@ -0,0 +1,120 @@
+"""Power iteration float32 rồi tinh chỉnh bằng float64"""
+import numpy as np
+
+from solvers.power import _power_iteration
+
+# Residual L1 nhỏ nhất còn tin được khi lặp float32 (sai số làm tròn ~ eps * tổng rank)
+FLOAT32_RESIDUAL_FLOOR = 64 * float(np.finfo(np.float32).eps)
+
+# Số cạnh mỗi lô khi kiểm tra cột và khi nhân ma trận với vector (giới hạn mảng tạm cỡ nnz)
+COLUMN_SCALED_BLOCK = 1 << 16
+
+def _column_values(matrix):
+    """Giá trị (float64) của từng cột; chỉ có nghĩa khi mọi phần tử trong một cột bằng nhau"""
+    column_value = np.zeros(matrix.shape[1])
+    column_value[matrix.indices] = matrix.data
+    return column_value
+
+class _ColumnScaledMatrix:
+    """Transition matrix không trọng số, nhân với vector chỉ bằng indices
+    
+    Đồ thị không trọng số có cùng một giá trị trên mỗi cột (1 / out-degree của node nguồn),
+    nên T x là tổng theo hàng của (scale * x)[indices]: chỉ đọc indices có sẵn của matrix,
+    không giữ bản sao data hay row id nào. Cộng theo hàng bằng np.add.reduceat (giữ dtype
+    của vector, np.bincount luôn tính float64), mỗi lần một lô khoảng COLUMN_SCALED_BLOCK
+    cạnh nên mảng tạm có cỡ lô thay vì cỡ nnz. Dùng được ở chỗ cần ``shape`` và ``@``.
+    """
+    
+    def __init__(self, matrix, scale):
+        self.matrix = matrix
+        self.shape = matrix.shape
+        self.scale = scale
+        # Chỉ số hàng / vị trí cạnh bằng int32 khi vừa (nửa bộ nhớ của int64)
+        index_type = np.int32 if max(matrix.nnz, matrix.shape[0]) < 2 ** 31 else np.int64
+        self.nonempty = np.flatnonzero(np.diff(matrix.indptr) > 0).astype(index_type)
+        self.starts = matrix.indptr[self.nonempty].astype(index_type)
+        # Lô k gồm các hàng nonempty[bounds[k]:bounds[k + 1]]
+        self.bounds = np.unique(np.concatenate((
+            np.searchsorted(self.starts, np.arange(0, matrix.nnz, COLUMN_SCALED_BLOCK)), [len(self.starts)])))
+    
+    @classmethod
+    def from_transition(cls, matrix, dtype):
+        """Ma trận nhân với scale kiểu dtype, None nếu matrix có trọng số (giá trị khác nhau trong một cột)"""
+        column_value = _column_values(matrix)
+        for start in range(0, matrix.nnz, COLUMN_SCALED_BLOCK):
+            stop = start + COLUMN_SCALED_BLOCK
+            if not np.array_equal(column_value[matrix.indices[start:stop]], matrix.data[start:stop]):
+                return None
+        return cls(matrix, column_value.astype(dtype, copy=False))
+    
+    def __matmul__(self, vector):
+        scaled = vector * self.scale
+        result = np.zeros(self.shape[0], dtype=scaled.dtype)
+        indices, starts, nnz = self.matrix.indices, self.starts, self.matrix.nnz
+        for first, last in zip(self.bounds[:-1].tolist(), self.bounds[1:].tolist()):
+            start = int(starts[first])
+            stop = int(starts[last]) if last < len(starts) else nnz
+            result[self.nonempty[first:last]] = np.add.reduceat(scaled[indices[start:stop]],
+                                                                starts[first:last] - start)
+        return result
+
+def _mixed_precision_power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                                     initial=None):
+    """Power iteration float32 tới giới hạn làm tròn của float32, rồi tinh chỉnh bằng float64
+    
+    Pha float32 dừng khi residual L1 < max(tolerance, FLOAT32_RESIDUAL_FLOOR) hoặc không
+    còn giảm (nhiễu làm tròn). Pha float64 dùng giá trị float64 gốc của transition matrix
+    nên điểm bất động giống power iteration float64 (lưu T bằng float32 sẽ lệch cỡ
+    eps / (1 - d)), và luôn chạy ít nhất một vòng để kiểm tra tolerance bằng float64.
+    
+    Tổng số vòng bằng power iteration; với đồ thị không trọng số cả hai pha nhân bằng
+    _ColumnScaledMatrix: mỗi vòng chỉ đọc indices (không đọc data và row id như SpMV
+    float64) và mảng tạm có cỡ một lô cạnh thay vì cỡ nnz, nên bộ nhớ đỉnh thấp hơn
+    power iteration. Đồ thị có trọng số chạy thẳng pha float64 trên transition matrix.
+    """
+    n = transition_matrix.shape[0]
+    warm_start = initial is not None
+    scaled_matrix = _ColumnScaledMatrix.from_transition(transition_matrix, np.float32)
+    unweighted = scaled_matrix is not None
+    d = np.float32(damping_factor)
+    
+    residual_history = []
+    float32_iterations = 0
+    if unweighted:
+        pagerank = np.full(n, 1.0 / n, dtype=np.float32) if initial is None else initial.astype(np.float32)
+        previous = np.inf
+        for iteration in range(max_iterations):
+            float32_iterations = iteration + 1
+            new_pagerank = d * (scaled_matrix @ pagerank)
+            new_pagerank += ((1 - d) + d * pagerank[dangling_nodes].sum()) / n
+            new_pagerank /= new_pagerank.sum()
+            residual = float(np.abs(new_pagerank - pagerank).sum())
+            residual_history.append(residual)
+            pagerank = new_pagerank
+            if residual < max(tolerance, FLOAT32_RESIDUAL_FLOOR) or residual >= previous:
+                break
+            previous = residual
+        initial = pagerank.astype(np.float64)
+        # Pha float64 nhân bằng giá trị float64 gốc của cột; các vector float32 và scale
+        # float32 được giải phóng trước
+        del pagerank, new_pagerank
+        scaled_matrix.scale = None
+        scaled_matrix.scale = _column_values(transition_matrix)
+    
+    remaining = max(max_iterations - float32_iterations, 1)
+    pagerank, stats = _power_iteration(scaled_matrix if unweighted else transition_matrix, dangling_nodes,
+                                       damping_factor, remaining, tolerance, initial=initial)
+    float64_bytes = (transition_matrix.indices.nbytes if unweighted else
+                     transition_matrix.data.nbytes + transition_matrix.indices.nbytes
+                     + transition_matrix._row_ids.nbytes)
+    stats.update({
+        'iterations': float32_iterations + stats['iterations'],
+        'float32_iterations': float32_iterations,
+        'float64_iterations': stats['iterations'],
+        'warm_start': warm_start,
+        'residual_history': residual_history + stats['residual_history'],
+        # Số byte của ma trận mà mỗi lượt SpMV phải đọc ở từng pha
+        'spmv_bytes_float32': transition_matrix.indices.nbytes if unweighted else 0,
+        'spmv_bytes_float64': float64_bytes,
+    })
+    return pagerank, stats
@@ -0,0 +1,113 @@
+"""PageRank Monte Carlo bằng random walk"""
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from solvers import parallel
+
+MONTE_CARLO_BATCH_WALKERS = 2 ** 20
+
+def _monte_carlo_rounds(indptr, indices, cumulative, damping_factor, rounds, max_steps, seed):
+    """Chạy `rounds` vòng, mỗi vòng một random walk từ mỗi node; trả về tổng và tổng bình
+    phương (theo vòng) của ước lượng PageRank từng node, cùng số bước dài nhất
+    
+    Các vòng được gom thành batch tối đa MONTE_CARLO_BATCH_WALKERS walker và đi cùng lúc.
+    Ước lượng của một vòng: (1 - d) / n * số lần ghé thăm node (kể cả node xuất phát).
+    cumulative[e] là tổng trọng số các cạnh đứng trước cạnh e (độ dài nnz + 1), hoặc None
+    nếu mọi out-link của một node có cùng trọng số (chọn đều, không cần tìm kiếm).
+    """
+    n = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+    out_degree = np.diff(indptr)
+    total = np.zeros(n)
+    total_squares = np.zeros(n)
+    longest = 0
+    truncated = False
+    
+    per_batch = max(1, MONTE_CARLO_BATCH_WALKERS // n)
+    for first in range(0, rounds, per_batch):
+        batch = min(per_batch, rounds - first)
+        position = np.tile(np.arange(n), batch)
+        # Đếm theo (vòng, node) để tính phương sai giữa các vòng
+        slot = np.repeat(np.arange(batch) * n, n)
+        visits = np.bincount(slot + position, minlength=batch * n)
+        
+        steps = 0
+        while len(position) and steps < max_steps:
+            # Một số ngẫu nhiên u cho cả hai việc: dừng nếu u >= d, còn u / d vẫn phân bố đều
+            # trên [0, 1) nên dùng lại để chọn cạnh
+            draw = rng.random(len(position))
+            alive = draw < damping_factor
+            position, slot, draw = position[alive], slot[alive], draw[alive] / damping_factor
+            # Bước tới out-neighbor theo trọng số cạnh; dangling node nhảy ngẫu nhiên đều
+            moving = out_degree[position] > 0
+            following = position[moving]
+            start, end = indptr[following], indptr[following + 1]
+            if cumulative is None:
+                edge = np.minimum(start + (draw[moving] * (end - start)).astype(np.int64), end - 1)
+            else:
+                target = cumulative[start] + draw[moving] * (cumulative[end] - cumulative[start])
+                edge = np.clip(np.searchsorted(cumulative, target, side='right') - 1, start, end - 1)
+            position[moving] = indices[edge]
+            jumping = ~moving
+            position[jumping] = rng.integers(0, n, int(jumping.sum()))
+            visits += np.bincount(slot + position, minlength=batch * n)
+            steps += 1
+        longest = max(longest, steps)
+        truncated = truncated or len(position) > 0
+        
+        estimates = visits.reshape(batch, n) * (1 - damping_factor) / n
+        total += estimates.sum(axis=0)
+        total_squares += (estimates ** 2).sum(axis=0)
+    return total, total_squares, longest, truncated
+
+def _monte_carlo_pagerank(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                          initial=None, walks_per_node=10, workers=1, confidence=0.95, seed=None):
+    """PageRank xấp xỉ bằng random walk (Monte Carlo "complete path", Avrachenkov et al.)
+    
+    Mỗi node phát walks_per_node walk, mỗi bước dừng với xác suất 1 - d; PageRank của
+    node tỉ lệ với tổng số lần được ghé thăm. Các vòng độc lập nên được chia cho
+    `workers` process (tối đa PARALLEL_MAX_WORKERS). Khoảng tin cậy từng node tính từ phương sai giữa các vòng (batch
+    means, xấp xỉ chuẩn), nên cần walks_per_node >= 2. Walk dài hơn max_iterations bước bị
+    cắt (sai lệch tối đa d^max_iterations); tolerance và initial không được dùng. Ước lượng
+    không chệch nên tổng chỉ xấp xỉ 1 (không chuẩn hóa lại).
+    """
+    if walks_per_node < 2:
+        raise ValueError("walks_per_node must be at least 2")
+    n = transition_matrix.shape[0]
+    # Hàng = node nguồn, data = xác suất đi theo từng cạnh
+    out_links = transition_matrix.transpose()
+    out_degree = np.diff(out_links.indptr)
+    if np.allclose(out_links.data, 1.0 / out_degree[out_links._row_ids]):
+        cumulative = None
+    else:
+        cumulative = np.concatenate(([0.0], np.cumsum(out_links.data)))
+    
+    workers = max(1, min(workers, walks_per_node, parallel.PARALLEL_MAX_WORKERS))
+    rounds = [walks_per_node // workers + (i < walks_per_node % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    task = (out_links.indptr, out_links.indices, cumulative, damping_factor)
+    if workers == 1:
+        parts = [_monte_carlo_rounds(*task, rounds[0], max_iterations, seeds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_monte_carlo_rounds, *zip(*[task] * workers), rounds,
+                                      [max_iterations] * workers, seeds))
+    
+    total = sum(part[0] for part in parts)
+    total_squares = sum(part[1] for part in parts)
+    mean = total / walks_per_node
+    variance = np.maximum(total_squares / walks_per_node - mean ** 2, 0.0) * walks_per_node / (walks_per_node - 1)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    
+    stats = {
+        'iterations': max(part[2] for part in parts),
+        'converged': not any(part[3] for part in parts),
+        'walks': walks_per_node * n,
+        'workers': workers,
+        'confidence': confidence,
+        'confidence_half_width': z * np.sqrt(variance / walks_per_node),
+        'warm_start': False,
+    }
+    return mean, stats
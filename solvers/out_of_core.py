@@ -0,0 +1,104 @@
+"""PageRank ngoài bộ nhớ trên file cạnh và trên đồ thị nén"""
+import time
+
+import numpy as np
+
+from graph_storage import open_edge_file
+
+def out_of_core_pagerank(path, damping_factor=0.85, max_iterations=100, tolerance=1e-6, block_edges=1 << 22,
+                         initial=None):
+    """PageRank đọc cạnh trực tiếp từ file cạnh (np.memmap) theo từng block block_edges cạnh
+    
+    Trong RAM chỉ có các vector độ dài n và một block cạnh, nên bộ nhớ là O(n + block_edges)
+    thay vì O(m). Một lượt đọc đầu tính out-degree (tổng trọng số), sau đó mỗi vòng power
+    iteration là một lượt đọc cả file; phép lặp giống _power_iteration nên kết quả khớp
+    calculate_pagerank_from_matrix với cùng đồ thị (trong phạm vi tolerance).
+    Block nên có ít nhất cỡ n cạnh vì mỗi block cộng vào vector độ dài n.
+    
+    Trả về (pagerank, stats) với stats gồm số lượt đọc và throughput cạnh/giây.
+    """
+    if block_edges < 1:
+        raise ValueError("block_edges must be at least 1")
+    n, edges = open_edge_file(path)
+    if n == 0:
+        return np.zeros(0), {'iterations': 0, 'converged': True, 'residual_history': []}
+    weighted = 'weight' in edges.dtype.names
+    
+    def blocks():
+        for start in range(0, len(edges), block_edges):
+            block = edges[start:start + block_edges]
+            yield block['source'], block['target'], block['weight'] if weighted else None
+    
+    start_time = time.perf_counter()
+    out_weight = np.zeros(n)
+    for sources, targets, weights in blocks():
+        out_weight += np.bincount(sources, weights=weights, minlength=n)
+    linked = out_weight > 0
+    scale = np.divide(1.0, out_weight, out=np.zeros(n), where=linked)
+    
+    pagerank = np.full(n, 1.0 / n) if initial is None else np.asarray(initial, dtype=float).copy()
+    residual_history = []
+    converged = False
+    iterations = 0
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        share = pagerank * scale
+        new_pagerank = np.zeros(n)
+        for sources, targets, weights in blocks():
+            contributions = share[sources] if weights is None else share[sources] * weights
+            new_pagerank += np.bincount(targets, weights=contributions, minlength=n)
+        new_pagerank *= damping_factor
+        new_pagerank += ((1 - damping_factor) + damping_factor * pagerank[~linked].sum()) / n
+        new_pagerank /= new_pagerank.sum()
+        residual = np.abs(new_pagerank - pagerank).sum()
+        residual_history.append(residual)
+        pagerank = new_pagerank
+        if residual < tolerance:
+            converged = True
+            break
+    
+    elapsed = time.perf_counter() - start_time
+    passes = iterations + 1
+    return pagerank, {
+        'iterations': iterations,
+        'converged': converged,
+        'residual_history': residual_history,
+        'edges': len(edges),
+        'block_edges': block_edges,
+        'passes': passes,
+        'edges_per_second': passes * len(edges) / elapsed if elapsed > 0 else float('inf'),
+    }
+
+def compressed_pagerank(graph, out_weight, damping_factor=0.85, max_iterations=100, tolerance=1e-6,
+                        initial=None, links='in'):
+    """PageRank trên đồ thị nén (CompressedGraph), out_weight là tổng trọng số out-link của từng trang
+    
+    links='in': graph là ma trận kề chuyển vị (hàng v = các trang link tới v, trọng số cạnh
+    nếu có), mỗi vòng nhân graph với rank / out_weight (SpMV theo hàng). links='out': graph là
+    chính ma trận kề, mỗi vòng rải rank / out_weight theo out-link (graph.transpose_matmul).
+    Cả hai giải nén dần từng block hàng từ buffer; phép lặp giống _power_iteration.
+    """
+    if links not in ('in', 'out'):
+        raise ValueError(f"Unknown link direction: {links}")
+    multiply = graph.__matmul__ if links == 'in' else graph.transpose_matmul
+    n = graph.shape[0]
+    out_weight = np.asarray(out_weight, dtype=float)
+    linked = out_weight > 0
+    scale = np.divide(1.0, out_weight, out=np.zeros(n), where=linked)
+    pagerank = np.full(n, 1.0 / n) if initial is None else np.asarray(initial, dtype=float).copy()
+    residual_history = []
+    converged = False
+    iterations = 0
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        new_pagerank = damping_factor * multiply(pagerank * scale)
+        new_pagerank += ((1 - damping_factor) + damping_factor * pagerank[~linked].sum()) / n
+        new_pagerank /= new_pagerank.sum()
+        residual = np.abs(new_pagerank - pagerank).sum()
+        residual_history.append(residual)
+        pagerank = new_pagerank
+        if residual < tolerance:
+            converged = True
+            break
+    return pagerank, {'iterations': iterations, 'converged': converged, 'warm_start': initial is not None,
+                      'residual_history': residual_history}
@@ -0,0 +1,138 @@
+"""Power iteration với SpMV chia block hàng trên pool process dùng chung (shared memory)"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Pool process duy nhất cho SpMV song song, dùng chung giữa mọi request; mỗi lần giải chỉ
+# chia `workers` block nên số process không tăng theo các giá trị workers khác nhau.
+# PARALLEL_MAX_WORKERS cũng là số process tối đa của một lần giải monte_carlo / bsp
+PARALLEL_MAX_WORKERS = int(os.environ.get('PAGERANK_PARALLEL_WORKERS', os.cpu_count() or 1))
+_shared_spmv_executor = None
+_shared_spmv_executor_lock = threading.Lock()
+# Trong worker: các segment shared memory đã attach, theo bộ tên segment của mỗi lần giải
+SHARED_SPMV_ATTACHED_SOLVES = 4
+_attached_spmv_segments = OrderedDict()
+
+def _shared_spmv_pool():
+    """Lấy (hoặc tạo) pool process PARALLEL_MAX_WORKERS worker của module"""
+    global _shared_spmv_executor
+    with _shared_spmv_executor_lock:
+        if _shared_spmv_executor is None:
+            _shared_spmv_executor = ProcessPoolExecutor(max_workers=PARALLEL_MAX_WORKERS)
+        return _shared_spmv_executor
+
+def _attach_shared_arrays(layout):
+    """Trong worker: map các segment (name, dtype, length) thành numpy array, có cache"""
+    key = tuple(name for name, _, _ in layout)
+    attached = _attached_spmv_segments.get(key)
+    if attached is None:
+        segments = [shared_memory.SharedMemory(name=name) for name in key]
+        arrays = [np.ndarray(length, dtype=dtype, buffer=segment.buf)
+                  for segment, (_, dtype, length) in zip(segments, layout)]
+        attached = _attached_spmv_segments[key] = (segments, arrays)
+        while len(_attached_spmv_segments) > SHARED_SPMV_ATTACHED_SOLVES:
+            old_segments, old_arrays = _attached_spmv_segments.popitem(last=False)[1]
+            del old_arrays
+            for segment in old_segments:
+                segment.close()
+    else:
+        _attached_spmv_segments.move_to_end(key)
+    return attached[1]
+
+def _shared_spmv_block(layout, start_row, end_row):
+    """Worker: y[start_row:end_row] = (T @ x)[start_row:end_row] trên shared memory"""
+    _spmv_rows(*_attach_shared_arrays(layout), start_row, end_row)
+
+def _spmv_rows(indptr, indices, data, x, y, start_row, end_row):
+    """y[start_row:end_row] = (T @ x)[start_row:end_row]
+    
+    Mỗi hàng được cộng trọn trong một block theo đúng thứ tự cạnh, nên kết quả không
+    phụ thuộc số worker hay cách chia block.
+    """
+    row_starts = indptr[start_row:end_row]
+    nonempty = np.flatnonzero(np.diff(indptr[start_row:end_row + 1]))
+    first, last = indptr[start_row], indptr[end_row]
+    block = y[start_row:end_row]
+    block[:] = 0.0
+    if len(nonempty):
+        products = data[first:last] * x[indices[first:last]]
+        block[nonempty] = np.add.reduceat(products, row_starts[nonempty] - first)
+
+def balanced_row_blocks(indptr, blocks):
+    """Chia các hàng thành tối đa `blocks` đoạn liên tiếp có tổng (số cạnh + số hàng) gần bằng nhau"""
+    num_rows = len(indptr) - 1
+    work = indptr + np.arange(num_rows + 1)
+    targets = work[-1] * np.arange(1, blocks) / blocks
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(work, targets), [num_rows])))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _block_power_iteration(x, y, multiply, dangling_nodes, damping_factor, max_iterations, tolerance, initial):
+    """Vòng lặp power iteration trên hai buffer x, y; multiply() ghi T @ x vào y"""
+    n = len(x)
+    x[:] = 1.0 / n if initial is None else initial
+    residual_history = []
+    converged = False
+    iteration = 0
+    for iteration in range(max_iterations):
+        multiply()
+        new_pagerank = damping_factor * y
+        new_pagerank += ((1 - damping_factor) + damping_factor * x[dangling_nodes].sum()) / n
+        new_pagerank /= new_pagerank.sum()
+        residual = np.abs(new_pagerank - x).sum()
+        residual_history.append(float(residual))
+        x[:] = new_pagerank
+        if residual < tolerance:
+            converged = True
+            break
+    return x.copy(), {'iterations': iteration + 1, 'converged': converged, 'warm_start': initial is not None,
+                      'residual_history': residual_history}
+
+def _parallel_power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                              initial=None, workers=1):
+    """Power iteration với SpMV chia theo block hàng cho nhiều process qua shared memory
+    
+    CSR và vector rank nằm trong shared memory (không copy mỗi vòng), mỗi worker tính
+    một block hàng cân bằng theo số cạnh trên pool process chung của module (workers tối
+    đa PARALLEL_MAX_WORKERS). Phần còn lại (dangling, chuẩn hóa, residual) chạy ở process
+    chính, nên kết quả giống hệt nhau với mọi số worker. workers = 1 (mặc định) nhân ngay
+    trong process hiện tại, không cần shared memory hay pool.
+    """
+    workers = max(1, min(workers, PARALLEL_MAX_WORKERS))
+    n = transition_matrix.shape[0]
+    blocks = balanced_row_blocks(transition_matrix.indptr, workers)
+    
+    if len(blocks) <= 1:
+        x, y = np.empty(n), np.empty(n)
+        arrays = (transition_matrix.indptr, transition_matrix.indices, transition_matrix.data, x, y)
+        pagerank, stats = _block_power_iteration(x, y, lambda: _spmv_rows(*arrays, 0, n), dangling_nodes,
+                                                 damping_factor, max_iterations, tolerance, initial)
+    else:
+        sources = [transition_matrix.indptr, transition_matrix.indices, transition_matrix.data,
+                   np.empty(n), np.empty(n)]
+        segments = []
+        arrays = []
+        try:
+            for source in sources:
+                segment = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+                segments.append(segment)
+                arrays.append(np.ndarray(source.shape, dtype=source.dtype, buffer=segment.buf))
+                arrays[-1][:] = source
+            layout = tuple((segment.name, source.dtype.str, len(source))
+                           for segment, source in zip(segments, sources))
+            pool = _shared_spmv_pool()
+            pagerank, stats = _block_power_iteration(
+                arrays[3], arrays[4], lambda: list(pool.map(_shared_spmv_block, [layout] * len(blocks), *zip(*blocks))),
+                dangling_nodes, damping_factor, max_iterations, tolerance, initial)
+        finally:
+            # Phải bỏ hết view numpy trước khi đóng segment
+            arrays = None
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+    
+    stats.update({'workers': workers, 'blocks': len(blocks)})
+    return pagerank, stats
@@ -0,0 +1,229 @@
+"""Power iteration (có ngoại suy, dừng sớm theo top-k) và power iteration thích nghi"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _aitken_extrapolation(x0, x1, x2):
+    """Ngoại suy Aitken Δ² theo từng thành phần từ ba iterate liên tiếp"""
+    denominator = x2 - 2 * x1 + x0
+    extrapolated = x2.copy()
+    mask = denominator != 0
+    extrapolated[mask] = x0[mask] - (x1[mask] - x0[mask]) ** 2 / denominator[mask]
+    # Thành phần bị ngoại suy hỏng (âm / không hữu hạn) giữ nguyên giá trị x2
+    bad = ~np.isfinite(extrapolated) | (extrapolated < 0)
+    extrapolated[bad] = x2[bad]
+    return extrapolated
+
+def _quadratic_extrapolation(x0, x1, x2, x3):
+    """Quadratic extrapolation (Kamvar et al.) từ bốn iterate liên tiếp
+    
+    Iterate suy biến (hiệu giữa các iterate phụ thuộc tuyến tính, ví dụ đã hội tụ hoặc dao
+    động tuần hoàn) làm hệ bình phương tối thiểu thiếu hạng: khi đó giữ nguyên x3.
+    """
+    y = np.column_stack((x1 - x0, x2 - x0))
+    if not np.isfinite(y).all():
+        return x3
+    gamma, _, rank, _ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    if rank < 2:
+        return x3
+    gamma_1, gamma_2, gamma_3 = float(gamma[0]), float(gamma[1]), 1.0
+    beta_0 = gamma_1 + gamma_2 + gamma_3
+    beta_1 = gamma_2 + gamma_3
+    beta_2 = gamma_3
+    extrapolated = beta_0 * x1 + beta_1 * x2 + beta_2 * x3
+    return np.maximum(extrapolated, 0)
+
+# Độ lệch tương đối tối đa giữa hai tỉ số residual liên tiếp để coi là đã ổn định
+EXTRAPOLATION_RATIO_STABILITY = 1e-4
+
+EXTRAPOLATION_METHODS = {
+    'aitken': (3, _aitken_extrapolation),
+    'quadratic': (4, _quadratic_extrapolation),
+}
+
+def _top_k_order_certified(pagerank, top_k, error_bound):
+    """Thứ tự của top_k node (và tập top_k) chắc chắn đúng khi mỗi thành phần lệch tối đa error_bound
+    
+    Đủ điều kiện khi mọi khoảng cách giữa hai giá trị liền kề trong top_k + 1 giá trị lớn
+    nhất đều lớn hơn 2 * error_bound.
+    """
+    count = min(top_k + 1, len(pagerank))
+    candidates = np.argpartition(-pagerank, count - 1)[:count]
+    values = np.sort(pagerank[candidates])
+    return bool(np.all(np.diff(values) > 2 * error_bound))
+
+def _power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                     initial=None, acceleration=None, extrapolation_period=10, top_k=None):
+    """Power iteration chuẩn, tùy chọn ngoại suy Aitken / quadratic định kỳ
+    
+    Với top_k, dừng sớm ngay khi thứ tự top_k đã chắc chắn: Google matrix co theo chuẩn L1
+    với hệ số d nên ||x* - x_new||_1 <= d / (1 - d) * ||x_new - x||_1, và vì sai số có tổng
+    bằng 0 nên mỗi thành phần lệch tối đa một nửa giá trị đó.
+    """
+    n = transition_matrix.shape[0]
+    
+    if acceleration is not None and acceleration not in EXTRAPOLATION_METHODS:
+        raise ValueError(f"Unknown acceleration method: {acceleration}")
+    
+    # Initialize PageRank
+    pagerank = np.ones(n) / n if initial is None else initial.copy()
+    
+    # Lưu các iterate gần nhất để ngoại suy
+    history = []
+    since_extrapolation = 0
+    iterations = 0
+    converged = False
+    top_k_certified = False
+    checked_bound = np.inf
+    residual_history = []
+    
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        
+        # Tính dangling contribution
+        dangling_contrib = pagerank[dangling_nodes].sum()
+        
+        # Tính PageRank mới (teleport và mass dangling chia đều: cộng một số vô hướng)
+        new_pagerank = damping_factor * (transition_matrix @ pagerank)
+        new_pagerank += ((1 - damping_factor) + damping_factor * dangling_contrib) / n
+        
+        # Normalize
+        new_pagerank = new_pagerank / np.sum(new_pagerank)
+        
+        # Check convergence
+        residual = np.linalg.norm(new_pagerank - pagerank, 1)
+        residual_history.append(residual)
+        if residual < tolerance:
+            logger.info(f"Converged after {iteration + 1} iterations")
+            converged = True
+            break
+        
+        # Kiểm tra lại thứ tự top_k mỗi khi cận sai số giảm một nửa (O(n) mỗi lần kiểm tra)
+        error_bound = damping_factor / (1 - damping_factor) * residual / 2
+        if top_k is not None and error_bound <= checked_bound / 2:
+            checked_bound = error_bound
+            if _top_k_order_certified(new_pagerank, top_k, error_bound):
+                logger.info(f"Top-{top_k} order certified after {iteration + 1} iterations")
+                converged = top_k_certified = True
+                pagerank = new_pagerank
+                break
+        
+        # Ngoại suy định kỳ để tăng tốc hội tụ
+        if acceleration is not None:
+            required, extrapolate = EXTRAPOLATION_METHODS[acceleration]
+            history.append(new_pagerank)
+            history = history[-required:]
+            since_extrapolation += 1
+            # Chỉ ngoại suy khi tỉ số residual liên tiếp đã ổn định: lúc đó sai số bị chi phối
+            # bởi vài vector riêng trội, đúng giả thiết của Aitken / quadratic
+            ratios = np.divide(residual_history[-2:], residual_history[-3:-1]) if len(residual_history) >= 3 else None
+            ratio_stable = (ratios is not None and
+                            abs(ratios[1] - ratios[0]) <= EXTRAPOLATION_RATIO_STABILITY * ratios[1])
+            if since_extrapolation >= extrapolation_period and len(history) == required and ratio_stable:
+                since_extrapolation = 0
+                extrapolated = extrapolate(*history)
+                total = extrapolated.sum()
+                # Kết quả ngoại suy hỏng (không hữu hạn, tổng <= 0) thì bỏ qua, giữ iterate thường
+                if np.isfinite(total) and total > 0:
+                    new_pagerank = extrapolated / total
+                # Iterate đã ngoại suy không thuộc chuỗi power iteration cũ
+                history = [new_pagerank]
+            
+        pagerank = new_pagerank
+    
+    stats = {'iterations': iterations, 'converged': converged, 'acceleration': acceleration,
+             'warm_start': initial is not None, 'residual_history': residual_history}
+    if top_k is not None:
+        stats['top_k'] = top_k
+        stats['top_k_certified'] = top_k_certified
+    return pagerank, stats
+
+def _adaptive_power_iteration(transition_matrix, dangling_nodes, damping_factor, max_iterations, tolerance,
+                              initial=None, node_tolerance=None, refresh_period=10):
+    """Adaptive PageRank (Kamvar et al.): bỏ qua các node đã hội tụ cục bộ
+    
+    Node i bị "đóng băng" khi thay đổi tương đối |x_i' - x_i| / x_i <= node_tolerance
+    ở hai lần cập nhật liên tiếp; các vòng sau chỉ nhân khối hàng của node còn active. Cứ refresh_period vòng
+    (hoặc khi mọi node đã đóng băng) lại chạy một vòng đầy đủ để tính residual L1
+    thật và mở khóa lại node nào còn thay đổi.
+    
+    Độ chính xác: chỉ dừng ở vòng đầy đủ có residual L1 < tolerance, tức cùng tiêu
+    chí dừng với power iteration. Giữa hai vòng đầy đủ, giá trị bị đóng băng lệch
+    khỏi power iteration tối đa khoảng node_tolerance * d / (1 - d) theo chuẩn L1
+    (giả sử mỗi thành phần hội tụ hình học với tốc độ <= d); mặc định
+    node_tolerance = tolerance * (1 - d) / d để sai lệch này không vượt tolerance.
+    """
+    n = transition_matrix.shape[0]
+    if node_tolerance is None:
+        node_tolerance = tolerance * (1 - damping_factor) / damping_factor if damping_factor > 0 else tolerance
+    
+    pagerank = np.ones(n) / n if initial is None else initial.copy()
+    teleport = (1 - damping_factor) / n
+    active = np.ones(n, dtype=bool)
+    # Node có thay đổi nhỏ ở lần cập nhật trước; chỉ đóng băng khi nhỏ hai lần liên tiếp
+    # để tránh các node chưa nhận được lan truyền từ vector khởi tạo (thay đổi tạm bằng 0)
+    settled = np.zeros(n, dtype=bool)
+    verify = False
+    block_rows = None
+    iterations = 0
+    converged = False
+    edge_updates = 0
+    # Residual L1 thật chỉ có ở các vòng đầy đủ
+    residual_history = []
+    residual_iterations = []
+    
+    for iteration in range(max_iterations):
+        iterations = iteration + 1
+        full = verify or active.all() or not active.any() or iterations % refresh_period == 0
+        dangling_contrib = pagerank[dangling_nodes].sum()
+        
+        if full:
+            block_rows = None
+            new_pagerank = teleport + damping_factor * (transition_matrix @ pagerank + dangling_contrib / n)
+            new_pagerank = new_pagerank / np.sum(new_pagerank)
+            delta = np.abs(new_pagerank - pagerank)
+            edge_updates += transition_matrix.nnz
+            residual_history.append(delta.sum())
+            residual_iterations.append(iterations)
+            
+            if delta.sum() < tolerance:
+                logger.info(f"Adaptive PageRank converged after {iterations} iterations")
+                pagerank = new_pagerank
+                converged = True
+                break
+            small = delta <= node_tolerance * pagerank
+            active = ~(small & settled)
+            settled = small
+            verify = False
+            pagerank = new_pagerank
+        else:
+            # Chỉ nhân khối hàng của các node còn active. Trích khối tốn vài lượt qua
+            # các cạnh, nên chỉ trích lại khi tập active co đáng kể so với khối đang dùng
+            if block_rows is None or active.sum() < 0.9 * len(block_rows):
+                block_rows = np.flatnonzero(active)
+                active_block = transition_matrix.take_rows(block_rows)
+            new_values = teleport + damping_factor * (active_block @ pagerank + dangling_contrib / n)
+            old_values = pagerank[block_rows]
+            delta = np.abs(new_values - old_values)
+            edge_updates += active_block.nnz
+            
+            # Residual của khối active đã nhỏ: vòng sau chạy đầy đủ để xác nhận hội tụ
+            verify = delta.sum() < tolerance
+            small = delta <= node_tolerance * old_values
+            active[block_rows] = ~(small & settled[block_rows])
+            settled[block_rows] = small
+            pagerank[block_rows] = new_values
+    
+    stats = {
+        'iterations': iterations,
+        'converged': converged,
+        'node_tolerance': node_tolerance,
+        'warm_start': initial is not None,
+        # Khối lượng SpMV (số cạnh đã duyệt) so với power iteration đầy đủ cùng số vòng
+        'work_fraction': edge_updates / (iterations * transition_matrix.nnz) if iterations and transition_matrix.nnz else 1.0,
+        'residual_history': residual_history,
+        'residual_iterations': residual_iterations,
+    }
+    return pagerank, stats
@@ -0,0 +1,459 @@
+"""Đồ thị cập nhật tăng dần (PageRankSession) và các thuật toán push cục bộ"""
+import threading
+from collections import defaultdict, deque
+
+import numpy as np
+
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers.power import _power_iteration
+
+class PageRankSession:
+    """Đồ thị lưu trên server, cập nhật PageRank tăng dần khi thêm / xóa cạnh
+    
+    Giữ nghiệm x (chưa chuẩn hóa) cùng residual của hệ tuyến tính PageRank
+    r = (1 - d)/n + d * (T x + dangling_mass / n) - x. Phần dangling chia đều
+    cho mọi node nên được gom vào một đại lượng vô hướng uniform_residual
+    (mỗi node nhận uniform_residual / n).
+    
+    Đổi out-link của node u chỉ làm thay đổi residual tại out-neighbors cũ / mới
+    của u, vì vậy cập nhật bằng push theo frontier: mỗi vòng đẩy residual của
+    mọi node có |r_u| > eps = tolerance * (1 - d) / (4n) sang out-neighbors, tới khi
+    ||r||_1 <= tolerance * (1 - d) / 2. Sai số e = x* - x thỏa (I - d M) e = r nên
+    ||e||_1 <= ||r||_1 / (1 - d): phần push để lại đóng góp tối đa tolerance / 2, cộng
+    với residual của lần giải đầy đủ gần nhất (base_residual_l1). Cận L1 của PageRank
+    đã chuẩn hóa so với nghiệm chính xác trả về trong stats error_bound.
+    
+    Khi thay đổi quá lớn hoặc công việc push vượt công việc của lần giải đầy đủ gần
+    nhất (work_fraction > 1), session dừng push và giải lại đầy đủ bằng power
+    iteration warm start từ nghiệm hiện tại.
+    
+    Cạnh không có trọng số: mọi phần tử khác 0 của ma trận kề được coi là một link.
+    """
+    
+    def __init__(self, urls, adjacency, damping_factor=0.85, tolerance=1e-6, max_iterations=100,
+                 max_changed_fraction=0.05):
+        self.urls = list(urls)
+        self.url_to_index = {url: i for i, url in enumerate(self.urls)}
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        # Tỉ lệ cạnh thay đổi tối đa để còn cập nhật tăng dần
+        self.max_changed_fraction = max_changed_fraction
+        self.lock = threading.Lock()
+        
+        if not isinstance(adjacency, CSRMatrix):
+            adjacency = CSRMatrix.from_dense(adjacency)
+        self._rebuild(CSRMatrix(adjacency.indptr, adjacency.indices, np.ones(adjacency.nnz), adjacency.shape))
+        self._full_solve(None)
+    
+    @property
+    def n(self):
+        return len(self.urls)
+    
+    @property
+    def num_edges(self):
+        return int(self.out_degree.sum())
+    
+    def _rebuild(self, adjacency):
+        """Đặt lại cấu trúc đồ thị từ CSR (hàng = node nguồn)"""
+        self.adjacency = adjacency
+        # Out-link của các node đã sửa từ lần rebuild trước (ghi đè hàng trong CSR)
+        self.overrides = {}
+        self._in_adjacency = None
+        self.out_degree = np.diff(adjacency.indptr)
+        self.is_overridden = np.zeros(adjacency.shape[0], dtype=bool)
+        self.dangling_count = int(np.sum(self.out_degree == 0))
+    
+    def _edges(self):
+        """Danh sách cạnh hiện tại (nguồn, đích), gồm cả các out-link đã sửa"""
+        sources = self.adjacency._row_ids
+        keep = ~self.is_overridden[sources]
+        override_sources = [np.full(len(targets), u) for u, targets in self.overrides.items()]
+        override_targets = list(self.overrides.values())
+        return (np.concatenate([sources[keep]] + override_sources).astype(np.int64),
+                np.concatenate([self.adjacency.indices[keep]] + override_targets).astype(np.int64))
+    
+    def _compact(self):
+        """Gộp các out-link đã sửa vào một CSR mới"""
+        if not self.overrides:
+            return
+        size = self.adjacency.shape[0]
+        sources, targets = self._edges()
+        self._rebuild(CSRMatrix.from_edges(sources, targets, (size, size)))
+    
+    def _grow(self, count):
+        """Thêm count node mới (chưa có out-link) vào cuối"""
+        self._compact()
+        size = self.adjacency.shape[0] + count
+        indptr = np.concatenate((self.adjacency.indptr, np.full(count, self.adjacency.indptr[-1])))
+        self._rebuild(CSRMatrix(indptr, self.adjacency.indices, self.adjacency.data, (size, size)))
+    
+    def out_links(self, u):
+        if self.is_overridden[u]:
+            return self.overrides[u]
+        return self.adjacency.indices[self.adjacency.indptr[u]:self.adjacency.indptr[u + 1]]
+    
+    def _full_solve(self, initial):
+        """Giải đầy đủ rồi tính lại residual chính xác"""
+        self._compact()
+        transition_matrix, dangling_nodes = build_transition_matrix(self.adjacency)
+        pagerank, stats = _power_iteration(transition_matrix, dangling_nodes, self.damping_factor,
+                                           self.max_iterations, self.tolerance, initial=initial)
+        d, n = self.damping_factor, self.n
+        self.x = pagerank
+        # Residual còn lại của lần giải đầy đủ (đã chấp nhận, không push lại)
+        base_residual = ((1 - d) / n + d * (transition_matrix @ pagerank + pagerank[dangling_nodes].sum() / n)
+                         - pagerank)
+        self.base_residual_l1 = float(np.abs(base_residual).sum())
+        self.residual = np.zeros(n)
+        self.uniform_residual = 0.0
+        if initial is None:
+            # Công việc (số lần cập nhật cạnh) của một lần giải từ đầu: ngân sách cho push
+            self.full_solve_work = max(stats['iterations'], 1) * max(self.num_edges, 1)
+        return stats
+    
+    def error_bound(self):
+        """Cận sai số L1 của PageRank đã chuẩn hóa so với nghiệm chính xác
+        
+        ||x - x*||_1 <= ||r||_1 / (1 - d); chuẩn hóa x / sum(x) làm cận tăng tối đa gấp đôi
+        vì |sum(x) - 1| = |sum(x - x*)| <= ||x - x*||_1.
+        """
+        residual_l1 = self.base_residual_l1 + float(np.abs(self.residual).sum()) + abs(self.uniform_residual)
+        return float(2 * residual_l1 / (1 - self.damping_factor))
+    
+    def _set_out_links(self, u, targets):
+        """Thay out-link của u và sửa residual tương ứng (chỉ chạm out-neighbors cũ / mới)"""
+        d = self.damping_factor
+        old = self.out_links(u)
+        if len(old):
+            np.add.at(self.residual, old, -d * self.x[u] / len(old))
+        else:
+            self.uniform_residual -= d * self.x[u]
+            self.dangling_count -= 1
+        if len(targets):
+            np.add.at(self.residual, targets, d * self.x[u] / len(targets))
+        else:
+            self.uniform_residual += d * self.x[u]
+            self.dangling_count += 1
+        
+        self.overrides[u] = targets
+        self.is_overridden[u] = True
+        self.out_degree[u] = len(targets)
+        self._in_adjacency = None
+    
+    def _push(self, target, budget):
+        """Push residual theo frontier tới khi ||r||_1 <= target
+        
+        Dừng (converged = False) khi công việc vượt budget hoặc sau max_iterations vòng.
+        """
+        d, n = self.damping_factor, self.n
+        # Nếu ||r||_1 > target thì hoặc có node |r_u| > eps, hoặc phần chia đều vượt target / 2
+        eps = target / (2 * n)
+        # Cạnh từ CSR của các node chưa sửa; node đã sửa (ít) xử lý riêng từng node
+        base_sources, base_targets = self.adjacency._row_ids, self.adjacency.indices
+        keep = ~self.is_overridden[base_sources]
+        base_sources, base_targets = base_sources[keep], base_targets[keep]
+        num_edges = max(self.num_edges, 1)
+        in_weight = None
+        pushes = 0
+        work = 0
+        
+        for _ in range(self.max_iterations):
+            if np.abs(self.residual).sum() + abs(self.uniform_residual) <= target:
+                return True, pushes, work
+            if work > budget:
+                break
+            
+            uniform = self.uniform_residual / n
+            if abs(uniform) > eps:
+                # Đẩy phần residual chia đều: x += c cho mọi node, residual nhận d * c * (T 1)
+                # cộng phần dangling lại chia đều
+                if in_weight is None:
+                    in_weight = self._in_weight()
+                self.x += uniform
+                self.residual += d * uniform * in_weight
+                self.uniform_residual = d * uniform * self.dangling_count
+                work += n
+            
+            frontier = np.flatnonzero(np.abs(self.residual) > eps)
+            amounts = self.residual[frontier]
+            self.x[frontier] += amounts
+            self.residual[frontier] = 0.0
+            pushes += len(frontier)
+            
+            degrees = self.out_degree[frontier]
+            dangling = degrees == 0
+            self.uniform_residual += d * amounts[dangling].sum()
+            
+            based = ~dangling & ~self.is_overridden[frontier]
+            if degrees.sum() > 0.3 * num_edges:
+                # Frontier lớn: một lượt qua toàn bộ cạnh (như một vòng Jacobi) rẻ hơn trích khối
+                scaled = np.zeros(n)
+                scaled[frontier[based]] = d * amounts[based] / degrees[based]
+                self.residual += np.bincount(base_targets, weights=scaled[base_sources], minlength=n)
+                work += len(base_sources)
+            else:
+                block = self.adjacency.take_rows(frontier[based])
+                weights = (d * amounts[based] / degrees[based])[block._row_ids]
+                self.residual += np.bincount(block.indices, weights=weights, minlength=n)
+                work += block.nnz
+            
+            for u, amount in zip(frontier[~dangling & ~based], amounts[~dangling & ~based]):
+                targets = self.overrides[u]
+                np.add.at(self.residual, targets, d * amount / len(targets))
+                work += len(targets)
+        
+        return np.abs(self.residual).sum() + abs(self.uniform_residual) <= target, pushes, work
+    
+    def _in_weight(self):
+        """T 1: tổng 1/out_degree(u) trên các in-link của mỗi node"""
+        sources, targets = self._edges()
+        return np.bincount(targets, weights=1.0 / self.out_degree[sources], minlength=self.n)
+    
+    def update(self, add_edges=(), remove_edges=()):
+        """Thêm / xóa cạnh (cặp URL nguồn, đích) rồi cập nhật PageRank"""
+        additions = defaultdict(set)
+        removals = defaultdict(set)
+        new_urls = []
+        for source, target in add_edges:
+            for url in (source, target):
+                if url not in self.url_to_index:
+                    self.url_to_index[url] = len(self.urls)
+                    self.urls.append(url)
+                    new_urls.append(url)
+            additions[self.url_to_index[source]].add(self.url_to_index[target])
+        for source, target in remove_edges:
+            if source in self.url_to_index and target in self.url_to_index:
+                removals[self.url_to_index[source]].add(self.url_to_index[target])
+        
+        if new_urls:
+            # Thêm node làm đổi n (và teleport của mọi node) nên sau đó phải giải lại đầy đủ
+            self._grow(len(new_urls))
+        
+        # Gom thay đổi theo node nguồn
+        changed_edges = 0
+        new_out_links = {}
+        for u in set(additions) | set(removals):
+            old = set(self.out_links(u).tolist())
+            new = (old | additions[u]) - removals[u]
+            if new != old:
+                changed_edges += len(old ^ new)
+                new_out_links[u] = np.array(sorted(new), dtype=np.int64)
+        
+        stats = {'changed_edges': changed_edges, 'added_nodes': len(new_urls)}
+        if new_urls or changed_edges > self.max_changed_fraction * max(self.num_edges, 1):
+            for u, targets in new_out_links.items():
+                self.overrides[u] = targets
+                self.is_overridden[u] = True
+                self.out_degree[u] = len(targets)
+            initial = np.concatenate((self.x, np.full(len(new_urls), 1.0 / self.n)))
+            solve_stats = self._full_solve(initial / initial.sum())
+            stats.update({'mode': 'full', 'iterations': solve_stats['iterations'],
+                          'converged': solve_stats['converged'], 'error_bound': self.error_bound()})
+            return stats
+        
+        for u, targets in new_out_links.items():
+            self._set_out_links(u, targets)
+        if len(self.overrides) > 0.05 * self.n:
+            self._compact()
+        
+        converged, pushes, work = self._push(self.tolerance * (1 - self.damping_factor) / 2,
+                                             self.full_solve_work)
+        stats.update({'pushes': pushes, 'work_fraction': work / self.full_solve_work})
+        if not converged:
+            # Push lan ra gần hết đồ thị: giải đầy đủ rẻ hơn, warm start từ nghiệm đã push một phần
+            solve_stats = self._full_solve(self.x / self.x.sum())
+            stats.update({'mode': 'fallback', 'iterations': solve_stats['iterations'],
+                          'converged': solve_stats['converged'], 'error_bound': self.error_bound()})
+            return stats
+        
+        stats.update({'mode': 'incremental', 'converged': True, 'error_bound': self.error_bound()})
+        return stats
+    
+    def related(self, source_url, epsilon=1e-4, top_k=10):
+        """Top-k node liên quan nhất tới source_url theo personalized PageRank cục bộ"""
+        source = self.url_to_index[source_url]
+        estimates, stats = forward_push_ppr(self.out_links, self.out_degree, source, self.damping_factor, epsilon)
+        ranked = sorted(estimates.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.urls[i], score) for i, score in ranked], stats
+    
+    def in_links(self, v):
+        if self._in_adjacency is None:
+            sources, targets = self._edges()
+            self._in_adjacency = CSRMatrix.from_edges(targets, sources, (self.n, self.n))
+        return self._in_adjacency.indices[self._in_adjacency.indptr[v]:self._in_adjacency.indptr[v + 1]]
+    
+    def _random_walk_residuals(self, starts, residual, rng):
+        """Giá trị residual tại điểm dừng của các random walk trên chuỗi rò (vector hóa)
+        
+        Mỗi bước walk dừng với xác suất 1 - d; walk tới dangling node mà chưa dừng bị hấp
+        thụ và đóng góp 0.
+        """
+        self._compact()
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        position = starts.copy()
+        values = np.zeros(len(starts))
+        walkers = np.arange(len(starts))
+        while len(walkers):
+            stop = rng.random(len(walkers)) < 1 - self.damping_factor
+            values[walkers[stop]] = [residual.get(v, 0.0) for v in position[walkers[stop]].tolist()]
+            walkers = walkers[~stop]
+            degree = self.out_degree[position[walkers]]
+            walkers, degree = walkers[degree > 0], degree[degree > 0]
+            step = indptr[position[walkers]] + (rng.random(len(walkers)) * degree).astype(np.int64)
+            position[walkers] = indices[step]
+        return values
+    
+    def target_rank(self, target_url, source_url=None, epsilon=1e-4, walks=0, confidence=0.95, seed=None):
+        """Ước lượng PageRank (hoặc PPR từ source_url) của một node đích mà không giải toàn đồ thị
+        
+        PageRank với dangling node nhảy đều (PPR: nhảy về source) bằng PageRank của chuỗi rò
+        nhân với 1 + d * pi_D / (1 - d), pi_D là tổng rank của các dangling node: lấy từ rank
+        hiện tại của session (toàn cục) hoặc kẹp bằng forward push từ source (PPR).
+        
+        Chỉ backward push (walks = 0): sai số tuyệt đối <= epsilon chắc chắn. Hai chiều
+        (walks > 0): phần residual được ước lượng bằng random walk nên push dừng sớm hơn;
+        cận sai số (Hoeffding) đúng với xác suất confidence.
+        """
+        d = self.damping_factor
+        target = self.url_to_index[target_url]
+        source = self.url_to_index[source_url] if source_url is not None else None
+        
+        def dangling_range(push_epsilon):
+            if source is None:
+                mass = float(self.x[self.out_degree == 0].sum() / self.x.sum())
+                return mass, mass, 0
+            estimates, push_stats = forward_push_ppr(self.out_links, self.out_degree, source, d, push_epsilon)
+            mass = sum(value for u, value in estimates.items() if self.out_degree[u] == 0)
+            return mass, min(mass + push_stats['residual_mass'], 1.0), push_stats['pushes']
+        
+        push_epsilon = epsilon
+        mass_low, mass_high, source_pushes = dangling_range(push_epsilon)
+        
+        # PPR chia đôi sai số cho phần backward push và phần kẹp pi_D
+        budget = epsilon if source is None else epsilon / 2
+        # Nửa độ rộng khoảng của chuỗi rò tính theo max residual: Hoeffding với random walk,
+        # nửa khoảng [0, max_residual] khi chỉ push
+        half_width = np.sqrt(np.log(2 / (1 - confidence)) / (2 * walks)) if walks else 0.5
+        r_max = budget / ((1 + d * mass_high / (1 - d)) * half_width)
+        estimates, residual, pushes = backward_push(self.in_links, self.out_degree, target, d, r_max)
+        max_residual = max(residual.values(), default=0.0)
+        if source is None:
+            pushed = sum(estimates.values()) / self.n
+        else:
+            pushed = estimates.get(source, 0.0)
+        
+        if walks:
+            rng = np.random.default_rng(seed)
+            starts = np.full(walks, source) if source is not None else rng.integers(0, self.n, walks)
+            leaky = pushed + float(self._random_walk_residuals(starts, residual, rng).mean())
+            leaky_low, leaky_high = leaky - max_residual * half_width, leaky + max_residual * half_width
+        else:
+            # Phần còn lại sum_v rho(v) r(v) nằm trong [0, max_residual]
+            leaky_low, leaky_high = pushed, pushed + max_residual
+        
+        # Forward push chặt dần tới khi độ rộng của khoảng pi_D không vượt phần sai số còn lại
+        while leaky_high * d * (mass_high - mass_low) / (1 - d) > epsilon and push_epsilon > 1e-12:
+            push_epsilon /= 4
+            mass_low, mass_high, more_pushes = dangling_range(push_epsilon)
+            source_pushes += more_pushes
+        scale_low, scale_high = 1 + d * mass_low / (1 - d), 1 + d * mass_high / (1 - d)
+        
+        low, high = max(leaky_low, 0.0) * scale_low, leaky_high * scale_high
+        stats = {
+            'pushes': pushes,
+            'touched_nodes': len(residual),
+            'r_max': float(r_max),
+            'walks': walks,
+            'dangling_mass': [mass_low, mass_high],
+            'error_bound': (high - low) / 2,
+        }
+        if walks:
+            stats['confidence'] = confidence
+        if source is not None:
+            stats['source_pushes'] = source_pushes
+        return (low + high) / 2, stats
+    
+    def results(self):
+        pagerank = self.x / self.x.sum()
+        results = [(self.urls[i], float(pagerank[i])) for i in range(self.n)]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+def forward_push_ppr(out_links, out_degree, source, damping_factor=0.85, epsilon=1e-4):
+    """Personalized PageRank từ một node nguồn bằng forward push (Andersen-Chung-Lang)
+    
+    Chỉ chạm các node quanh source: push node u khi residual r_u >= epsilon * deg(u),
+    mỗi lần push giữ (1 - d) * r_u làm ước lượng và chia d * r_u cho out-neighbors
+    (dangling node trả mass về source, giống personalized PageRank đầy đủ). Số lần
+    push tối đa O(1 / (epsilon * (1 - d))), không phụ thuộc kích thước đồ thị.
+    
+    Ước lượng p luôn là cận dưới của PPR; tổng residual còn lại là sai số L1.
+    """
+    estimates = defaultdict(float)
+    residual = defaultdict(float)
+    residual[source] = 1.0
+    queue = deque([source])
+    queued = {source}
+    pushes = 0
+    
+    while queue:
+        u = queue.popleft()
+        queued.discard(u)
+        degree = int(out_degree[u])
+        amount = residual[u]
+        if amount < epsilon * max(degree, 1):
+            continue
+        
+        estimates[u] += (1 - damping_factor) * amount
+        residual[u] = 0.0
+        pushes += 1
+        if degree:
+            targets, share = out_links(u).tolist(), damping_factor * amount / degree
+        else:
+            targets, share = [source], damping_factor * amount
+        
+        for v in targets:
+            residual[v] += share
+            if v not in queued and residual[v] >= epsilon * max(int(out_degree[v]), 1):
+                queue.append(v)
+                queued.add(v)
+    
+    stats = {
+        'pushes': pushes,
+        'touched_nodes': len(residual),
+        'residual_mass': float(sum(residual.values())),
+    }
+    return dict(estimates), stats
+
+def backward_push(in_links, out_degree, target, damping_factor=0.85, r_max=1e-4):
+    """Backward push từ node đích trên chuỗi "rò" (walk bị hấp thụ tại dangling node)
+    
+    Giữ bất biến rho_s(target) = p(s) + sum_v rho_s(v) * r(v) cho mọi nguồn s, với rho_s là
+    personalized PageRank của chuỗi rò. Push node v khi r(v) > r_max: p(v) += (1 - d) * r(v),
+    mỗi in-neighbor u nhận d * r(v) / deg(u). Chỉ chạm các node có đường đi tới target.
+    """
+    estimates = defaultdict(float)
+    residual = defaultdict(float)
+    residual[target] = 1.0
+    queue = deque([target])
+    queued = {target}
+    pushes = 0
+    
+    while queue:
+        v = queue.popleft()
+        queued.discard(v)
+        amount = residual[v]
+        if amount <= r_max:
+            continue
+        
+        estimates[v] += (1 - damping_factor) * amount
+        residual[v] = 0.0
+        pushes += 1
+        for u in in_links(v).tolist():
+            residual[u] += damping_factor * amount / out_degree[u]
+            if u not in queued and residual[u] > r_max:
+                queue.append(u)
+                queued.add(u)
+    
+    return dict(estimates), dict(residual), pushes
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_storage import CSRMatrix  # noqa: E402
+
+
+def dense_exact_pagerank(adjacency, damping_factor):
+    """PageRank chính xác bằng giải hệ tuyến tính dense (dangling phân phối đều)"""
+    matrix = adjacency.toarray() if isinstance(adjacency, CSRMatrix) else np.asarray(adjacency, dtype=float)
+    n = len(matrix)
+    row_sums = matrix.sum(axis=1)
+    transition = np.where(row_sums[:, None] > 0, matrix / np.maximum(row_sums, 1e-300)[:, None], 1.0 / n).T
+    pagerank = np.linalg.solve(np.eye(n) - damping_factor * transition, np.full(n, (1 - damping_factor) / n))
+    return pagerank / pagerank.sum()
+
+
+@pytest.fixture
+def exact_pagerank():
+    return dense_exact_pagerank
+
+
+def random_adjacency(rng, n, density=0.1):
+    sources, targets = np.nonzero(rng.random((n, n)) < density)
+    return CSRMatrix.from_edges(sources, targets, (n, n))
@@ -0,0 +1,117 @@
+"""Server giả lập Redis trong process cho test"""
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+
+
+class LocalRedisServer(socketserver.ThreadingTCPServer):
+    """Server giả lập Redis trong process (RESP, các lệnh mà cache.RedisCache dùng), để chạy
+    backend redis:// khi không có Redis thật
+
+    Chạy: server = LocalRedisServer(); server.start(); URL là server.url
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), LocalRedisHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"redis://{self.server_address[0]}:{self.server_address[1]}/0"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Dừng server và cắt mọi kết nối đang mở (giả lập Redis bị sập)"""
+        self.shutdown()
+        self.server_close()
+        with self.lock:
+            for connection in self.connections:
+                connection.shutdown(socket.SHUT_RDWR)
+            self.connections.clear()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            entry = None
+        return entry
+
+    def execute(self, command, arguments):
+        with self.lock:
+            if command == b'PING':
+                return 'PONG'
+            if command in (b'AUTH', b'SELECT'):
+                return 'OK'
+            if command == b'GET':
+                entry = self._live(arguments[0])
+                return None if entry is None else entry[0]
+            if command == b'SET':
+                expires = None
+                if len(arguments) >= 4 and arguments[2].upper() == b'PX':
+                    expires = time.time() + int(arguments[3]) / 1000
+                self.data[arguments[0]] = (arguments[1], expires)
+                return 'OK'
+            if command in (b'INCR', b'INCRBY'):
+                entry = self._live(arguments[0])
+                value = int(entry[0] if entry else 0) + (int(arguments[1]) if command == b'INCRBY' else 1)
+                self.data[arguments[0]] = (str(value).encode(), None)
+                return value
+            if command == b'DEL':
+                return sum(self.data.pop(key, None) is not None for key in arguments)
+            if command == b'SCAN':
+                pattern = arguments[arguments.index(b'MATCH') + 1] if b'MATCH' in arguments else b'*'
+                keys = [key for key in list(self.data) if self._live(key) and fnmatch.fnmatchcase(key, pattern)]
+                return [b'0', keys]
+            if command == b'FLUSHDB':
+                self.data.clear()
+                return 'OK'
+            return RuntimeError(f"unknown command '{command.decode()}'")
+
+
+class LocalRedisHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            arguments = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                arguments.append(self.rfile.read(length + 2)[:-2])
+            reply = self.server.execute(arguments[0].upper(), arguments[1:])
+            self.wfile.write(self._encode(reply))
+
+    @classmethod
+    def _encode(cls, reply):
+        """str là simple string (+OK), bytes là bulk string"""
+        if reply is None:
+            return b'$-1\r\n'
+        if isinstance(reply, Exception):
+            return b'-ERR ' + str(reply).encode() + b'\r\n'
+        if isinstance(reply, int):
+            return b':%d\r\n' % reply
+        if isinstance(reply, list):
+            return b'*%d\r\n' % len(reply) + b''.join(cls._encode(item) for item in reply)
+        if isinstance(reply, str):
+            return b'+' + reply.encode() + b'\r\n'
+        return b'$%d\r\n' % len(reply) + reply + b'\r\n'
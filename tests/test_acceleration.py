@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import app
+from graph_storage import build_transition_matrix
+from solvers import calculate_pagerank_from_matrix
+from solvers.power import _power_iteration, _quadratic_extrapolation
+from conftest import random_adjacency
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('acceleration', ['aitken', 'quadratic'])
+def test_degenerate_iterates_do_not_crash(client, acceleration):
+    response = client.post('/api/pagerank-matrix', json={
+        'urls': ['https://a.example/1', 'https://a.example/2', 'https://a.example/3'],
+        'adjacency_matrix': [[0, 1, 1], [1, 0, 0], [0, 0, 0]],
+        'acceleration': acceleration,
+    })
+    assert response.status_code == 200
+    ranks = [entry['rank'] for entry in response.get_json()['results']]
+    assert np.isfinite(ranks).all() and sum(ranks) == pytest.approx(1.0)
+
+
+def test_quadratic_keeps_last_iterate_when_rank_deficient():
+    x = np.array([0.5, 0.25, 0.25])
+    assert _quadratic_extrapolation(x, x, x, x) is x
+
+
+@pytest.mark.parametrize('acceleration', ['aitken', 'quadratic'])
+def test_small_random_graphs_match_exact(exact_pagerank, acceleration):
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(3, 8))
+        adjacency = random_adjacency(rng, n, density=0.4)
+        transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+        pagerank, _ = _power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-12,
+                                       acceleration=acceleration, extrapolation_period=3)
+        assert np.abs(pagerank - exact_pagerank(adjacency, 0.85)).sum() < 1e-9
+
+
+def test_baseline_solve_only_on_request(monkeypatch):
+    calls = []
+    original = calculate_pagerank_from_matrix
+    monkeypatch.setattr(app, 'calculate_pagerank_from_matrix', lambda *a, **k: calls.append(1) or original(*a, **k))
+    matrix, urls = [[0, 1], [1, 0]], ['https://a.example/1', 'https://a.example/2']
+    _, stats = app.run_pagerank(matrix, urls, solver_options={'acceleration': 'quadratic'})
+    assert len(calls) == 1 and 'iterations_without_acceleration' not in stats
+    _, stats = app.run_pagerank(matrix, urls, solver_options={'acceleration': 'quadratic'}, compare_baseline=True)
+    assert len(calls) == 3 and 'iterations_without_acceleration' in stats
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers.power import _adaptive_power_iteration, _power_iteration
+from conftest import random_adjacency
+
+
+def _scale_free_adjacency(rng, n, out_degree=5):
+    # Đích lệch về các node đầu để có cả node hội tụ nhanh lẫn chậm
+    sources = np.repeat(np.arange(n), out_degree)
+    targets = (n * rng.random(n * out_degree) ** 3).astype(np.int64)
+    return CSRMatrix.from_edges(sources, targets, (n, n))
+
+
+@pytest.mark.parametrize('damping_factor', [0.85, 0.95, 0.99])
+@pytest.mark.parametrize('tolerance', [1e-6, 1e-9])
+def test_adaptive_within_documented_bound(exact_pagerank, damping_factor, tolerance):
+    rng = np.random.default_rng(11)
+    graphs = [random_adjacency(rng, 150, 0.03), _scale_free_adjacency(rng, 400)]
+    for adjacency in graphs:
+        transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+        pagerank, stats = _adaptive_power_iteration(transition_matrix, dangling_nodes, damping_factor,
+                                                    5000, tolerance, refresh_period=5)
+        assert stats['converged']
+        # Dừng ở vòng đầy đủ có residual < tolerance: ||x* - x||_1 <= d / (1 - d) * tolerance
+        error = np.abs(pagerank - exact_pagerank(adjacency, damping_factor)).sum()
+        assert error <= damping_factor / (1 - damping_factor) * tolerance
+        # Đóng băng không làm sai lệch so với power iteration quá tolerance
+        reference, _ = _power_iteration(transition_matrix, dangling_nodes, damping_factor, 5000, tolerance)
+        assert np.abs(pagerank - reference).sum() <= damping_factor / (1 - damping_factor) * tolerance * 2
+
+
+def test_adaptive_skips_work_on_converged_nodes():
+    rng = np.random.default_rng(13)
+    transition_matrix, dangling_nodes = build_transition_matrix(_scale_free_adjacency(rng, 2000))
+    _, stats = _adaptive_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-8)
+    assert stats['converged']
+    assert stats['work_fraction'] < 1
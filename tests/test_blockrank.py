@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import app
+from graph_storage import CSRMatrix, build_transition_matrix, host_blocks
+from solvers import calculate_pagerank_from_matrix
+from solvers.blockrank import _blockrank, _local_block_pagerank
+from conftest import dense_exact_pagerank
+
+
+def _host_graph(seed, n=90, hosts=6):
+    """Link nội host dày, liên host thưa; có node dangling và host chỉ một trang"""
+    rng = np.random.default_rng(seed)
+    host = rng.integers(hosts, size=n)
+    host[-1] = hosts
+    probability = np.where(host[:, None] == host[None, :], 0.2, 0.01)
+    dense = (rng.random((n, n)) < probability).astype(float)
+    dense[rng.choice(n - 1, size=5, replace=False)] = 0
+    urls = [f'https://h{host[i]}.example/{i}' for i in range(n)]
+    return CSRMatrix.from_dense(dense), urls
+
+
+@pytest.mark.parametrize('damping_factor', [0.5, 0.85, 0.95])
+@pytest.mark.parametrize('seed', range(3))
+def test_blockrank_matches_exact(seed, damping_factor):
+    matrix, urls = _host_graph(seed)
+    results, stats = calculate_pagerank_from_matrix(matrix, urls, damping_factor=damping_factor, tolerance=1e-13,
+                                                    max_iterations=5000, solver='blockrank', return_stats=True)
+    assert stats['converged']
+    assert stats['blocks'] == len(host_blocks(urls)[1])
+    ranks = dict(results)
+    assert np.allclose([ranks[url] for url in urls], dense_exact_pagerank(matrix, damping_factor), rtol=1e-9, atol=0)
+
+
+def test_local_block_pagerank_is_pagerank_of_each_host():
+    matrix, urls = _host_graph(3)
+    blocks, hosts = host_blocks(urls)
+    transition, _ = build_transition_matrix(matrix)
+    local, _ = _local_block_pagerank(transition, blocks, len(hosts), 0.85, 5000, 1e-14)
+    dense = matrix.toarray()
+    for block in range(len(hosts)):
+        members = np.flatnonzero(blocks == block)
+        # Chỉ link nội host; node không có link nội host phân phối đều trong host
+        expected = dense_exact_pagerank(dense[np.ix_(members, members)], 0.85)
+        assert np.allclose(local[members], expected, rtol=1e-10, atol=0)
+
+
+def test_single_block_and_weighted(exact_pagerank):
+    rng = np.random.default_rng(37)
+    dense = (rng.random((40, 40)) < 0.1) * rng.random((40, 40)) * 5
+    matrix = CSRMatrix.from_dense(dense)
+    transition, dangling = build_transition_matrix(matrix)
+    pagerank, stats = _blockrank(transition, dangling, 0.85, 5000, 1e-13)
+    assert stats['blocks'] == 1
+    assert np.allclose(pagerank, exact_pagerank(dense, 0.85), rtol=1e-9, atol=0)
+
+
+def test_blockrank_endpoint(exact_pagerank):
+    matrix, urls = _host_graph(4, n=40)
+    response = app.app.test_client().post('/api/pagerank-matrix', json={
+        'urls': urls, 'adjacency_matrix': matrix.toarray().tolist(), 'solver': 'blockrank',
+        'local_tolerance': 1e-6,
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['solver_stats']['solver'] == 'blockrank'
+    ranks = {item['url']: item['rank'] for item in data['results']}
+    # tolerance mặc định 1e-6 (L1 giữa hai vòng): sai số L1 tới nghiệm đúng <= tol * d / (1 - d)
+    error = np.abs(np.array([ranks[url] for url in urls]) - exact_pagerank(matrix, 0.85)).sum()
+    assert error <= 1e-6 * 0.85 / 0.15
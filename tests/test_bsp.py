@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+import app
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers import calculate_pagerank_from_matrix, parallel
+from solvers.bsp import BSP_PARTITIONERS, PageRankProgram, _bsp_pagerank, bsp_bfs, run_vertex_program
+from conftest import random_adjacency
+
+
+@pytest.fixture(autouse=True)
+def allow_workers(monkeypatch):
+    # Test chạy nhiều partition hơn số CPU của máy test
+    monkeypatch.setattr(parallel, 'PARALLEL_MAX_WORKERS', 16)
+
+
+@pytest.fixture
+def singleton_partitioning(monkeypatch):
+    # Mỗi vertex một partition: phía gửi không còn gì để gộp (combiner coi như tắt)
+    monkeypatch.setitem(BSP_PARTITIONERS, 'singleton', lambda adjacency, parts: np.arange(adjacency.shape[0]))
+    return 'singleton'
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('partitioning', ['hash', 'label_propagation'])
+def test_bsp_pagerank_matches_exact(exact_pagerank, workers, partitioning):
+    rng = np.random.default_rng(17)
+    adjacency = random_adjacency(rng, 60, 0.05)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    damping_factor, tolerance = 0.85, 1e-10
+    pagerank, stats = _bsp_pagerank(transition_matrix, dangling_nodes, damping_factor, 1000, tolerance,
+                                    workers=workers, partitioning=partitioning)
+    assert stats['converged']
+    error = np.abs(pagerank - exact_pagerank(adjacency, damping_factor)).sum()
+    assert error <= damping_factor / (1 - damping_factor) * tolerance
+
+
+def test_combiner_on_off_same_result(singleton_partitioning):
+    rng = np.random.default_rng(19)
+    n = 12
+    adjacency = random_adjacency(rng, n, 0.3)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    runs = {}
+    for partitioning, workers in (('hash', 1), (singleton_partitioning, n)):
+        runs[partitioning] = _bsp_pagerank(transition_matrix, dangling_nodes, 0.85, 30, 0.0,
+                                           workers=workers, partitioning=partitioning)
+    (combined, combined_stats), (separate, separate_stats) = runs['hash'], runs[singleton_partitioning]
+    assert np.allclose(combined, separate, rtol=0, atol=1e-15)
+
+    # Một partition: mỗi superstep một message cho mỗi vertex có in-link. Mỗi vertex một partition:
+    # một message cho mỗi cạnh
+    supersteps = combined_stats['supersteps']
+    receivers = len(np.unique(adjacency.indices))
+    assert combined_stats['messages'] == supersteps * receivers
+    assert separate_stats['messages'] == supersteps * adjacency.nnz
+    assert separate_stats['boundary_messages'] == supersteps * int(np.sum(adjacency._row_ids != adjacency.indices))
+
+    distances, _ = bsp_bfs(adjacency, 0, workers=1)
+    separate_distances, _ = bsp_bfs(adjacency, 0, workers=n, partitioning=singleton_partitioning)
+    assert np.array_equal(distances, separate_distances)
+
+
+def test_aggregator_halts_superstep():
+    rng = np.random.default_rng(23)
+    adjacency = random_adjacency(rng, 80, 0.05)
+    program = PageRankProgram(0.85, 1e-6)
+    _, stats = run_vertex_program(adjacency, program, workers=2, max_supersteps=1000)
+    residuals = [aggregates['residual'] for aggregates in stats['aggregate_history'][1:]]
+    assert stats['halted']
+    # Dừng ngay ở superstep đầu tiên có tổng residual của mọi partition < tolerance
+    assert residuals[-1] < 1e-6 and all(residual >= 1e-6 for residual in residuals[:-1])
+    assert stats['supersteps'] == len(residuals) + 1
+
+
+def test_halts_without_messages_and_at_max_supersteps():
+    n = 6
+    chain = CSRMatrix.from_edges(np.arange(n - 1), np.arange(1, n), (n, n))
+    distances, stats = bsp_bfs(chain, 0, workers=2)
+    assert distances.tolist() == list(range(n))
+    # Không còn message: dừng dù halt() chưa bao giờ trả về True
+    assert not stats['halted'] and stats['supersteps'] == n
+
+    _, stats = run_vertex_program(chain, PageRankProgram(0.85, 0.0), workers=2, max_supersteps=4)
+    assert not stats['halted'] and stats['supersteps'] == 4
+
+
+@pytest.mark.parametrize('initial_ranks', [None, {'a': 0.8, 'b': 0.1, 'c': 0.1}])
+@pytest.mark.parametrize('urls', [['a'], ['a', 'b', 'c']])
+def test_edgeless_graph_converges_to_uniform(urls, initial_ranks):
+    # Không có message nào nhưng dangling mass vẫn phải đưa rank về phân phối đều
+    n = len(urls)
+    adjacency = CSRMatrix.from_edges(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), (n, n))
+    results, stats = calculate_pagerank_from_matrix(adjacency, urls, solver='bsp', return_stats=True,
+                                                    initial_ranks=initial_ranks, workers=1)
+    assert stats['converged']
+    assert stats['diagnostics']['final_residual'] is not None
+    assert np.allclose([rank for _, rank in results], 1.0 / n)
+
+
+def test_workers_capped(monkeypatch):
+    monkeypatch.setattr(parallel, 'PARALLEL_MAX_WORKERS', 2)
+    with pytest.raises(ValueError, match='workers must be at most 2'):
+        app.parse_solver_options({'solver': 'bsp', 'workers': 10000})
+    adjacency = random_adjacency(np.random.default_rng(29), 40, 0.1)
+    _, stats = bsp_bfs(adjacency, 0, workers=10000)
+    assert stats['workers'] == 2 and len(stats['partition_sizes']) == 2
@@ -0,0 +1,116 @@
+import socket
+import time
+
+import pytest
+
+import app
+from cache import RedisCache, SQLiteCache, create_cache
+from local_redis import LocalRedisServer
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _unreachable_backends(tmp_path):
+    return [
+        SQLiteCache(str(tmp_path / 'missing' / 'cache.db'), 'result', 2 ** 20),
+        RedisCache('127.0.0.1', _closed_port(), 'result', timeout=0.5),
+    ]
+
+
+def test_unreachable_backend_degrades_to_miss(tmp_path):
+    for cache in _unreachable_backends(tmp_path):
+        cache.put('key', b'value')
+        assert cache.get('key') is None
+        cache.clear()
+        stats = cache.stats()
+        assert stats['available'] is False and stats['backend'] == cache.backend
+
+
+@pytest.mark.parametrize('method', ['GET', 'DELETE'])
+def test_cache_endpoints_report_unreachable_backend(client, monkeypatch, tmp_path, method):
+    for cache in _unreachable_backends(tmp_path):
+        monkeypatch.setattr(app, '_result_cache', cache)
+        monkeypatch.setattr(app, '_page_cache', cache)
+        for path in ('/api/result-cache', '/api/page-cache'):
+            response = client.open(path, method=method)
+            assert response.status_code == 503
+            assert response.get_json()['available'] is False
+
+
+@pytest.fixture
+def redis_server():
+    server = LocalRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def cache_url(request, tmp_path):
+    if request.param == 'memory':
+        return 'memory'
+    if request.param == 'sqlite':
+        return f"sqlite:///{tmp_path / 'cache.db'}"
+    return request.getfixturevalue('redis_server').url
+
+
+def _create(url, ttl=None):
+    return create_cache(url, 'test', None if url.startswith('redis://') else 2 ** 20, ttl)
+
+
+def test_round_trip(cache_url):
+    cache = _create(cache_url)
+    cache.put('a', b'first')
+    cache.put('b', b'\x00binary\r\n')
+    cache.put('a', b'replaced')
+    assert cache.get('a') == b'replaced'
+    assert cache.get('b') == b'\x00binary\r\n'
+    assert cache.get('missing') is None
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (2, 2, 1)
+    cache.clear()
+    assert cache.get('a') is None and cache.stats()['entries'] == 0
+
+
+def test_shared_between_instances(cache_url):
+    if cache_url == 'memory':
+        pytest.skip('memory cache is per process')
+    _create(cache_url).put('key', b'value')
+    assert _create(cache_url).get('key') == b'value'
+
+
+def test_ttl_expires_entries(cache_url):
+    cache = _create(cache_url, ttl=0.05)
+    cache.put('key', b'value')
+    assert cache.get('key') == b'value'
+    time.sleep(0.1)
+    assert cache.get('key') is None
+
+
+def test_redis_going_down_degrades_to_miss(redis_server):
+    cache = _create(redis_server.url)
+    cache.put('key', b'value')
+    assert cache.get('key') == b'value'
+    redis_server.stop()
+    assert cache.get('key') is None
+    cache.put('key', b'value')
+    cache.clear()
+    assert cache.stats()['available'] is False
+
+
+def test_redis_rejects_max_bytes(redis_server, monkeypatch):
+    with pytest.raises(ValueError):
+        create_cache(redis_server.url, 'test', 2 ** 20)
+    monkeypatch.setattr(app, 'CACHE_BACKEND', redis_server.url)
+    assert app._cache_max_bytes('PAGERANK_RESULT_CACHE_BYTES', 2 ** 20) is None
+    monkeypatch.setenv('PAGERANK_RESULT_CACHE_BYTES', '1000')
+    with pytest.raises(ValueError):
+        app._cache_max_bytes('PAGERANK_RESULT_CACHE_BYTES', 2 ** 20)
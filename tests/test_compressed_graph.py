@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix, CompressedGraph
+from solvers import calculate_pagerank_from_matrix
+from solvers.out_of_core import compressed_pagerank
+from conftest import random_adjacency
+
+
+def _graphs():
+    rng = np.random.default_rng(43)
+    n = 200
+    unweighted = random_adjacency(rng, n, 0.05)
+    # Vài cạnh trọng số khác 1 (lưu dạng ngoại lệ) và toàn bộ trọng số ngẫu nhiên (lưu mảng data)
+    few = unweighted.data.copy()
+    few[::50] = 3.0
+    dense = rng.random(unweighted.nnz) + 0.5
+    # Hàng rỗng, cạnh tới cột nhỏ hơn hàng (zigzag âm), cột cuối, node tự trỏ
+    edges = CSRMatrix.from_edges(np.array([0, 5, 5, 5, 9]), np.array([9, 0, 5, 9, 0]), (10, 10))
+    return [
+        unweighted,
+        CSRMatrix(unweighted.indptr, unweighted.indices, few, unweighted.shape),
+        CSRMatrix(unweighted.indptr, unweighted.indices, dense, unweighted.shape),
+        edges,
+        CSRMatrix.from_edges(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), (4, 4)),
+    ]
+
+
+@pytest.mark.parametrize('block_rows', [1, 7, 4096])
+@pytest.mark.parametrize('index', range(5))
+def test_round_trip_and_spmv(tmp_path, block_rows, index):
+    matrix = _graphs()[index]
+    graph = CompressedGraph.from_csr(matrix, block_rows=block_rows)
+    assert graph.nnz == matrix.nnz
+    for candidate in (graph, _reload(graph, tmp_path)):
+        restored = candidate.to_csr()
+        assert np.array_equal(restored.indptr, matrix.indptr)
+        assert np.array_equal(restored.indices, matrix.indices)
+        assert np.array_equal(restored.data, matrix.data)
+        for row in range(matrix.shape[0]):
+            assert np.array_equal(candidate.neighbors(row), matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]])
+        
+        vector = np.random.default_rng(index).random(matrix.shape[0])
+        assert np.allclose(candidate @ vector, matrix @ vector, rtol=1e-12, atol=0)
+        assert np.allclose(candidate.transpose_matmul(vector), matrix.transpose() @ vector, rtol=1e-12, atol=0)
+        assert np.allclose(candidate.row_sums(), matrix.row_sums())
+        assert np.allclose(candidate.column_sums(), matrix.transpose().row_sums())
+
+
+def _reload(graph, tmp_path):
+    path = tmp_path / 'graph.prgz'
+    graph.save(str(path))
+    return CompressedGraph.load(str(path))
+
+
+def test_rejects_unsorted_rows():
+    matrix = CSRMatrix(np.array([0, 2]), np.array([1, 0]), np.ones(2), (1, 2))
+    with pytest.raises(ValueError):
+        CompressedGraph.from_csr(matrix)
+
+
+@pytest.mark.parametrize('index', [0, 1])
+def test_pagerank_over_compressed_graph_matches_csr(index):
+    matrix = _graphs()[index]
+    urls = [f"https://example.com/{i}" for i in range(matrix.shape[0])]
+    expected = dict(calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-12, max_iterations=1000))
+    graph = CompressedGraph.from_csr(matrix, block_rows=16)
+    results, stats = calculate_pagerank_from_matrix(graph, urls, tolerance=1e-12, max_iterations=1000,
+                                                    return_stats=True)
+    assert stats['converged']
+    assert max(abs(rank - expected[url]) for url, rank in results) < 1e-12
+    
+    # Chiều in-link (ma trận chuyển vị) cho cùng nghiệm
+    in_links = CompressedGraph.from_csr(matrix.transpose(), block_rows=16)
+    pagerank, _ = compressed_pagerank(in_links, matrix.row_sums(), 0.85, 1000, 1e-12)
+    assert max(abs(pagerank[i] - expected[url]) for i, url in enumerate(urls)) < 1e-12
+
+
+def test_compressed_graph_rejects_other_solvers():
+    graph = CompressedGraph.from_csr(_graphs()[0])
+    urls = [str(i) for i in range(graph.shape[0])]
+    with pytest.raises(ValueError):
+        calculate_pagerank_from_matrix(graph, urls, solver='scc')
+    with pytest.raises(ValueError):
+        calculate_pagerank_from_matrix(graph, urls, reorder='degree')
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import app
+from solvers.personalized import average_ranks, calculate_pagerank_damping_sweep
+from conftest import random_adjacency
+
+
+DAMPING_FACTORS = [0.5, 0.7, 0.85, 0.95, 0.99]
+
+
+def _graph(seed=34, n=60):
+    matrix = random_adjacency(np.random.default_rng(seed), n, 0.08)
+    return matrix, [f'https://a.example/{i}' for i in range(n)]
+
+
+def test_sweep_matches_exact_solves(exact_pagerank):
+    matrix, urls = _graph()
+    sweep_results, stats = calculate_pagerank_damping_sweep(matrix, urls, DAMPING_FACTORS, max_iterations=10000,
+                                                            tolerance=1e-13)
+    assert stats['converged'] == [True] * len(DAMPING_FACTORS)
+    # Damping lớn hội tụ chậm hơn (bị loại khỏi batch muộn hơn)
+    assert stats['iterations'] == sorted(stats['iterations'])
+    assert stats['iterations'][0] < stats['iterations'][-1]
+
+    exact = [exact_pagerank(matrix, d) for d in DAMPING_FACTORS]
+    for results, expected in zip(sweep_results, exact):
+        ranks = dict(results)
+        assert np.allclose([ranks[url] for url in urls], expected, rtol=1e-9, atol=0)
+        assert [rank for _, rank in results] == sorted((rank for _, rank in results), reverse=True)
+
+    ranks = np.array([average_ranks(expected) for expected in exact])
+    assert np.allclose(stats['spearman'], np.corrcoef(ranks), atol=1e-12)
+
+
+def test_average_ranks_ties():
+    assert average_ranks([0.1, 0.4, 0.4, 0.1, 0.9]).tolist() == [4.5, 2.5, 2.5, 4.5, 1.0]
+
+
+def test_sweep_single_node():
+    sweep_results, stats = calculate_pagerank_damping_sweep([[0]], ['https://a.example/'], [0.5, 0.85])
+    assert sweep_results == [[('https://a.example/', 1.0)]] * 2
+    assert stats['spearman'] == [[1.0, 1.0], [1.0, 1.0]]
+
+
+def test_sweep_endpoint(exact_pagerank):
+    matrix, urls = _graph(seed=35, n=30)
+    client = app.app.test_client()
+    response = client.post('/api/pagerank-matrix', json={
+        'urls': urls, 'adjacency_matrix': matrix.toarray().tolist(), 'damping_factors': DAMPING_FACTORS,
+        'max_iterations': 2000,
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [entry['damping_factor'] for entry in data['sweep']] == DAMPING_FACTORS
+    for entry in data['sweep']:
+        assert entry['converged']
+        ranks = {item['url']: item['rank'] for item in entry['results']}
+        expected = exact_pagerank(matrix, entry['damping_factor'])
+        # tolerance mặc định 1e-6 (L1 giữa hai vòng): sai số L1 tới nghiệm đúng <= tol * d / (1 - d)
+        error = np.abs(np.array([ranks[url] for url in urls]) - expected).sum()
+        assert error <= 1e-6 * entry['damping_factor'] / (1 - entry['damping_factor'])
+    assert len(data['rank_correlations']['matrix']) == len(DAMPING_FACTORS)
+
+
+@pytest.mark.parametrize('damping_factors', [[], 0.85, [0], [1], [0.5, 1.2], ['0.5'], [True]])
+def test_invalid_damping_factors(damping_factors):
+    matrix, urls = _graph(n=5)
+    response = app.app.test_client().post('/api/pagerank-matrix', json={
+        'urls': urls, 'adjacency_matrix': matrix.toarray().tolist(), 'damping_factors': damping_factors})
+    assert response.status_code == 400
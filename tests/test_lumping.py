@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import app
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers import calculate_pagerank_from_matrix
+from solvers.lumping import _lumped_power_iteration
+
+
+def _graph(seed, n, dangling_fraction, weighted=False):
+    rng = np.random.default_rng(seed)
+    dense = (rng.random((n, n)) < 0.08).astype(float)
+    if weighted:
+        dense *= rng.random((n, n)) * 4
+    dense[rng.random(n) < dangling_fraction] = 0
+    return dense
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('dangling_fraction', [0.0, 0.3, 0.9])
+@pytest.mark.parametrize('damping_factor', [0.5, 0.85, 0.99])
+def test_lumped_matches_exact(exact_pagerank, damping_factor, dangling_fraction, weighted):
+    dense = _graph(39, 80, dangling_fraction, weighted)
+    transition, dangling = build_transition_matrix(CSRMatrix.from_dense(dense))
+    pagerank, stats = _lumped_power_iteration(transition, dangling, damping_factor, 20000, 1e-14)
+    assert stats['converged']
+    assert stats['dangling_nodes'] == len(dangling) == int((dense.sum(axis=1) == 0).sum())
+    assert pagerank.sum() == pytest.approx(1.0, abs=1e-12)
+    assert np.allclose(pagerank, exact_pagerank(dense, damping_factor), rtol=1e-9, atol=0)
+
+
+def test_all_dangling_and_single_node(exact_pagerank):
+    for dense in (np.zeros((5, 5)), np.zeros((1, 1)), np.array([[1.0]])):
+        transition, dangling = build_transition_matrix(CSRMatrix.from_dense(dense))
+        pagerank, stats = _lumped_power_iteration(transition, dangling, 0.85, 1000, 1e-12)
+        assert stats['converged']
+        assert np.allclose(pagerank, exact_pagerank(dense, 0.85), rtol=1e-12, atol=0)
+
+
+def test_lumped_endpoint(exact_pagerank):
+    dense = _graph(41, 40, 0.5)
+    urls = [f'https://a.example/{i}' for i in range(40)]
+    results, stats = calculate_pagerank_from_matrix(dense.tolist(), urls, solver='lumped', tolerance=1e-13,
+                                                    max_iterations=5000, return_stats=True)
+    ranks = dict(results)
+    assert np.allclose([ranks[url] for url in urls], exact_pagerank(dense, 0.85), rtol=1e-9, atol=0)
+
+    response = app.app.test_client().post('/api/pagerank-matrix', json={
+        'urls': urls, 'adjacency_matrix': dense.tolist(), 'solver': 'lumped'})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['solver_stats']['dangling_nodes'] == stats['dangling_nodes'] > 0
+    ranks = {item['url']: item['rank'] for item in data['results']}
+    # tolerance mặc định 1e-6 (L1 giữa hai vòng): sai số L1 tới nghiệm đúng <= tol * d / (1 - d)
+    error = np.abs(np.array([ranks[url] for url in urls]) - exact_pagerank(dense, 0.85)).sum()
+    assert error <= 1e-6 * 0.85 / 0.15
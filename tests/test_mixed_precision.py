@@ -0,0 +1,71 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers import mixed_precision
+from solvers.mixed_precision import _ColumnScaledMatrix, _mixed_precision_power_iteration
+from solvers.power import _power_iteration
+from conftest import random_adjacency
+
+
+def test_matches_power_iteration(exact_pagerank):
+    rng = np.random.default_rng(29)
+    adjacency = random_adjacency(rng, 300, 0.02)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    pagerank, stats = _mixed_precision_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10)
+    assert stats['converged'] and stats['float32_iterations'] > 0
+    reference, power_stats = _power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10)
+    assert np.abs(pagerank - reference).sum() < 1e-9
+    assert np.abs(pagerank - exact_pagerank(adjacency, 0.85)).sum() <= 0.85 / 0.15 * 1e-10
+    assert stats['spmv_bytes_float32'] == stats['spmv_bytes_float64'] == transition_matrix.indices.nbytes
+
+
+def test_weighted_graph_runs_in_float64(exact_pagerank):
+    rng = np.random.default_rng(31)
+    adjacency = random_adjacency(rng, 100, 0.05)
+    adjacency.data = rng.integers(1, 4, adjacency.nnz).astype(float)
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    assert _ColumnScaledMatrix.from_transition(transition_matrix, np.float32) is None
+    pagerank, stats = _mixed_precision_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10)
+    assert stats['float32_iterations'] == 0 and stats['converged']
+    assert np.abs(pagerank - exact_pagerank(adjacency, 0.85)).sum() <= 0.85 / 0.15 * 1e-10
+
+
+@pytest.mark.parametrize('block', [1, 7, 1 << 20])
+def test_column_scaled_product_in_blocks(monkeypatch, block):
+    monkeypatch.setattr(mixed_precision, 'COLUMN_SCALED_BLOCK', block)
+    rng = np.random.default_rng(37)
+    dense = (rng.random((60, 60)) < 0.1).astype(float)
+    # Hàng rỗng (không có in-link), node dangling và một hàng nhiều cạnh hơn một lô
+    dense[:, :5] = 0
+    dense[5:15] = 0
+    dense[20:, 40] = 1
+    transition_matrix, _ = build_transition_matrix(CSRMatrix.from_dense(dense))
+    vector = rng.random(60)
+    for dtype, rtol in ((np.float64, 1e-13), (np.float32, 1e-5)):
+        product = _ColumnScaledMatrix.from_transition(transition_matrix, dtype) @ vector.astype(dtype)
+        assert product.dtype == dtype
+        assert np.allclose(product, transition_matrix @ vector, rtol=rtol, atol=0)
+
+
+def test_peak_memory_below_power_iteration(monkeypatch):
+    # Lô nhỏ so với nnz như trên đồ thị lớn: mảng tạm của phép nhân cỡ lô thay vì cỡ nnz
+    monkeypatch.setattr(mixed_precision, 'COLUMN_SCALED_BLOCK', 1 << 12)
+    rng = np.random.default_rng(41)
+    n = 20000
+    sources = np.repeat(np.arange(n), 20)
+    adjacency = CSRMatrix.from_edges(sources, rng.integers(0, n, len(sources)), (n, n))
+    # Cạnh trùng được cộng dồn thành trọng số 2: đưa về đồ thị không trọng số
+    adjacency.data[:] = 1
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    peaks = []
+    for solve in (_power_iteration, _mixed_precision_power_iteration):
+        # Lần chạy đầu nạp module lười của NumPy và cache row id, không tính vào bộ nhớ đỉnh
+        solve(transition_matrix, dangling_nodes, 0.85, 100, 1e-6)
+        tracemalloc.start()
+        solve(transition_matrix, dangling_nodes, 0.85, 100, 1e-6)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < peaks[0] / 2
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import graph_storage
+from graph_storage import CSRMatrix, write_edge_file
+from solvers import calculate_pagerank_from_matrix
+from solvers.out_of_core import out_of_core_pagerank
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('block_edges', [37, 1 << 22])
+def test_matches_in_memory_solve(tmp_path, monkeypatch, weighted, block_edges):
+    # Ghi file thành nhiều đoạn để kiểm tra cả đường ghi
+    monkeypatch.setattr(graph_storage, 'EDGE_FILE_WRITE_CHUNK', 50)
+    rng = np.random.default_rng(47)
+    n, m = 120, 600
+    # Một phần ba số node không có out-link (dangling); cạnh lặp cộng dồn thành trọng số
+    sources = np.sort(rng.integers(0, 2 * n // 3, m))
+    targets = rng.integers(0, n, m)
+    weights = rng.random(m) + 0.5 if weighted else None
+    path = str(tmp_path / 'graph.edges')
+    write_edge_file(path, n, sources, targets, weights)
+    
+    adjacency = CSRMatrix.from_edges(sources, targets, (n, n), weights)
+    assert (adjacency.row_sums() == 0).sum() >= n // 3
+    urls = [str(i) for i in range(n)]
+    expected = dict(calculate_pagerank_from_matrix(adjacency, urls, 0.85, 1000, 1e-12))
+    pagerank, stats = out_of_core_pagerank(path, 0.85, 1000, 1e-12, block_edges=block_edges)
+    assert stats['converged']
+    assert stats['passes'] == stats['iterations'] + 1
+    assert np.abs(pagerank - np.array([expected[url] for url in urls])).sum() < 1e-10
+
+
+def test_empty_graph(tmp_path):
+    path = str(tmp_path / 'empty.edges')
+    write_edge_file(path, 0, [], [])
+    pagerank, stats = out_of_core_pagerank(path)
+    assert len(pagerank) == 0 and stats['converged']
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from graph_storage import build_transition_matrix
+from solvers import parallel
+from solvers.parallel import _parallel_power_iteration
+from conftest import random_adjacency
+
+
+@pytest.fixture
+def graph():
+    rng = np.random.default_rng(37)
+    adjacency = random_adjacency(rng, 400, 0.02)
+    return adjacency, build_transition_matrix(adjacency)
+
+
+def test_default_runs_in_process(graph, monkeypatch, exact_pagerank):
+    adjacency, (transition_matrix, dangling_nodes) = graph
+    monkeypatch.setattr(parallel, '_shared_spmv_pool', lambda: pytest.fail('workers=1 must not use the pool'))
+    pagerank, stats = _parallel_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10)
+    assert stats['workers'] == 1 and stats['converged']
+    assert np.abs(pagerank - exact_pagerank(adjacency, 0.85)).sum() <= 0.85 / 0.15 * 1e-10
+
+
+def test_workers_share_one_pool_and_match(graph, monkeypatch):
+    _, (transition_matrix, dangling_nodes) = graph
+    monkeypatch.setattr(parallel, 'PARALLEL_MAX_WORKERS', 3)
+    monkeypatch.setattr(parallel, '_shared_spmv_executor', None)
+    serial, _ = _parallel_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10)
+    pools = set()
+    try:
+        for workers in (2, 3, 8):
+            pagerank, stats = _parallel_power_iteration(transition_matrix, dangling_nodes, 0.85, 1000, 1e-10,
+                                                        workers=workers)
+            pools.add(id(parallel._shared_spmv_executor))
+            assert stats['workers'] == min(workers, 3)
+            assert np.array_equal(pagerank, serial)
+    finally:
+        parallel._shared_spmv_executor.shutdown()
+    assert len(pools) == 1
@@ -0,0 +1,30 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+GRAPH = {
+    'urls': ['https://a.example/1', 'https://a.example/2', 'https://a.example/3'],
+    'adjacency_matrix': [[0, 1, 1], [1, 0, 0], [1, 1, 0]],
+    'seed_sets': [['https://a.example/1']],
+}
+
+
+@pytest.mark.parametrize('top_k', [0, -1, '2', 1.5, [1], True, False])
+def test_invalid_top_k_rejected(client, top_k):
+    response = client.post('/api/personalized-pagerank', json={**GRAPH, 'top_k': top_k})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'top_k must be a positive integer'
+
+
+def test_top_k_limits_results(client):
+    response = client.post('/api/personalized-pagerank', json={**GRAPH, 'top_k': 2})
+    assert response.status_code == 200
+    results = response.get_json()['personalized_results'][0]['results']
+    assert len(results) == 2
+    assert results[0]['rank'] >= results[1]['rank']
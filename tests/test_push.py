@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix
+from solvers.session import PageRankSession, backward_push, forward_push_ppr
+from conftest import dense_exact_pagerank
+
+
+def _session(seed, n=80, damping_factor=0.85):
+    """Session trên đồ thị ngẫu nhiên có node dangling"""
+    rng = np.random.default_rng(seed)
+    dense = (rng.random((n, n)) < 0.06).astype(float)
+    dense[rng.choice(n, size=8, replace=False)] = 0
+    return PageRankSession([f'u{i}' for i in range(n)], CSRMatrix.from_dense(dense), damping_factor=damping_factor,
+                           tolerance=1e-13, max_iterations=5000)
+
+
+def _exact_ppr(session, source):
+    """Personalized PageRank chính xác từ source (dangling nhảy về source)"""
+    n, d = session.n, session.damping_factor
+    transition = np.zeros((n, n))
+    for u in range(n):
+        targets = session.out_links(u)
+        if len(targets):
+            transition[targets, u] += 1.0 / len(targets)
+        else:
+            transition[source, u] = 1.0
+    teleport = np.zeros(n)
+    teleport[source] = 1 - d
+    return np.linalg.solve(np.eye(n) - d * transition, teleport)
+
+
+@pytest.mark.parametrize('damping_factor', [0.5, 0.85])
+@pytest.mark.parametrize('epsilon', [1e-3, 1e-5])
+@pytest.mark.parametrize('seed', range(3))
+def test_forward_push_is_lower_bound_within_residual(seed, epsilon, damping_factor):
+    session = _session(seed, damping_factor=damping_factor)
+    for source in (0, int(np.flatnonzero(session.out_degree == 0)[0])):
+        exact = _exact_ppr(session, source)
+        estimates, stats = forward_push_ppr(session.out_links, session.out_degree, source, damping_factor, epsilon)
+        approx = np.zeros(session.n)
+        approx[list(estimates)] = list(estimates.values())
+        # Ước lượng là cận dưới, phần thiếu đúng bằng tổng residual còn lại (sai số L1)
+        assert np.all(approx <= exact + 1e-12)
+        assert (exact - approx).sum() == pytest.approx(stats['residual_mass'], abs=1e-12)
+        # Khi dừng mọi residual r_u < epsilon * deg(u)
+        assert stats['residual_mass'] <= epsilon * max(session.num_edges, session.n)
+        assert stats['touched_nodes'] <= session.n
+
+
+def test_forward_push_converges_to_exact():
+    session = _session(11)
+    exact = _exact_ppr(session, 3)
+    errors = []
+    for epsilon in (1e-2, 1e-4, 1e-6, 1e-8):
+        estimates, stats = forward_push_ppr(session.out_links, session.out_degree, 3, 0.85, epsilon)
+        approx = np.zeros(session.n)
+        approx[list(estimates)] = list(estimates.values())
+        errors.append(np.abs(exact - approx).sum())
+    assert errors == sorted(errors, reverse=True)
+    assert errors[-1] <= 1e-8 * session.num_edges
+
+
+def test_related_ranks_by_exact_ppr():
+    session = _session(12)
+    exact = _exact_ppr(session, 5)
+    results, stats = session.related('u5', epsilon=1e-7, top_k=10)
+    assert len(results) == 10
+    for url, score in results:
+        assert 0 <= exact[session.url_to_index[url]] - score <= stats['residual_mass']
+    # Thứ tự chỉ có thể lệch giữa các node có PPR chênh nhau không quá sai số
+    order = np.argsort(-exact, kind='stable')
+    assert [url for url, _ in results][:3] == [session.urls[i] for i in order[:3]]
+
+
+def _exact_leaky_ppr(session):
+    """Ma trận PPR của chuỗi rò (walk bị hấp thụ tại dangling): hàng s là PPR từ s"""
+    n, d = session.n, session.damping_factor
+    walk = np.zeros((n, n))
+    for u in range(n):
+        targets = session.out_links(u)
+        if len(targets):
+            walk[u, targets] += 1.0 / len(targets)
+    return (1 - d) * np.linalg.inv(np.eye(n) - d * walk)
+
+
+@pytest.mark.parametrize('damping_factor', [0.5, 0.85])
+@pytest.mark.parametrize('r_max', [1e-2, 1e-4, 1e-6])
+@pytest.mark.parametrize('seed', range(3))
+def test_backward_push_invariant(seed, r_max, damping_factor):
+    session = _session(seed, damping_factor=damping_factor)
+    leaky = _exact_leaky_ppr(session)
+    for target in (0, int(np.flatnonzero(session.out_degree == 0)[0])):
+        estimates, residual, pushes = backward_push(session.in_links, session.out_degree, target, damping_factor,
+                                                    r_max)
+        p, r = np.zeros(session.n), np.zeros(session.n)
+        p[list(estimates)] = list(estimates.values())
+        r[list(residual)] = list(residual.values())
+        assert pushes >= len(estimates)
+        assert r.max() <= r_max
+        # rho_s(target) = p(s) + sum_v rho_s(v) r(v) với mọi nguồn s
+        assert np.allclose(leaky[:, target], p + leaky @ r, rtol=0, atol=1e-12)
+        # Hàng của rho có tổng <= 1 nên p là cận dưới lệch tối đa r_max
+        assert np.all(p <= leaky[:, target] + 1e-12)
+        assert np.all(leaky[:, target] - p <= r_max + 1e-12)
+
+
+@pytest.mark.parametrize('epsilon', [1e-3, 1e-5])
+@pytest.mark.parametrize('seed', range(3))
+def test_target_rank_within_epsilon(seed, epsilon):
+    session = _session(seed)
+    session._compact()
+    adjacency = session.adjacency
+    pagerank = dense_exact_pagerank(CSRMatrix(adjacency.indptr, adjacency.indices, np.ones(adjacency.nnz),
+                                              adjacency.shape), session.damping_factor)
+    dangling = int(np.flatnonzero(session.out_degree == 0)[0])
+    for target in (0, 7, dangling):
+        estimate, stats = session.target_rank(f'u{target}', epsilon=epsilon)
+        assert abs(estimate - pagerank[target]) <= stats['error_bound'] + 1e-12
+        assert stats['error_bound'] <= epsilon
+
+        for source in (3, dangling):
+            exact = _exact_ppr(session, source)[target]
+            estimate, stats = session.target_rank(f'u{target}', f'u{source}', epsilon=epsilon)
+            assert abs(estimate - exact) <= stats['error_bound'] + 1e-12
+            assert stats['error_bound'] <= epsilon
+
+
+def test_target_rank_with_walks():
+    session = _session(5)
+    exact = _exact_ppr(session, 2)
+    misses = 0
+    for seed in range(20):
+        estimate, stats = session.target_rank('u9', 'u2', epsilon=1e-3, walks=2000, confidence=0.95, seed=seed)
+        assert stats['walks'] == 2000 and stats['confidence'] == 0.95
+        misses += abs(estimate - exact[9]) > stats['error_bound']
+    # Cận Hoeffding đúng với xác suất >= 95%: 20 lần thử không lệch quá vài lần
+    assert misses <= 3
+    first, _ = session.target_rank('u9', 'u2', epsilon=1e-3, walks=500, seed=1)
+    assert session.target_rank('u9', 'u2', epsilon=1e-3, walks=500, seed=1)[0] == first
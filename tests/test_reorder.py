@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+import app
+import solvers
+from graph_storage import CSRMatrix, NODE_ORDERINGS, permute_nodes
+from solvers import calculate_pagerank_from_matrix
+from solvers.power import _power_iteration
+from conftest import dense_exact_pagerank
+
+
+ORDERINGS = sorted(NODE_ORDERINGS)
+
+
+def _host_graph(seed=47, n=80, hosts=5):
+    """Đồ thị nhiều host, link nội bộ host dày hơn, có node dangling; host gán ngẫu nhiên theo
+    node nên thứ tự theo host / độ / RCM khác hẳn thứ tự gốc"""
+    rng = np.random.default_rng(seed)
+    host = rng.integers(hosts, size=n)
+    probability = np.where(host[:, None] == host[None, :], 0.25, 0.02)
+    dense = (rng.random((n, n)) < probability).astype(float)
+    dense[rng.choice(n, size=6, replace=False)] = 0
+    urls = [f'https://h{host[i]}.example/page/{i}' for i in range(n)]
+    return CSRMatrix.from_dense(dense), urls
+
+
+def test_permute_nodes_relabels_rows_and_columns():
+    matrix, _ = _host_graph()
+    order = np.random.default_rng(0).permutation(matrix.shape[0])
+    assert np.array_equal(permute_nodes(matrix, order).toarray(), matrix.toarray()[np.ix_(order, order)])
+
+
+@pytest.mark.parametrize('reorder', ORDERINGS)
+def test_orderings_are_permutations(reorder):
+    matrix, urls = _host_graph()
+    order = NODE_ORDERINGS[reorder](matrix, urls)
+    assert sorted(order.tolist()) == list(range(len(urls)))
+    assert not np.array_equal(order, np.arange(len(urls)))
+
+
+@pytest.mark.parametrize('reorder', ORDERINGS)
+@pytest.mark.parametrize('solver', ['power', 'adaptive', 'scc', 'lumped', 'blockrank'])
+def test_reorder_keeps_ranks_by_url(reorder, solver):
+    matrix, urls = _host_graph()
+    exact = dense_exact_pagerank(matrix, 0.85)
+    plain, plain_stats = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-12, max_iterations=1000,
+                                                        solver=solver, return_stats=True)
+    results, stats = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-12, max_iterations=1000,
+                                                    solver=solver, return_stats=True, reorder=reorder)
+    assert stats['reorder'] == reorder
+    assert stats['reorder_time'] >= 0
+    ranks = dict(results)
+    assert set(ranks) == set(urls)
+    assert np.allclose([ranks[url] for url in urls], exact, rtol=1e-8, atol=0)
+    assert np.allclose([ranks[url] for url in urls], [dict(plain)[url] for url in urls], rtol=1e-9, atol=0)
+    if solver == 'blockrank':
+        # Block theo host phải được hoán vị cùng node: cùng số block và cùng số vòng lặp như thứ tự gốc
+        for key in ('blocks', 'local_iterations', 'host_iterations', 'iterations'):
+            assert stats[key] == plain_stats[key]
+
+
+@pytest.mark.parametrize('reorder', ORDERINGS)
+def test_reorder_maps_warm_start(reorder):
+    matrix, urls = _host_graph()
+    previous = dict(calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-10))
+    _, plain = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-10, return_stats=True,
+                                              initial_ranks=previous)
+    _, stats = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-10, return_stats=True,
+                                              initial_ranks=previous, reorder=reorder)
+    assert stats['iterations'] == plain['iterations'] <= 2
+
+
+@pytest.mark.parametrize('reorder', ORDERINGS)
+def test_reorder_maps_confidence_half_width(monkeypatch, reorder):
+    # Solver giả: nửa độ rộng = 10% rank của chính node đó, nên khoảng tin cậy của mỗi URL
+    # chỉ đúng [0.9, 1.1] * rank khi mảng half-width được đưa về thứ tự gốc
+    def solve(*args, **kwargs):
+        pagerank, stats = _power_iteration(*args, **kwargs)
+        return pagerank, dict(stats, confidence_half_width=0.1 * pagerank)
+    monkeypatch.setitem(solvers.PAGERANK_SOLVERS, 'monte_carlo', (solve, ()))
+
+    matrix, urls = _host_graph()
+    results, stats = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-12, max_iterations=1000,
+                                                    solver='monte_carlo', return_stats=True, reorder=reorder)
+    assert 'confidence_half_width' not in stats
+    for url, rank in results:
+        low, high = stats['confidence_intervals'][url]
+        assert low == pytest.approx(0.9 * rank, rel=1e-12)
+        assert high == pytest.approx(1.1 * rank, rel=1e-12)
+
+
+def test_monte_carlo_reorder_intervals_follow_urls():
+    matrix, urls = _host_graph()
+    exact = dense_exact_pagerank(matrix, 0.85)
+    request = dict(solver='monte_carlo', return_stats=True, walks_per_node=400, seed=1)
+    _, plain = calculate_pagerank_from_matrix(matrix, urls, **request)
+    _, stats = calculate_pagerank_from_matrix(matrix, urls, reorder='host', **request)
+    plain_width = np.array([np.subtract(*plain['confidence_intervals'][url][::-1]) for url in urls])
+    width = np.array([np.subtract(*stats['confidence_intervals'][url][::-1]) for url in urls])
+    # Độ rộng khoảng tin cậy tăng theo rank: sau khi đánh số lại vẫn phải đi cùng đúng URL
+    assert np.corrcoef(width, exact)[0, 1] > 0.9
+    assert np.allclose(width, plain_width, rtol=0.25)
+
+
+@pytest.mark.parametrize('reorder', ORDERINGS)
+def test_reorder_endpoint(reorder):
+    matrix, urls = _host_graph()
+    graph = {'urls': urls, 'adjacency_matrix': matrix.toarray().tolist()}
+    client = app.app.test_client()
+    plain = client.post('/api/pagerank-matrix', json=graph).get_json()
+    response = client.post('/api/pagerank-matrix', json={**graph, 'reorder': reorder})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['solver_stats']['reorder'] == reorder
+    ranks = {item['url']: item['rank'] for item in data['results']}
+    plain_ranks = {item['url']: item['rank'] for item in plain['results']}
+    assert set(ranks) == set(urls)
+    assert all(ranks[url] == pytest.approx(plain_ranks[url], rel=1e-9) for url in urls)
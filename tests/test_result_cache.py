@@ -0,0 +1,36 @@
+import pytest
+
+import app
+from cache import MemoryCache
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'GRAPH_SNAPSHOT_DIR', str(tmp_path))
+    monkeypatch.setattr(app, '_result_cache', MemoryCache(2 ** 20))
+    monkeypatch.setattr(app, '_result_cache_aliases', app.OrderedDict())
+    return app.app.test_client()
+
+
+GRAPH = {
+    'urls': ['https://a.example/1', 'https://a.example/2', 'https://a.example/3'],
+    'adjacency_matrix': [[0, 1, 1], [1, 0, 0], [1, 1, 0]],
+}
+
+
+def test_repeated_request_served_from_cache(client):
+    first = client.post('/api/pagerank-matrix', json=GRAPH)
+    second = client.post('/api/pagerank-matrix', json=GRAPH)
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get('X-Result-Cache') == 'hit'
+    assert first.get_json()['results'] == second.get_json()['results']
+
+
+def test_deleted_snapshot_not_served_from_cache(client):
+    snapshot_id = client.post('/api/pagerank-matrix', json={**GRAPH, 'save_snapshot': True}).get_json()['snapshot_id']
+    request = {'snapshot_id': snapshot_id}
+    assert client.post('/api/pagerank-matrix', json=request).status_code == 200
+    assert client.post('/api/pagerank-matrix', json=request).headers.get('X-Result-Cache') == 'hit'
+
+    assert client.delete(f'/api/graph-snapshots/{snapshot_id}').status_code == 200
+    assert client.post('/api/pagerank-matrix', json=request).status_code == 404
@@ -0,0 +1,57 @@
+import time
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix, build_transition_matrix
+from solvers.scc import _scc_pagerank, strongly_connected_components
+from conftest import random_adjacency
+
+
+def _partition(labels):
+    groups = {}
+    for node, label in enumerate(labels.tolist()):
+        groups.setdefault(label, set()).add(node)
+    return {frozenset(group) for group in groups.values()}
+
+
+@pytest.mark.parametrize('trim_frontier', [1, 256])
+def test_components_match_networkx(monkeypatch, trim_frontier):
+    monkeypatch.setattr('solvers.scc.SCC_TRIM_MIN_FRONTIER', trim_frontier)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = int(rng.integers(1, 80))
+        adjacency = random_adjacency(rng, n, density=float(rng.uniform(0.005, 0.08)))
+        labels = strongly_connected_components(n, adjacency._row_ids, adjacency.indices)
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(n))
+        graph.add_edges_from(zip(adjacency._row_ids.tolist(), adjacency.indices.tolist()))
+        assert _partition(labels) == {frozenset(c) for c in nx.strongly_connected_components(graph)}
+
+
+@pytest.mark.parametrize('damping_factor', [0.85, 0.99])
+def test_scc_solver_matches_exact(exact_pagerank, damping_factor):
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        n = int(rng.integers(2, 60))
+        adjacency = random_adjacency(rng, n, density=0.04)
+        # Chuỗi và node tự trỏ
+        chain = CSRMatrix.from_edges(np.r_[adjacency._row_ids, np.arange(n - 1), [0]],
+                                     np.r_[adjacency.indices, np.arange(1, n), [0]], (n, n))
+        transition_matrix, dangling_nodes = build_transition_matrix(chain)
+        pagerank, _ = _scc_pagerank(transition_matrix, dangling_nodes, damping_factor, 10000, 1e-12)
+        assert np.abs(pagerank - exact_pagerank(chain, damping_factor)).sum() < 1e-8
+
+
+@pytest.mark.parametrize('edges', ['chain', 'ring'])
+def test_long_chains_and_rings_are_linear(edges):
+    n = 50000
+    sources = np.arange(n - 1) if edges == 'chain' else np.arange(n)
+    adjacency = CSRMatrix.from_edges(sources, (sources + 1) % n, (n, n))
+    transition_matrix, dangling_nodes = build_transition_matrix(adjacency)
+    start = time.perf_counter()
+    pagerank, stats = _scc_pagerank(transition_matrix, dangling_nodes, 0.85, 100, 1e-6)
+    assert time.perf_counter() - start < 2.0
+    assert stats['converged'] and stats['levels'] == 1
+    assert stats['components'] == (n if edges == 'chain' else 1)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from graph_storage import CSRMatrix
+from solvers.session import PageRankSession
+from conftest import random_adjacency
+
+
+def _random_changes(rng, session, count):
+    adds = [(session.urls[a], session.urls[b]) for a, b in rng.integers(0, session.n, (count, 2))]
+    removes = []
+    for u in rng.integers(0, session.n, count).tolist():
+        targets = session.out_links(u)
+        if len(targets):
+            removes.append((session.urls[u], session.urls[int(targets[0])]))
+    return adds, removes
+
+
+def _session_exact(session, exact_pagerank):
+    session._compact()
+    adjacency = session.adjacency
+    unweighted = CSRMatrix(adjacency.indptr, adjacency.indices, np.ones(adjacency.nnz), adjacency.shape)
+    return exact_pagerank(unweighted, session.damping_factor)
+
+
+@pytest.mark.parametrize('damping_factor', [0.85, 0.95])
+def test_incremental_update_within_error_bound(exact_pagerank, damping_factor):
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        n = int(rng.integers(30, 120))
+        session = PageRankSession([f"u{i}" for i in range(n)], random_adjacency(rng, n, 0.05),
+                                  damping_factor=damping_factor, tolerance=1e-8, max_iterations=1000,
+                                  max_changed_fraction=1.0)
+        for _ in range(3):
+            stats = session.update(*_random_changes(rng, session, 3))
+            assert stats['converged']
+            pagerank = session.x / session.x.sum()
+            error = np.abs(pagerank - _session_exact(session, exact_pagerank)).sum()
+            assert error <= stats['error_bound']
+        # Phần push đóng góp tối đa tolerance / 2 (cận đã nhân đôi do chuẩn hóa)
+        push_l1 = np.abs(session.residual).sum() + abs(session.uniform_residual)
+        assert push_l1 <= session.tolerance * (1 - damping_factor) / 2
+
+
+def test_push_over_budget_falls_back_to_full_solve(exact_pagerank):
+    rng = np.random.default_rng(5)
+    n = 200
+    session = PageRankSession([f"u{i}" for i in range(n)], random_adjacency(rng, n, 0.05),
+                              tolerance=1e-8, max_iterations=1000)
+    session.full_solve_work = 1
+    stats = session.update(*_random_changes(rng, session, 2))
+    assert stats['mode'] == 'fallback'
+    assert stats['work_fraction'] > 1
+    assert stats['converged']
+    pagerank = session.x / session.x.sum()
+    assert np.abs(pagerank - _session_exact(session, exact_pagerank)).sum() <= stats['error_bound']
+
+
+def test_small_change_stays_incremental():
+    rng = np.random.default_rng(7)
+    n = 2000
+    session = PageRankSession([f"u{i}" for i in range(n)], random_adjacency(rng, n, 0.005))
+    stats = session.update(*_random_changes(rng, session, 2))
+    assert stats['mode'] == 'incremental'
+    assert stats['work_fraction'] <= 1
@@ -0,0 +1,98 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture
+def session_id(client):
+    response = client.post('/api/graph-sessions', json={
+        'urls': ['a', 'b', 'c'],
+        'edges': [['a', 'b'], ['b', 'c'], ['c', 'a'], ['a', 'c']],
+    })
+    assert response.status_code == 200
+    return response.get_json()['session_id']
+
+
+@pytest.mark.parametrize('endpoint, body', [
+    ('related', {'source': 'a'}),
+    ('target-rank', {'target': 'c'}),
+])
+@pytest.mark.parametrize('epsilon', ['0.01', None, 0, -1e-4, True, [1e-4]])
+def test_invalid_epsilon_rejected(client, session_id, endpoint, body, epsilon):
+    response = client.post(f'/api/graph-sessions/{session_id}/{endpoint}', json={**body, 'epsilon': epsilon})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'epsilon must be a positive number'
+
+
+@pytest.mark.parametrize('endpoint, body', [
+    ('related', {'source': 'a'}),
+    ('target-rank', {'target': 'c'}),
+])
+def test_valid_epsilon_accepted(client, session_id, endpoint, body):
+    response = client.post(f'/api/graph-sessions/{session_id}/{endpoint}', json={**body, 'epsilon': 1e-3})
+    assert response.status_code == 200
+
+
+def test_related_rejects_invalid_top_k(client, session_id):
+    response = client.post(f'/api/graph-sessions/{session_id}/related', json={'source': 'a', 'top_k': '3'})
+    assert response.status_code == 400
+
+
+def test_target_rank_rejects_non_numeric_confidence(client, session_id):
+    response = client.post(f'/api/graph-sessions/{session_id}/target-rank',
+                           json={'target': 'c', 'walks': 10, 'confidence': 'high'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('endpoint, body', [
+    ('related', {'source': 'a'}),
+    ('target-rank', {'target': 'c'}),
+])
+@pytest.mark.parametrize('epsilon', [1e-300, 5e-7])
+def test_tiny_epsilon_rejected(client, session_id, endpoint, body, epsilon):
+    response = client.post(f'/api/graph-sessions/{session_id}/{endpoint}', json={**body, 'epsilon': epsilon})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'epsilon must be at least {app.GRAPH_SESSION_MIN_EPSILON}'
+
+
+@pytest.mark.parametrize('source', [['a'], {'a': 1}, 1, True])
+def test_related_rejects_non_string_source(client, session_id, source):
+    response = client.post(f'/api/graph-sessions/{session_id}/related', json={'source': source})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'source must be a URL string'
+
+
+def test_related_rejects_boolean_top_k(client, session_id):
+    response = client.post(f'/api/graph-sessions/{session_id}/related', json={'source': 'a', 'top_k': True})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'target': ['c']}, 'target must be a URL string'),
+    ({'target': {'c': 1}}, 'target must be a URL string'),
+    ({'target': 3}, 'target must be a URL string'),
+    ({'target': 'c', 'source': ['a']}, 'source must be a URL string'),
+    ({'target': 'c', 'source': {'a': 1}}, 'source must be a URL string'),
+    ({'target': 'c', 'walks': 10, 'seed': 'abc'}, 'seed must be a non-negative integer'),
+    ({'target': 'c', 'walks': 10, 'seed': -1}, 'seed must be a non-negative integer'),
+    ({'target': 'c', 'walks': 10, 'seed': 1.5}, 'seed must be a non-negative integer'),
+    ({'target': 'c', 'walks': 10, 'seed': True}, 'seed must be a non-negative integer'),
+    ({'target': 'c', 'walks': True}, 'walks must be a non-negative integer'),
+])
+def test_target_rank_rejects_invalid_input(client, session_id, body, error):
+    response = client.post(f'/api/graph-sessions/{session_id}/target-rank', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
+
+
+def test_target_rank_seed_is_reproducible(client, session_id):
+    body = {'target': 'c', 'source': 'a', 'walks': 200, 'seed': 7}
+    first = client.post(f'/api/graph-sessions/{session_id}/target-rank', json=body)
+    second = client.post(f'/api/graph-sessions/{session_id}/target-rank', json=body)
+    assert first.status_code == second.status_code == 200
+    assert first.get_json()['estimate'] == second.get_json()['estimate']
@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import SingleFlight
+
+
+FOLLOWERS = 4
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_concurrently(flight, function):
+    """Leader chạy function (chặn đến khi được thả), FOLLOWERS lời gọi cùng khóa đến trong lúc đó;
+    trả về future của leader và của các follower"""
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        assert release.wait(5)
+        return function()
+
+    pool = ThreadPoolExecutor(FOLLOWERS + 1)
+    leader = pool.submit(flight.do, 'key', blocking)
+    assert started.wait(5)
+    followers = [pool.submit(flight.do, 'key', blocking) for _ in range(FOLLOWERS)]
+    # shared tăng (trong lock) trước khi follower bắt đầu chờ: lúc này mọi follower đã gắn vào lời gọi
+    _wait_for(lambda: flight.shared == FOLLOWERS)
+    release.set()
+    pool.shutdown(wait=True)
+    return leader, followers
+
+
+def test_concurrent_calls_run_once():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        return {'value': 42}
+
+    leader, followers = _run_concurrently(flight, compute)
+    result, shared = leader.result()
+    assert result == {'value': 42}
+    assert shared is False
+    for future in followers:
+        follower_result, follower_shared = future.result()
+        assert follower_result is result
+        assert follower_shared is True
+    assert len(calls) == 1
+    assert (flight.executions, flight.shared) == (1, FOLLOWERS)
+
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight()
+    error = RuntimeError("fetch failed")
+
+    def fail():
+        raise error
+
+    leader, followers = _run_concurrently(flight, fail)
+    for future in [leader] + followers:
+        with pytest.raises(RuntimeError) as raised:
+            future.result()
+        assert raised.value is error
+    assert flight.executions == 1
+
+    # Lỗi không được giữ lại: lời gọi sau chạy lại
+    assert flight.do('key', lambda: 'ok') == ('ok', False)
+    assert flight.executions == 2
+
+
+def test_results_not_kept_and_keys_independent():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('a', lambda: 2) == (2, False)
+
+    # Khóa khác không chờ lời gọi đang chạy
+    release = threading.Event()
+    with ThreadPoolExecutor(1) as pool:
+        blocked = pool.submit(flight.do, 'a', lambda: release.wait(5))
+        _wait_for(lambda: 'a' in flight._calls)
+        assert flight.do('b', lambda: 3) == (3, False)
+        release.set()
+        assert blocked.result() == (True, False)
+    assert (flight.executions, flight.shared) == (4, 0)
+    assert not flight._calls
@@ -0,0 +1,146 @@
+import mmap
+import os
+
+import numpy as np
+import pytest
+
+import app
+from cache import MemoryCache
+from graph_storage import (CSRMatrix, GRAPH_SNAPSHOT_HEADER, GRAPH_SNAPSHOT_MAGIC, GRAPH_SNAPSHOT_VERSION,
+                           _write_sections_atomic, load_graph_snapshot, save_graph_snapshot)
+
+
+URLS = ['https://a.example/1', 'https://a.example/2', 'https://b.example/', 'https://a.example/đ']
+DENSE = [[0, 1, 1, 0], [1, 0, 0, 0], [0, 0, 0, 0], [1, 1, 0, 1]]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'GRAPH_SNAPSHOT_DIR', str(tmp_path))
+    monkeypatch.setattr(app, '_result_cache', MemoryCache(2 ** 20))
+    monkeypatch.setattr(app, '_result_cache_aliases', app.OrderedDict())
+    monkeypatch.setattr(app, '_open_snapshots', app.OrderedDict())
+    return app.app.test_client()
+
+
+def _is_mapped(array):
+    """array trỏ thẳng vào file (np.asarray bỏ lớp np.memmap nhưng vẫn giữ base là mmap)"""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def _assert_same_graph(loaded, expected, urls):
+    adjacency, table = loaded
+    assert adjacency.shape == expected.shape
+    assert np.array_equal(adjacency.indptr, expected.indptr)
+    assert np.array_equal(adjacency.indices, expected.indices)
+    assert np.array_equal(adjacency.data, expected.data)
+    assert list(table) == urls
+    assert [table.index(url) for url in urls] == list(range(len(urls)))
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_v2_round_trip_is_memory_mapped(tmp_path, weighted):
+    matrix = CSRMatrix.from_dense(np.array(DENSE, dtype=float) * (2.5 if weighted else 1))
+    path = tmp_path / 'graph.snapshot'
+    save_graph_snapshot(str(path), matrix, URLS)
+
+    header = np.fromfile(path, dtype=GRAPH_SNAPSHOT_HEADER, count=1)[0]
+    assert header['magic'] == GRAPH_SNAPSHOT_MAGIC
+    assert header['version'] == GRAPH_SNAPSHOT_VERSION == 2
+    assert bool(header['weighted']) == weighted
+    assert (header['num_nodes'], header['num_edges']) == (4, matrix.nnz)
+    # Mỗi section bắt đầu ở bội số 8 byte: kích thước file khớp đúng layout v2
+    sections = [(len(URLS) + 1) * 8, matrix.nnz * 8] + ([matrix.nnz * 8] if weighted else []) + [
+        int(header['url_bytes']), (int(header['url_buckets']) + 1) * 8, len(URLS) * 4, len(URLS) * 4]
+    assert os.path.getsize(path) == sum(size + -size % 8 for size in [GRAPH_SNAPSHOT_HEADER.itemsize] + sections)
+
+    loaded = load_graph_snapshot(str(path))
+    _assert_same_graph(loaded, matrix, URLS)
+    adjacency, table = loaded
+    for array in (adjacency.indptr, adjacency.indices, table.buffer, table.bucket_offsets, table.id_to_rank,
+                  table.rank_to_id):
+        assert _is_mapped(array)
+        assert not array.flags.writeable
+    # Không trọng số thì data là view hằng 1 (stride 0), không đọc từ file
+    assert _is_mapped(adjacency.data) == weighted
+    if not weighted:
+        assert adjacency.data.strides == (0,)
+
+
+def test_loads_v1_snapshot(tmp_path):
+    matrix = CSRMatrix.from_dense(DENSE)
+    encoded = [url.encode('utf-8') for url in URLS]
+    url_offsets = np.concatenate([[0], np.cumsum([len(url) for url in encoded])]).astype(np.int64)
+    header = np.zeros(1, dtype=GRAPH_SNAPSHOT_HEADER)
+    for field, value in [('magic', GRAPH_SNAPSHOT_MAGIC), ('version', 1), ('weighted', False),
+                         ('num_nodes', len(URLS)), ('num_edges', matrix.nnz), ('url_bytes', int(url_offsets[-1]))]:
+        header[field] = value
+    path = str(tmp_path / 'v1.snapshot')
+    _write_sections_atomic(path, header, [matrix.indptr, matrix.indices, url_offsets,
+                                          np.frombuffer(b''.join(encoded), dtype=np.uint8)])
+
+    _assert_same_graph(load_graph_snapshot(path), matrix, URLS)
+
+
+def test_rejects_foreign_or_newer_files(tmp_path):
+    path = tmp_path / 'graph.snapshot'
+    path.write_bytes(b'not a snapshot' * 10)
+    with pytest.raises(ValueError, match='Not a graph snapshot'):
+        load_graph_snapshot(str(path))
+
+    save_graph_snapshot(str(path), CSRMatrix.from_dense(DENSE), URLS)
+    header = np.fromfile(path, dtype=GRAPH_SNAPSHOT_HEADER, count=1)
+    header['version'] = GRAPH_SNAPSHOT_VERSION + 1
+    with open(path, 'r+b') as handle:
+        handle.write(header.tobytes())
+    with pytest.raises(ValueError, match='Unsupported graph snapshot version'):
+        load_graph_snapshot(str(path))
+
+
+def test_save_rejects_mismatched_urls(tmp_path):
+    with pytest.raises(ValueError):
+        save_graph_snapshot(str(tmp_path / 'graph.snapshot'), CSRMatrix.from_dense(DENSE), URLS[:3])
+    assert not os.listdir(tmp_path)
+
+
+def test_snapshot_endpoints(client, tmp_path):
+    graph = {'urls': URLS, 'adjacency_matrix': DENSE}
+    response = client.post('/api/pagerank-matrix', json={**graph, 'save_snapshot': True})
+    assert response.status_code == 200
+    snapshot_id = response.get_json()['snapshot_id']
+    assert os.listdir(tmp_path) == [f'{snapshot_id}.graph']
+
+    info = client.get(f'/api/graph-snapshots/{snapshot_id}')
+    assert info.status_code == 200
+    assert info.get_json() == {'snapshot_id': snapshot_id, 'total_urls': 4, 'total_edges': 6}
+
+    # Tính trên snapshot cho cùng kết quả như gửi kèm đồ thị
+    from_snapshot = client.post('/api/pagerank-matrix', json={'snapshot_id': snapshot_id})
+    assert from_snapshot.status_code == 200
+    assert from_snapshot.get_json()['results'] == response.get_json()['results']
+
+    deleted = client.delete(f'/api/graph-snapshots/{snapshot_id}')
+    assert deleted.status_code == 200
+    assert deleted.get_json() == {'snapshot_id': snapshot_id, 'deleted': True}
+    assert not os.listdir(tmp_path)
+    assert client.get(f'/api/graph-snapshots/{snapshot_id}').status_code == 404
+    assert client.delete(f'/api/graph-snapshots/{snapshot_id}').status_code == 404
+    assert client.post('/api/pagerank-matrix', json={'snapshot_id': snapshot_id}).status_code == 404
+
+
+@pytest.mark.parametrize('snapshot_id', ['0' * 32, 'not-a-snapshot', '..%2F' + '0' * 32, 'A' * 32])
+def test_missing_or_invalid_snapshot_id(client, snapshot_id):
+    assert client.get(f'/api/graph-snapshots/{snapshot_id}').status_code == 404
+    assert client.delete(f'/api/graph-snapshots/{snapshot_id}').status_code == 404
+    response = client.post('/api/pagerank-matrix', json={'snapshot_id': snapshot_id})
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Graph snapshot not found'}
+
+
+def test_missing_snapshot_id_of_wrong_type(client):
+    response = client.post('/api/pagerank-matrix', json={'snapshot_id': 12345})
+    assert response.status_code == 404
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import app
+from graph_storage import build_transition_matrix
+from solvers import parallel
+from solvers.monte_carlo import _monte_carlo_pagerank
+from conftest import random_adjacency
+
+
+@pytest.mark.parametrize('data', [
+    {'solver': 'monte_carlo', 'walks_per_node': '5'},
+    {'solver': 'monte_carlo', 'walks_per_node': 1},
+    {'solver': 'monte_carlo', 'walks_per_node': 2.5},
+    {'solver': 'monte_carlo', 'workers': '4'},
+    {'solver': 'monte_carlo', 'workers': 0},
+    {'solver': 'monte_carlo', 'confidence': '0.9'},
+    {'solver': 'monte_carlo', 'confidence': 1},
+    {'solver': 'monte_carlo', 'seed': 'abc'},
+    {'solver': 'monte_carlo', 'seed': -1},
+    {'solver': 'adaptive', 'refresh_period': '10'},
+    {'solver': 'adaptive', 'refresh_period': 0},
+    {'solver': 'adaptive', 'node_tolerance': 'tiny'},
+    {'solver': 'blockrank', 'local_tolerance': -1},
+    {'solver': 'parallel', 'workers': True},
+    {'solver': 'bsp', 'partitioning': ['hash']},
+    {'solver': 'power', 'acceleration': ['aitken']},
+    {'solver': 'power', 'extrapolation_period': '3'},
+    {'solver': 'power', 'top_k': True},
+    {'solver': 'power', 'top_k': 0},
+    {'solver': 'power', 'top_k': 2.0},
+    {'solver': ['power']},
+    {'reorder': {'rcm': True}},
+])
+def test_invalid_options_raise_value_error(data):
+    with pytest.raises(ValueError):
+        app.parse_solver_options(data)
+
+
+def test_valid_options_pass_through(monkeypatch):
+    monkeypatch.setattr(parallel, 'PARALLEL_MAX_WORKERS', 4)
+    solver, options = app.parse_solver_options({
+        'solver': 'monte_carlo', 'walks_per_node': 5, 'workers': 2, 'confidence': 0.9, 'seed': 1,
+    })
+    assert solver == 'monte_carlo'
+    assert options == {'walks_per_node': 5, 'workers': 2, 'confidence': 0.9, 'seed': 1}
+
+
+def test_endpoint_answers_400_for_string_option():
+    response = app.app.test_client().post('/api/pagerank-matrix', json={
+        'urls': ['https://a.example/1', 'https://a.example/2'],
+        'adjacency_matrix': [[0, 1], [1, 0]],
+        'solver': 'monte_carlo',
+        'walks_per_node': '5',
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'walks_per_node must be an integer of at least 2'
+
+
+def test_monte_carlo_workers_capped(monkeypatch):
+    monkeypatch.setattr(parallel, 'PARALLEL_MAX_WORKERS', 2)
+    with pytest.raises(ValueError, match='workers must be at most 2'):
+        app.parse_solver_options({'solver': 'monte_carlo', 'walks_per_node': 10000, 'workers': 10000})
+    # Gọi thẳng solver: số process bị giới hạn thay vì một process cho mỗi worker yêu cầu
+    transition_matrix, dangling_nodes = build_transition_matrix(random_adjacency(np.random.default_rng(1), 30))
+    _, stats = _monte_carlo_pagerank(transition_matrix, dangling_nodes, 0.85, 100, 1e-6,
+                                     walks_per_node=10, workers=10000, seed=1)
+    assert stats['workers'] == 2
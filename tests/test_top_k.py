@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import app
+from solvers import calculate_pagerank_from_matrix
+from solvers.power import _top_k_order_certified
+from conftest import random_adjacency
+
+
+def _graph(seed, n=150):
+    matrix = random_adjacency(np.random.default_rng(seed), n, 0.05)
+    return matrix, [f'https://a.example/{i}' for i in range(n)]
+
+
+@pytest.mark.parametrize('damping_factor', [0.85, 0.95])
+@pytest.mark.parametrize('top_k', [1, 5, 20])
+@pytest.mark.parametrize('seed', range(4))
+def test_certified_top_k_matches_exact_order(exact_pagerank, seed, top_k, damping_factor):
+    matrix, urls = _graph(seed)
+    exact = exact_pagerank(matrix, damping_factor)
+    expected = [urls[i] for i in np.argsort(-exact, kind='stable')[:top_k]]
+
+    results, stats = calculate_pagerank_from_matrix(matrix, urls, damping_factor=damping_factor, tolerance=1e-15,
+                                                    max_iterations=10000, top_k=top_k, return_stats=True)
+    _, full = calculate_pagerank_from_matrix(matrix, urls, damping_factor=damping_factor, tolerance=1e-15,
+                                             max_iterations=10000, return_stats=True)
+    assert stats['top_k_certified'] and stats['converged']
+    assert stats['iterations'] < full['iterations']
+    assert len(results) == top_k
+    assert [url for url, _ in results] == expected
+
+    # Cận sai số dùng để chứng nhận phải đúng với nghiệm chính xác
+    residual = stats['diagnostics']['final_residual']
+    bound = damping_factor / (1 - damping_factor) * residual / 2
+    ranks = dict(results)
+    assert all(abs(ranks[url] - exact[urls.index(url)]) <= bound for url in ranks)
+
+
+def test_ties_are_never_certified():
+    pagerank = np.array([0.3, 0.3, 0.2, 0.2])
+    assert not _top_k_order_certified(pagerank, 1, 0.0)
+    assert _top_k_order_certified(np.array([0.4, 0.3, 0.2, 0.1]), 2, 0.049)
+    assert not _top_k_order_certified(np.array([0.4, 0.3, 0.2, 0.1]), 2, 0.06)
+    # top_k >= n: chỉ cần cả thứ tự
+    assert _top_k_order_certified(np.array([0.1, 0.6, 0.3]), 5, 0.01)
+
+
+def test_tied_top_nodes_run_to_tolerance():
+    # b và c đối xứng nên bằng rank ở vị trí 2/3: không thể chứng nhận, solver chạy tới tolerance
+    matrix = [[0, 1, 1, 0], [1, 0, 0, 0], [1, 0, 0, 0], [1, 1, 1, 0]]
+    urls = ['a', 'b', 'c', 'd']
+    results, stats = calculate_pagerank_from_matrix(matrix, urls, tolerance=1e-10, max_iterations=1000,
+                                                    top_k=2, return_stats=True)
+    assert stats['converged'] and not stats['top_k_certified']
+    assert stats['diagnostics']['final_residual'] < 1e-10
+    assert results[0][0] == 'a'
+
+
+def test_top_k_endpoint(exact_pagerank):
+    matrix, urls = _graph(7, n=40)
+    exact = exact_pagerank(matrix, 0.85)
+    response = app.app.test_client().post('/api/pagerank-matrix', json={
+        'urls': urls, 'adjacency_matrix': matrix.toarray().tolist(), 'top_k': 3,
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item['url'] for item in data['results']] == [urls[i] for i in np.argsort(-exact)[:3]]
+    assert data['solver_stats']['top_k_certified']
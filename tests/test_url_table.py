@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from graph_storage import URL_TABLE_BUCKET, URLTable, index_urls
+
+
+def _urls(n, seed=46):
+    """URL không trùng, thứ tự ngẫu nhiên, nhiều tiền tố chung (kể cả URL là tiền tố của URL khác)"""
+    rng = np.random.default_rng(seed)
+    urls = set()
+    while len(urls) < n:
+        host = f'https://h{rng.integers(3)}.example'
+        path = '/'.join(f'p{rng.integers(4)}' for _ in range(rng.integers(0, 4)))
+        urls.add(f'{host}/{path}')
+    urls = sorted(urls)
+    rng.shuffle(urls)
+    return urls
+
+
+@pytest.mark.parametrize('bucket_size', [1, 3, URL_TABLE_BUCKET])
+@pytest.mark.parametrize('n', [0, 1, 15, 16, 17, 32, 33, 100])
+def test_lookup_and_iteration(n, bucket_size):
+    urls = _urls(n)
+    table = URLTable.from_urls(urls, bucket_size=bucket_size)
+    assert len(table) == n
+    assert len(table.bucket_offsets) - 1 == -(-n // bucket_size)
+    assert list(table) == urls
+    assert table[:] == urls
+    assert table[1::2] == urls[1::2]
+    for index, url in enumerate(urls):
+        assert table[index] == url
+        assert table[index - n] == url
+        assert table.get(url) == index
+        assert table.index(url) == index
+        assert url in table
+    with pytest.raises(IndexError):
+        table[n]
+    with pytest.raises(IndexError):
+        table[-n - 1]
+
+
+def test_bucket_boundaries():
+    # Đúng 2 bucket đầy + 1 URL: URL đầu mỗi bucket lưu đầy đủ (tiền tố 0)
+    urls = [f'https://a.example/{i:03d}' for i in range(2 * URL_TABLE_BUCKET + 1)]
+    table = URLTable.from_urls(urls)
+    assert len(table.bucket_offsets) == 4
+    for bucket, start in enumerate(table.bucket_offsets[:-1].tolist()):
+        assert table.buffer[start] == 0
+        assert table._bucket_head(bucket) == urls[bucket * URL_TABLE_BUCKET].encode('utf-8')
+    assert table.bucket_offsets[-1] == len(table.buffer)
+    # URL cuối / đầu của mỗi bucket, và khóa nằm giữa hai bucket
+    for index in (0, URL_TABLE_BUCKET - 1, URL_TABLE_BUCKET, 2 * URL_TABLE_BUCKET - 1, 2 * URL_TABLE_BUCKET):
+        assert table.get(urls[index]) == index
+    assert table.get(urls[URL_TABLE_BUCKET - 1] + '0') is None
+    assert table.get('https://a.example/0155') is None
+
+
+@pytest.mark.parametrize('missing', ['', 'a', 'https://a.example', 'https://a.example/005', 'https://a.example/1',
+                                     'https://a.example/1a', 'https://a.example/99', 'zzz'])
+def test_missing_urls(missing):
+    urls = [f'https://a.example/{i:02d}' for i in range(40)]
+    table = URLTable.from_urls(urls)
+    assert table.get(missing) is None
+    assert table.get(missing, -1) == -1
+    assert missing not in table
+    with pytest.raises(ValueError):
+        table.index(missing)
+
+
+def test_long_and_non_ascii_urls():
+    # Phần đuôi > 127 byte cần varint nhiều byte; tiền tố chung cắt giữa ký tự UTF-8 nhiều byte
+    urls = ['https://a.example/' + 'x' * 300, 'https://a.example/' + 'x' * 300 + 'y' * 200,
+            'https://a.example/đường', 'https://a.example/đá', 'https://a.example/日本語', 'https://a.example/']
+    table = URLTable.from_urls(urls, bucket_size=4)
+    assert list(table) == urls
+    assert [table.get(url) for url in urls] == list(range(len(urls)))
+    assert 'https://a.example/đ' not in table
+
+
+def test_rejects_duplicates_and_non_strings():
+    with pytest.raises(ValueError, match='Duplicate URL'):
+        URLTable.from_urls(['https://a.example/', 'https://b.example/', 'https://a.example/'])
+    table = URLTable.from_urls(['https://a.example/'])
+    assert 1 not in table
+    assert None not in table
+
+
+def test_index_urls_reuses_table():
+    table = index_urls(['https://a.example/', 'https://b.example/'])
+    assert isinstance(table, URLTable)
+    assert index_urls(table) is table
+    assert table.nbytes == (table.buffer.nbytes + table.bucket_offsets.nbytes + table.id_to_rank.nbytes
+                            + table.rank_to_id.nbytes)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from solvers import PAGERANK_SOLVERS, calculate_pagerank_from_matrix
+from conftest import random_adjacency
+
+WARM_STARTED_SOLVERS = ('power', 'adaptive', 'lumped', 'mixed_precision', 'parallel', 'bsp')
+
+
+@pytest.fixture
+def graph():
+    rng = np.random.default_rng(41)
+    n = 300
+    return random_adjacency(rng, n, 0.02), [f"https://example.com/{i}" for i in range(n)]
+
+
+@pytest.mark.parametrize('solver', WARM_STARTED_SOLVERS)
+def test_warm_start_needs_fewer_iterations_same_fixed_point(graph, solver):
+    adjacency, urls = graph
+    options = {'workers': 1} if solver == 'bsp' else {}
+    cold, cold_stats = calculate_pagerank_from_matrix(adjacency, urls, 0.85, 1000, 1e-10, solver=solver,
+                                                      return_stats=True, **options)
+    # Khởi đầu từ nghiệm hơi lệch (như nghiệm trước khi đồ thị đổi ít)
+    previous = {url: rank * (1 + 0.01 * (i % 3)) for i, (url, rank) in enumerate(cold)}
+    warm, warm_stats = calculate_pagerank_from_matrix(adjacency, urls, 0.85, 1000, 1e-10, solver=solver,
+                                                      return_stats=True, initial_ranks=previous, **options)
+    assert not cold_stats['warm_start'] and warm_stats['warm_start']
+    assert warm_stats['iterations'] < cold_stats['iterations']
+    cold_ranks, warm_ranks = dict(cold), dict(warm)
+    assert sum(abs(cold_ranks[url] - warm_ranks[url]) for url in urls) < 1e-8
+
+
+@pytest.mark.parametrize('solver', sorted(set(PAGERANK_SOLVERS) - set(WARM_STARTED_SOLVERS)))
+def test_solvers_ignoring_initial_report_cold_start(graph, solver):
+    adjacency, urls = graph
+    options = {'seed': 1} if solver == 'monte_carlo' else {}
+    _, stats = calculate_pagerank_from_matrix(adjacency, urls, solver=solver, return_stats=True,
+                                              initial_ranks={urls[0]: 1.0}, **options)
+    assert stats['warm_start'] is False